@@ -0,0 +1,94 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from psycopg2.extras import execute_values
+
+from apps.core.models import uuid7
+
+ID_GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares insert throughput and primary key index size of random "
+        "(uuid4) and time-ordered (uuid7) primary keys on scratch tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10_000_000,
+            help="Number of rows inserted in every table",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Number of rows inserted by one statement",
+        )
+
+    def handle(self, *args, **options):
+        results = {
+            name: self._benchmark(name, generate_id, options)
+            for name, generate_id in ID_GENERATORS.items()
+        }
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name} : {result['rows_per_second']:,.0f} rows/s, "
+                f"index {result['index_size'] / 2 ** 20:,.1f} MiB, "
+                f"table {result['table_size'] / 2 ** 20:,.1f} MiB"
+            )
+        random_keys, ordered_keys = results["uuid4"], results["uuid7"]
+        throughput = ordered_keys["rows_per_second"] / random_keys["rows_per_second"]
+        index_size = ordered_keys["index_size"] / random_keys["index_size"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"uuid7 / uuid4 : {throughput:.2f}x throughput, "
+                f"{index_size:.2f}x index size"
+            )
+        )
+
+    def _benchmark(self, name, generate_id, options) -> dict:
+        table = f"benchmark_{name}_keys"
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(
+                f"CREATE TABLE {table} ("
+                "id uuid PRIMARY KEY, created timestamptz NOT NULL DEFAULT now())"
+            )
+            try:
+                elapsed_seconds = self._insert(cursor, table, generate_id, options)
+                cursor.execute(
+                    "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+                    [f"{table}_pkey", table],
+                )
+                index_size, table_size = cursor.fetchone()
+            finally:
+                cursor.execute(f"DROP TABLE {table}")
+
+        return {
+            "rows_per_second": options["rows"] / elapsed_seconds,
+            "index_size": index_size,
+            "table_size": table_size,
+        }
+
+    def _insert(self, cursor, table, generate_id, options) -> float:
+        rows, batch_size = options["rows"], options["batch_size"]
+        elapsed_seconds = 0.0
+        for offset in range(0, rows, batch_size):
+            ids = [(generate_id(),) for _ in range(min(batch_size, rows - offset))]
+            started = time.perf_counter()
+            execute_values(
+                cursor.cursor,
+                f"INSERT INTO {table} (id) VALUES %s",
+                ids,
+                page_size=batch_size,
+            )
+            elapsed_seconds += time.perf_counter() - started
+            if (offset // batch_size) % 100 == 0:
+                self.stdout.write(f"{table} : {offset + len(ids):,} rows")
+        return elapsed_seconds
@@ -1,52 +1,317 @@
+import hashlib
 import uuid
 
 from django.conf import settings
-from django.http import Http404
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.generics import get_object_or_404
 from rest_framework.request import Request
+from rest_framework.response import Response
 
+from apps.core.renderers import ORJSONRenderer, stream_json_array
+from apps.core.response_cache import response_cache
+from apps.core.values_serializer import RowObject, ValuesSerializer
 from apps.reservations.models import Reservation
 
 
 class ReservationRelatedViewMixin:
-    def initialize_request(self, request, *args, **kwargs):
-        request = super().initialize_request(request, *args, **kwargs)
+    """
+    Resolves the reservation of the url with one query, its existence and
+    ownership are checked on the loaded object. Views can declare what is
+    loaded with it in reservation_select_related and
+    reservation_prefetch_related.
+    """
 
+    reservation_select_related = ("event",)
+    reservation_prefetch_related = ()
+
+    def initial(self, request: Request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self._reservation = self.get_reservation(request, kwargs)
+
+    def get_reservation(self, request: Request, kwargs):
+        """The reservation is cached on the request, so it is loaded once."""
+        if not hasattr(request, "reservation"):
+            request.reservation = self._get_requested_reservation(request, kwargs)
+        return request.reservation
+
+    def _get_requested_reservation(self, request: Request, kwargs):
         requested_reservation_id: uuid = self._get_requested_reservation_id(kwargs)
+        if not requested_reservation_id:
+            return None
 
-        if requested_reservation_id and not self._is_requested_reservation_exist(
-            requested_reservation_id
-        ):
+        reservation = (
+            Reservation.objects.select_related(*self.reservation_select_related)
+            .prefetch_related(*self.reservation_prefetch_related)
+            .filter(pk=requested_reservation_id)
+            .first()
+        )
+        if reservation is None:
             raise Http404
 
-        return request
+        if reservation.user_id != request.user.id:
+            raise PermissionDenied
 
-    def initial(self, request: Request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
+        return reservation
+
+    def _get_requested_reservation_id(self, kwargs):
+        return kwargs.get(settings.RESERVATION_ID_URL_KEY)
 
-        requested_reservation_id = self._get_requested_reservation_id(kwargs)
 
-        if (
-            requested_reservation_id
-            and not self._is_requested_reservation_created_by_user(
-                requested_reservation_id, request
-            )
+class ValuesReadViewMixin:
+    """
+    Opts the list and retrieve actions of a viewset into ValuesSerializer,
+    the rows are read with values() and the response is the same as the
+    serializer_class would render.
+    """
+
+    stream_chunk_size = 2000
+
+    def get_values_serializer(self):
+        ordering = getattr(self.paginator, "ordering", ())
+        return ValuesSerializer(
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+            extra_values=[field_name.lstrip("-") for field_name in ordering],
+        )
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        rows = values_serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(values_serializer.to_representation(rows))
+        return self.get_paginated_response(values_serializer.to_representation(page))
+
+    def get_streaming_response(self, queryset, serializer_class):
+        """
+        All the rows of queryset rendered with serializer_class. Compact JSON
+        is streamed as the rows are read from a server side cursor, so memory
+        doesn't grow with the rows and the first bytes are sent before the
+        query ends. Other formats are rendered as usual.
+        """
+        values_serializer = ValuesSerializer(
+            serializer_class, context=self.get_serializer_context()
+        )
+        rows = values_serializer.get_queryset(queryset)
+
+        renderer = self.request.accepted_renderer
+        if not isinstance(renderer, ORJSONRenderer) or renderer.get_indent(
+            self.request.accepted_media_type, self.get_renderer_context()
         ):
-            raise PermissionDenied
+            return Response(values_serializer.to_representation(rows))
 
-        self._reservation = Reservation.objects.select_related("event").get(
-            id=requested_reservation_id
+        chunk_size = self.stream_chunk_size
+
+        def get_chunks():
+            chunk = []
+            for row in rows.iterator(chunk_size=chunk_size):
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield values_serializer.to_representation(chunk)
+                    chunk = []
+            yield values_serializer.to_representation(chunk)
+
+        return StreamingHttpResponse(
+            stream_json_array(get_chunks()), content_type=renderer.media_type
         )
 
-    def _get_requested_reservation_id(self, kwargs):
-        return kwargs.get(settings.RESERVATION_ID_URL_KEY)
+    def retrieve(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        rows = values_serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            rows, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, values_serializer.get_row_object(row))
+        return Response(values_serializer.to_representation([row])[0])
+
+
+class CachedReadViewMixin:
+    """
+    Serves the list and retrieve actions of a viewset from the response
+    cache, the model must invalidate its entries when it is written. Entries
+    are shared by all users, so the response_cache_user_fields are cached
+    empty and rendered for every request from a RowObject of the
+    representation, response_cache_object_values maps the attributes that
+    permission methods read to the fields of the representation holding them.
+    """
 
-    def _is_requested_reservation_exist(self, requested_reservation_id) -> bool:
-        return Reservation.objects.filter(pk=requested_reservation_id).exists()
+    response_cache_user_fields = ("object_permissions",)
+    response_cache_object_values = {}
 
-    def _is_requested_reservation_created_by_user(
-        self, requested_reservation_id, request: Request
-    ) -> bool:
-        return Reservation.objects.filter(
-            pk=requested_reservation_id, user=request.user
-        ).exists()
+    def _get_user_fields(self) -> dict:
+        fields = self.get_serializer().fields
+        return {
+            field_name: fields[field_name]
+            for field_name in self.response_cache_user_fields
+            if field_name in fields
+        }
+
+    def _get_row_object(self, data) -> RowObject:
+        return RowObject(
+            self.queryset.model,
+            {
+                attname: data[field_name]
+                for attname, field_name in self.response_cache_object_values.items()
+            },
+        )
+
+    def _clear_user_fields(self, items, user_fields):
+        for item in items:
+            for field_name in user_fields:
+                item[field_name] = None
+
+    def _add_user_fields(self, items, user_fields) -> list:
+        if not user_fields:
+            return items
+        return [
+            {
+                **item,
+                **{
+                    field_name: field.to_representation(self._get_row_object(item))
+                    for field_name, field in user_fields.items()
+                },
+            }
+            for item in items
+        ]
+
+    def list(self, request, *args, **kwargs):
+        user_fields = self._get_user_fields()
+        get_response = super().list
+
+        def get_data():
+            data = get_response(request, *args, **kwargs).data
+            self._clear_user_fields(
+                data["results"] if isinstance(data, dict) else data, user_fields
+            )
+            return data
+
+        data = response_cache.get_or_set(
+            response_cache.get_list_key(
+                self.queryset.model, request.build_absolute_uri()
+            ),
+            get_data,
+        )
+        if isinstance(data, dict):
+            data = {
+                **data,
+                "results": self._add_user_fields(data["results"], user_fields),
+            }
+        else:
+            data = self._add_user_fields(data, user_fields)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            pk = self.queryset.model._meta.pk.to_python(self.kwargs[lookup_url_kwarg])
+        except ValidationError:
+            raise Http404
+        user_fields = self._get_user_fields()
+        get_response = super().retrieve
+
+        def get_data():
+            data = get_response(request, *args, **kwargs).data
+            self._clear_user_fields([data], user_fields)
+            return data
+
+        data = response_cache.get_or_set(
+            response_cache.get_object_key(
+                self.queryset.model, pk, request.build_absolute_uri()
+            ),
+            get_data,
+        )
+        self.check_object_permissions(request, self._get_row_object(data))
+        return Response(self._add_user_fields([data], user_fields)[0])
+
+
+class ConditionalReadViewMixin:
+    """
+    ETag of list and retrieve computed from the updated timestamps with one
+    aggregate query, a request whose If-None-Match or If-Modified-Since
+    matches is answered 304 before anything is fetched or serialized. A
+    list is tagged with Max("updated") and the count of the filtered
+    queryset. etag_related_updated names the updated of related rows
+    rendered in the representation (tags of an event), their max and count
+    are tagged as well.
+
+    Only retrieve sends Last-Modified, deleting a row of a list doesn't move
+    it. ETags are per user and format, like the representation.
+    """
+
+    etag_related_updated = ()
+
+    def _get_etag_state(self, queryset) -> dict:
+        aggregates = {"updated": Max("updated"), "count": Count("pk", distinct=True)}
+        for lookup in self.etag_related_updated:
+            aggregates[f"{lookup}_max"] = Max(lookup)
+            aggregates[f"{lookup}_count"] = Count(lookup)
+        return queryset.order_by().aggregate(**aggregates)
+
+    def _get_etag(self, etag_state) -> str:
+        key = ":".join(
+            [
+                self.queryset.model._meta.label_lower,
+                str(self.request.user.id),
+                self.request.accepted_renderer.format,
+                self.request.get_full_path(),
+                *[str(value) for value in etag_state.values()],
+            ]
+        )
+        return f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+    def _get_conditional_response(self, etag_state, get_response, last_modified):
+        etag = self._get_etag(etag_state)
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = get_response()
+        if response.status_code in [200, 304]:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        get_response = super().list
+        return self._get_conditional_response(
+            self._get_etag_state(self.filter_queryset(self.get_queryset())),
+            lambda: get_response(request, *args, **kwargs),
+            last_modified=None,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        get_response = super().retrieve
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            pk = self.queryset.model._meta.pk.to_python(self.kwargs[lookup_url_kwarg])
+        except ValidationError:
+            raise Http404
+
+        etag_state = self._get_etag_state(
+            self.filter_queryset(self.get_queryset()).filter(pk=pk)
+        )
+        if not etag_state["count"]:
+            # not found or not visible, it is left to retrieve
+            return get_response(request, *args, **kwargs)
+        return self._get_conditional_response(
+            etag_state,
+            lambda: get_response(request, *args, **kwargs),
+            last_modified=max(
+                value
+                for name, value in etag_state.items()
+                if (name == "updated" or name.endswith("_max")) and value is not None
+            ),
+        )
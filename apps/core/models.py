@@ -1,11 +1,30 @@
+import os
+import time
 import uuid
 
 from django.db import models
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID, version 7 : 48 bits of unix time in milliseconds
+    followed by random bits. Ids created close in time are close in the
+    primary key index, so inserts append to its right edge.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    return uuid.UUID(
+        int=(timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (random_bits >> 68) << 64
+        | 0b10 << 62
+        | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    )
+
+
 class BaseModel(models.Model):
 
-    id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
+    id = models.UUIDField(primary_key=True, editable=False, default=uuid7)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
@@ -0,0 +1,199 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_key_value(value):
+    # isoformat keeps the microseconds that DjangoJSONEncoder would drop
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite key, the last field must be unique and
+    fields prefixed with "-" are descending.
+    A page continues after the key of the last row with an index range scan,
+    so every page costs the same at any depth and nothing is counted.
+    """
+
+    ordering = ("created", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.key, self.reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [
+                field_name[1:] if field_name.startswith("-") else f"-{field_name}"
+                for field_name in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if self.key is not None:
+            queryset = queryset.filter(self._get_key_filter(self.key, self.reverse))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        # a cursor was followed, so there is a page behind it
+        self.has_next = has_more if not self.reverse else self.key is not None
+        self.has_previous = has_more if self.reverse else self.key is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def _get_key_filter(self, key, reverse):
+        """
+        (a, b) > (x, y) as (a >= x) AND (a > x OR (a = x AND b > y)), the
+        leading range keeps the scan on the index of the key.
+        """
+        key_filter = Q()
+        equal_fields = Q()
+        for field_name, value in zip(self.ordering, key):
+            lookup = self._get_after_lookup(field_name, reverse)
+            field_name = field_name.lstrip("-")
+            key_filter |= equal_fields & Q(**{f"{field_name}__{lookup}": value})
+            equal_fields &= Q(**{field_name: value})
+
+        lookup = self._get_after_lookup(self.ordering[0], reverse)
+        return Q(**{f"{self.ordering[0].lstrip('-')}__{lookup}e": key[0]}) & key_filter
+
+    def _get_after_lookup(self, field_name, reverse):
+        return "lt" if field_name.startswith("-") != reverse else "gt"
+
+    def _get_key(self, row):
+        # rows are model instances or dicts of values()
+        if isinstance(row, dict):
+            return [row[field_name.lstrip("-")] for field_name in self.ordering]
+        return [getattr(row, field_name.lstrip("-")) for field_name in self.ordering]
+
+    def encode_cursor(self, key, reverse) -> str:
+        return base64.urlsafe_b64encode(
+            json.dumps([key, reverse], default=_encode_key_value).encode()
+        ).decode()
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            key, reverse = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(key) != len(self.ordering):
+                raise ValueError
+            key = [
+                self._to_python(model, field_name, value)
+                for field_name, value in zip(self.ordering, key)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return key, bool(reverse)
+
+    def _to_python(self, model, field_name, value):
+        try:
+            return model._meta.get_field(field_name.lstrip("-")).to_python(value)
+        except FieldDoesNotExist:
+            # annotations like distances are numbers
+            return float(value)
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._get_key(self.page[-1]), False)
+
+    def get_previous_cursor(self):
+        """An empty cursor is the first page, a link without a cursor."""
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return ""
+        return self.encode_cursor(self._get_key(self.page[0]), True)
+
+    def _get_link(self, base_url, cursor):
+        if cursor is None:
+            return None
+        if not cursor:
+            return remove_query_param(base_url, self.cursor_query_param)
+        return replace_query_param(base_url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._get_link(self.base_url, self.get_next_cursor())
+
+    def get_previous_link(self):
+        return self._get_link(self.base_url, self.get_previous_cursor())
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_cursor_response(self, request, next_cursor, previous_cursor, data):
+        """
+        The paginated response of a page kept apart from its request, with
+        the cursors it had, linked from the url of request.
+        """
+        base_url = request.build_absolute_uri()
+        return Response(
+            {
+                "next": self._get_link(base_url, next_cursor),
+                "previous": self._get_link(base_url, previous_cursor),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+class SeatNumberKeysetPagination(KeysetPagination):
+    ordering = ("seat_number", "id")
+
+
+class SearchRankKeysetPagination(KeysetPagination):
+    """Pages on a search rank annotation, best match first."""
+
+    ordering = ("-rank", "id")
+
+
+class DistanceKeysetPagination(KeysetPagination):
+    """Pages on a distance annotation, closest first."""
+
+    ordering = ("distance", "id")
+    page_size = 20
+    max_page_size = 100
@@ -0,0 +1,57 @@
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from apps.core.query_stats import QueryStats
+
+
+def get_viewset_read_actions(url_patterns=None):
+    """(viewset class, action) of every GET action routed in the urlconf."""
+    read_actions = set()
+    for url_pattern in url_patterns or get_resolver().url_patterns:
+        if isinstance(url_pattern, URLResolver):
+            read_actions |= get_viewset_read_actions(url_pattern.url_patterns)
+        elif isinstance(url_pattern, URLPattern):
+            actions = getattr(url_pattern.callback, "actions", None) or {}
+            if "get" in actions:
+                read_actions.add((url_pattern.callback.cls, actions["get"]))
+    return read_actions
+
+
+class QueryBudgetTestMixin:
+    """
+    Checks the query_budgets that viewsets declare per action: the number of
+    queries of a request must not pass the budget of its action and must not
+    grow with the number of rows, which is how an N+1 shows up.
+    """
+
+    query_budget_sizes = (2, 12)
+
+    def assertQueryBudget(self, viewset, action, client, create_rows, url, data=None):
+        """
+        Runs the GET request after create_rows(size) adds rows for each of
+        query_budget_sizes. url is a path or a function of the rows added.
+        """
+        budget = viewset.query_budgets[action]
+        runs = []
+        for size in self.query_budget_sizes:
+            rows = create_rows(size)
+            with QueryStats() as query_stats:
+                response = client.get(url(rows) if callable(url) else url, data)
+                if response.streaming:
+                    # streamed rows are read while the content is consumed
+                    b"".join(response.streaming_content)
+            self.assertLess(response.status_code, 300, getattr(response, "data", None))
+            runs.append(query_stats)
+
+        smallest, largest = runs[0], runs[-1]
+        self.assertEqual(
+            smallest.count,
+            largest.count,
+            f"{viewset.__name__}.{action} queries grow with the rows, these "
+            f"ran more often : {dict(largest.fingerprints - smallest.fingerprints)}",
+        )
+        self.assertLessEqual(
+            largest.count,
+            budget,
+            f"{viewset.__name__}.{action} ran {largest.count} queries, its budget "
+            f"is {budget} : {dict(largest.fingerprints)}",
+        )
@@ -0,0 +1,158 @@
+import functools
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_IN_LIST_RE = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_VALUES_RE = re.compile(
+    r"\bVALUES (\((?:\?, )*\?\))(?:, \((?:\?, )*\?\))+", re.IGNORECASE
+)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint_sql(sql) -> str:
+    """
+    The SQL with its literals and parameters replaced by ?, IN lists and
+    multi-row VALUES collapsed to one item, so the same query of a loop gets
+    the same fingerprint. Regexes only, no parsing.
+    """
+    sql = _SPACE_RE.sub(" ", sql.strip())
+    sql = _STRING_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _VALUES_RE.sub(r"VALUES \1, ...", sql)
+
+
+class QueryStats:
+    """
+    Counts the queries of the current thread and their total duration by
+    wrapping the execution of every database connection, like LogDb without
+    formatting anything. A fingerprint executed n_plus_one_threshold times
+    or more is an N+1 candidate.
+    """
+
+    def __init__(self, n_plus_one_threshold=None):
+        self.n_plus_one_threshold = n_plus_one_threshold or getattr(
+            settings, "QUERY_STATS_N_PLUS_ONE_THRESHOLD", 5
+        )
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self._connections = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint_sql(sql)] += 1
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def enable(self):
+        self._connections = connections.all()
+        for connection in self._connections:
+            connection.execute_wrappers.append(self)
+
+    def disable(self):
+        for connection in self._connections:
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+        self._connections = []
+
+    def get_n_plus_one_candidates(self) -> dict:
+        return {
+            fingerprint: count
+            for fingerprint, count in self.fingerprints.most_common()
+            if count >= self.n_plus_one_threshold
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 3),
+            "n_plus_one": self.get_n_plus_one_candidates(),
+        }
+
+    def log(self, **fields):
+        """One JSON log line, a warning when there are N+1 candidates."""
+        stats = {**fields, **self.as_dict()}
+        level = logging.WARNING if stats["n_plus_one"] else logging.INFO
+        logger.log(level, "query stats %s", json.dumps(stats, default=str))
+
+
+def is_sampled() -> bool:
+    sample_rate = getattr(settings, "QUERY_STATS_SAMPLE_RATE", 0.0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+class QueryStatsMiddleware:
+    """
+    Measures the queries of a sampled request, adds a Server-Timing header
+    with the database and total time and logs them. A streaming response
+    runs its queries while it is read, after its headers are sent, so it has
+    no header and is logged when the stream closes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_sampled():
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        query_stats = QueryStats()
+        with query_stats:
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self._measure_stream(
+                response.streaming_content, query_stats, request, response, started
+            )
+            return response
+
+        duration = time.perf_counter() - started
+        response["Server-Timing"] = (
+            f'db;dur={query_stats.duration * 1000:.3f};desc="{query_stats.count} '
+            f'queries", total;dur={duration * 1000:.3f}'
+        )
+        self._log(query_stats, request, response, duration)
+        return response
+
+    def _measure_stream(
+        self, streaming_content, query_stats, request, response, started
+    ):
+        try:
+            # enabled where the stream is read, connections are per thread
+            with query_stats:
+                yield from streaming_content
+        finally:
+            self._log(query_stats, request, response, time.perf_counter() - started)
+
+    def _log(self, query_stats, request, response, duration):
+        query_stats.log(
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            total_ms=round(duration * 1000, 3),
+        )
@@ -0,0 +1,158 @@
+import decimal
+import json
+from collections.abc import Iterator
+from itertools import chain
+
+import orjson
+from django.contrib.gis.geos import GEOSGeometry, Point
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class _NotLikeJSONRenderer(Exception):
+    """Raised by _default for values JSONRenderer must render."""
+
+
+def _is_unsafe_float(value) -> bool:
+    """
+    Whether orjson writes value unlike json : json refuses it (not finite)
+    or one of them writes it with an exponent.
+    """
+    return value != 0 and not 1e-4 <= abs(value) < 1e16
+
+
+def _has_unsafe_float(data) -> bool:
+    """
+    Walks data a level at a time with filter and map, a Python loop over
+    every value would take longer than orjson takes to render them.
+    """
+    level = [data]
+    while level:
+        types = set(map(type, level))
+        if any(issubclass(type_, float) for type_ in types) and any(
+            map(_is_unsafe_float, filter(float.__instancecheck__, level))
+        ):
+            return True
+        children = []
+        if any(issubclass(type_, dict) for type_ in types):
+            children.append(
+                chain.from_iterable(
+                    map(dict.values, filter(dict.__instancecheck__, level))
+                )
+            )
+        for sequence_type in (list, tuple):
+            if any(issubclass(type_, sequence_type) for type_ in types):
+                children.append(
+                    chain.from_iterable(filter(sequence_type.__instancecheck__, level))
+                )
+        level = list(chain.from_iterable(children))
+    return False
+
+
+class GeometryJSONEncoder(JSONEncoder):
+    """DRF's encoder with the geometries written like _default does."""
+
+    def default(self, obj):
+        if isinstance(obj, Point):
+            # same shape as the location of venues
+            return {"x": obj.x, "y": obj.y}
+        elif isinstance(obj, GEOSGeometry):
+            return json.loads(obj.json)
+        return super().default(obj)
+
+
+def _default(obj):
+    """
+    Types orjson leaves to its caller, anything else is DRF's business.
+    Values orjson would not write like JSONRenderer raise, the data is then
+    rendered by JSONRenderer.
+    """
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    elif isinstance(obj, decimal.Decimal):
+        value = float(obj)
+        if _is_unsafe_float(value):
+            raise _NotLikeJSONRenderer
+        return value
+    elif isinstance(obj, GEOSGeometry):
+        value = GeometryJSONEncoder().default(obj)
+        if _has_unsafe_float(value):
+            raise _NotLikeJSONRenderer
+        return value
+    elif isinstance(obj, Iterator):
+        # generators are read once, JSONRenderer must get them unread
+        raise _NotLikeJSONRenderer
+    return JSONEncoder().default(obj)
+
+
+def _render_with_json_renderer(data, options) -> bytes:
+    renderer = JSONRenderer()
+    renderer.encoder_class = GeometryJSONEncoder
+    return renderer.render(
+        data,
+        renderer_context={"indent": 2 if options & orjson.OPT_INDENT_2 else None},
+    )
+
+
+def dumps(data, options=OPTIONS, check_floats=False) -> bytes:
+    """
+    data as JSONRenderer renders it. What orjson writes otherwise (integers
+    over 64 bits, generators, decimals and geometries with floats written
+    with an exponent or not finite) is rendered by JSONRenderer, it raises
+    like it does. Other floats are only looked for with check_floats, as
+    walking data costs more than rendering it, orjson writes them otherwise.
+    """
+    try:
+        content = orjson.dumps(data, default=_default, option=options)
+    except orjson.JSONEncodeError:
+        return _render_with_json_renderer(data, options)
+    if check_floats and _has_unsafe_float(data):
+        return _render_with_json_renderer(data, options)
+    # U+2028 and U+2029 are escaped like JSONRenderer does, so the JSON is
+    # a javascript subset
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+        b"\xe2\x80\xa9", b"\\u2029"
+    )
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders the same JSON as JSONRenderer with orjson, UUIDs and datetimes
+    are encoded natively. Pretty printing is only done with 2 spaces. Views
+    rendering floats set renders_floats, so they are checked.
+    """
+
+    options = OPTIONS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+        return dumps(
+            data,
+            options,
+            getattr(renderer_context.get("view"), "renders_floats", False),
+        )
+
+
+def stream_json_array(chunks):
+    """
+    Encodes the items of chunks, lists of representations, as one compact
+    JSON array chunk by chunk, the same bytes ORJSONRenderer renders for the
+    whole list.
+    """
+    yield b"["
+    separator = b""
+    for chunk in chunks:
+        if chunk:
+            yield separator + b",".join(dumps(item) for item in chunk)
+            separator = b","
+    yield b"]"
@@ -0,0 +1,110 @@
+import hashlib
+import time
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ResponseCache:
+    """
+    Representations of objects and of list queries kept in a cache under
+    versioned keys. Every model has a version and a list version, every
+    object its own version : writing an object changes its version and the
+    list version, so entries of older versions are never read again and
+    expire. Changing the version of the model drops all of its entries, for
+    writes to rows that are rendered inside them (tags of events).
+
+    A missing entry is computed by one process at a time, the others wait
+    for it a moment before computing it themselves.
+    """
+
+    timeout = 60 * 10
+    lock_timeout = 5
+    lock_wait_seconds = 1
+
+    def __init__(self, alias="responses"):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _version_key(self, model, *parts):
+        return ":".join(("response_cache", model._meta.label_lower, *parts, "version"))
+
+    def _get_versions(self, keys) -> list:
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # an expired version must not come back, entries of it may exist
+                version = uuid.uuid4().hex
+                if not self.cache.add(key, version, self.timeout):
+                    version = self.cache.get(key, version)
+                versions[key] = version
+        return [versions[key] for key in keys]
+
+    def get_object_key(self, model, pk, url) -> str:
+        """url tells apart the requests of the object, by their query string."""
+        model_version, object_version = self._get_versions(
+            [self._version_key(model), self._version_key(model, str(pk))]
+        )
+        return (
+            f"response_cache:{model._meta.label_lower}:{model_version}:{pk}:"
+            f"{object_version}:{hashlib.md5(url.encode()).hexdigest()}"
+        )
+
+    def get_list_key(self, model, url) -> str:
+        model_version, list_version = self._get_versions(
+            [self._version_key(model), self._version_key(model, "list")]
+        )
+        return (
+            f"response_cache:{model._meta.label_lower}:{model_version}:list:"
+            f"{list_version}:{hashlib.md5(url.encode()).hexdigest()}"
+        )
+
+    def get_or_set(self, key, compute):
+        """The entry of key, compute() is stored when it is missing."""
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+
+        lock_key = f"{key}:lock"
+        if not self.cache.add(lock_key, 1, self.lock_timeout):
+            deadline = time.monotonic() + self.lock_wait_seconds
+            while time.monotonic() < deadline:
+                time.sleep(0.01)
+                entry = self.cache.get(key)
+                if entry is not None:
+                    return entry
+            return compute()
+
+        try:
+            entry = compute()
+            self.cache.set(key, entry, self.timeout)
+        finally:
+            self.cache.delete(lock_key)
+        return entry
+
+    def _set_versions(self, keys):
+        self.cache.set_many({key: uuid.uuid4().hex for key in keys}, self.timeout)
+
+    def invalidate(self, model, pks=()):
+        """
+        Drops the entries of the objects of pks and of every list query of
+        model, right away for the reads of the current transaction and again
+        on commit, a read in between could cache the old rows.
+        """
+        keys = [self._version_key(model, "list")] + [
+            self._version_key(model, str(pk)) for pk in pks
+        ]
+        self._set_versions(keys)
+        transaction.on_commit(lambda: self._set_versions(keys))
+
+    def invalidate_model(self, model):
+        keys = [self._version_key(model)]
+        self._set_versions(keys)
+        transaction.on_commit(lambda: self._set_versions(keys))
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,31 @@
+import time
+
+from celery.signals import task_postrun, task_prerun
+
+from apps.core.query_stats import QueryStats, is_sampled
+
+# query stats of the running sampled tasks by task id
+_task_query_stats = {}
+
+
+@task_prerun.connect
+def start_task_query_stats(task_id, task, **kwargs):
+    if is_sampled():
+        query_stats = QueryStats()
+        query_stats.enable()
+        _task_query_stats[task_id] = (query_stats, time.perf_counter())
+
+
+@task_postrun.connect
+def log_task_query_stats(task_id, task, state=None, **kwargs):
+    query_stats, started = _task_query_stats.pop(task_id, (None, None))
+    if query_stats is None:
+        return
+
+    query_stats.disable()
+    query_stats.log(
+        task=task.name,
+        task_id=task_id,
+        state=state,
+        total_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
@@ -1 +1,213 @@
-# Create your tests here.
+import datetime
+import decimal
+import io
+import uuid
+from unittest.mock import Mock
+
+from django.contrib.auth.models import User
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy as _
+from model_bakery import baker
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.core.models import uuid7
+from apps.core.parsers import ORJSONParser
+from apps.core.query_budget import get_viewset_read_actions
+from apps.core.query_stats import QueryStats, fingerprint_sql
+from apps.core.renderers import ORJSONRenderer, stream_json_array
+from apps.core.response_cache import ResponseCache
+from apps.events.models import Event
+from apps.venues.models import Venue
+
+
+class UUID7TestCase(SimpleTestCase):
+    def test_uuid7_is_version_7_and_time_ordered(self):
+        first_id = uuid7()
+        ids = [uuid7() for _ in range(1000)]
+
+        self.assertEqual(first_id.version, 7)
+        self.assertEqual(first_id.variant, uuid.RFC_4122)
+        self.assertEqual(len(set(ids)), 1000)
+        # ids of later milliseconds sort after the first one
+        self.assertTrue(all(first_id.bytes[:6] <= id_.bytes[:6] for id_ in ids))
+
+
+class QueryStatsTestCase(TestCase):
+    def test_fingerprint_normalises_literals(self):
+        self.assertEqual(
+            fingerprint_sql(
+                "SELECT id FROM t WHERE id IN (%s, %s) AND name = 'a''b' LIMIT 21"
+            ),
+            fingerprint_sql(
+                "SELECT id  FROM t WHERE id IN (%s) AND name = 'c' LIMIT 1"
+            ),
+        )
+
+    def test_repeated_queries_are_n_plus_one_candidates(self):
+        users = baker.make(User, _quantity=5)
+        with QueryStats(n_plus_one_threshold=5) as query_stats:
+            for user in users:
+                User.objects.get(id=user.id)
+            User.objects.count()
+
+        self.assertEqual(query_stats.count, 6)
+        self.assertListEqual(
+            list(query_stats.get_n_plus_one_candidates().values()), [5]
+        )
+
+    @override_settings(QUERY_STATS_SAMPLE_RATE=1.0)
+    def test_sampled_request_has_server_timing_header(self):
+        client = APIClient()
+        client.force_authenticate(baker.make(User))
+
+        with self.assertLogs("apps.core.query_stats", level="INFO") as logs:
+            response = client.get(reverse("events:event-list"))
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur='
+        )
+        self.assertIn('"path": "/api/events', logs.output[0])
+
+    @override_settings(QUERY_STATS_SAMPLE_RATE=1.0)
+    def test_sampled_streaming_response_is_logged_with_its_stream_queries(self):
+        client = APIClient()
+        client.force_authenticate(baker.make(User))
+        event = baker.make(Event)
+
+        with self.assertLogs("apps.core.query_stats", level="INFO") as logs:
+            response = client.get(
+                reverse("events:event-reserved-seats", kwargs={"pk": event.id})
+            )
+            self.assertEqual(logs.output, [])
+            self.assertEqual(b"".join(response.streaming_content), b"[]")
+            response.close()
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertRegex(logs.output[0], r'"queries": [1-9]')
+
+
+class QueryBudgetTestCase(SimpleTestCase):
+    def test_every_viewset_read_action_has_a_query_budget(self):
+        read_actions = get_viewset_read_actions()
+
+        self.assertTrue(read_actions)
+        for viewset, action in read_actions:
+            self.assertIn(
+                action,
+                getattr(viewset, "query_budgets", {}),
+                f"{viewset.__name__}.{action} has no query budget",
+            )
+
+
+class ORJSONTestCase(SimpleTestCase):
+    def test_renderer_renders_like_json_renderer(self):
+        data = {
+            "id": uuid7(),
+            "created": datetime.datetime(
+                2022, 6, 1, 7, 30, 30, 123456, tzinfo=datetime.timezone.utc
+            ),
+            "start_date": datetime.date(2022, 6, 1),
+            "price": decimal.Decimal("10.50"),
+            "detail": _("Ready for reservation"),
+            "seats": [{"seat_number": 1, "name": "Sé\u2028at"}, None, True],
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONRenderer().render({"location": Point(90.41, 23.81)}),
+            b'{"location":{"x":90.41,"y":23.81}}',
+        )
+
+    def test_values_orjson_writes_differently_are_rendered_by_json_renderer(self):
+        renderer_context = {"view": Mock(renders_floats=True)}
+        data = {
+            "floats": [1, 1e16, 1e-05, 1e-07, 1.5],
+            "count": 2**70,
+            "price": decimal.Decimal("1e20"),
+        }
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, renderer_context=renderer_context),
+            JSONRenderer().render(data),
+        )
+        self.assertEqual(
+            ORJSONRenderer().render({"location": Point(1e-07, 23.81)}),
+            b'{"location":{"x":1e-07,"y":23.81}}',
+        )
+        self.assertEqual(
+            ORJSONRenderer().render({"seats": (number for number in range(3))}),
+            b'{"seats":[0,1,2]}',
+        )
+        for value in [float("nan"), float("inf"), decimal.Decimal("NaN")]:
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render(
+                    {"distance": value}, renderer_context=renderer_context
+                )
+
+        # floats of views that don't render any are not looked for
+        self.assertEqual(
+            ORJSONRenderer().render({"distance": 1e16}), b'{"distance":1e16}'
+        )
+
+    def test_renderer_is_faster_than_json_renderer_on_seat_list(self):
+        stdout = io.StringIO()
+        call_command("benchmark_json_renderers", rows=2000, repeat=3, stdout=stdout)
+
+        self.assertIn("x faster", stdout.getvalue())
+
+    def test_streamed_array_is_rendered_like_the_list(self):
+        items = [{"seat_number": seat_number} for seat_number in range(5)]
+
+        for chunks in [[], [[]], [items[:2], [], items[2:]]]:
+            self.assertEqual(
+                b"".join(stream_json_array(chunks)),
+                ORJSONRenderer().render([item for chunk in chunks for item in chunk]),
+            )
+
+    def test_parser_parses_json(self):
+        parser = ORJSONParser()
+
+        self.assertEqual(
+            parser.parse(io.BytesIO(b'{"event_seats":["a"],"count":2}')),
+            {"event_seats": ["a"], "count": 2},
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"event_seats":'))
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self._response_cache = ResponseCache()
+        self._response_cache.cache.clear()
+
+    def test_entries_are_computed_once_and_dropped_with_their_version(self):
+        venue = baker.make(Venue)
+        compute = Mock(return_value={"id": venue.id})
+        key = self._response_cache.get_object_key(Venue, venue.id, "/api/venues")
+
+        self._response_cache.get_or_set(key, compute)
+        self._response_cache.get_or_set(key, compute)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(
+            self._response_cache.get_object_key(Venue, venue.id, "/api/venues"), key
+        )
+
+        self._response_cache.invalidate(Venue, [venue.id])
+        self.assertNotEqual(
+            self._response_cache.get_object_key(Venue, venue.id, "/api/venues"), key
+        )
+
+    def test_miss_waits_for_the_entry_being_computed(self):
+        key = self._response_cache.get_list_key(Venue, "/api/venues")
+        self._response_cache.cache.add(f"{key}:lock", 1)
+        self._response_cache.lock_wait_seconds = 0.05
+        compute = Mock(return_value=[])
+
+        self.assertEqual(self._response_cache.get_or_set(key, compute), [])
+        # the entry is left to the process holding the lock
+        self.assertIsNone(self._response_cache.cache.get(key))
+        self.assertEqual(compute.call_count, 1)
@@ -0,0 +1,181 @@
+import inspect
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+def _add_value(values, lookup):
+    if lookup not in values:
+        values.append(lookup)
+
+
+class RowObject:
+    """
+    Stands in for a model instance built from a values() row: attributes are
+    read from the row and methods of the model are bound to it, so object
+    permission methods that only read fetched values work unchanged.
+    """
+
+    __slots__ = ("_model", "_row")
+
+    def __init__(self, model, row):
+        self._model = model
+        self._row = row
+
+    def __getattr__(self, name):
+        try:
+            return self._row[name]
+        except KeyError:
+            pass
+        if inspect.isfunction(inspect.getattr_static(self._model, name)):
+            return getattr(self._model, name).__get__(self)
+        return getattr(self._model, name)
+
+
+class ValuesSerializer:
+    """
+    Read only fast path of a ModelSerializer for list and retrieve. Rows are
+    fetched with values() and turned into the same representation by
+    extractors compiled once from the fields of the serializer, no
+    serializer, field or model instance is created per row.
+
+    Supported fields are model fields, primary key relations, nested model
+    serializers of foreign keys, many to many primary key relations (nested
+    through the serializer_class of their child relation when it has one)
+    and DRYPermissionsField, whose permission methods must only read fetched
+    values. Many to many rows are ordered by their primary key, views must
+    prefetch them in the same order.
+    """
+
+    def __init__(self, serializer_class, context=None, extra_values=()):
+        serializer = serializer_class(context=context or {})
+        self.model = serializer.Meta.model
+        self.pk_name = self.model._meta.pk.attname
+        self.values = [self.pk_name]
+        self.many_related = {}
+        self.extractors = self._compile(serializer, self.model, "", self.values)
+        for value in extra_values:
+            _add_value(self.values, value)
+
+    def _compile(self, serializer, model, prefix, values) -> list:
+        return [
+            (field_name, self._compile_field(field, model, prefix, values))
+            for field_name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+    def _compile_field(self, field, model, prefix, values):
+        from dry_rest_permissions.generics import DRYPermissionsField
+
+        if isinstance(field, DRYPermissionsField):
+            return lambda row: field.to_representation(RowObject(model, row))
+
+        if (
+            field.source == "*"
+            or "." in field.source
+            or isinstance(field, serializers.ListSerializer)
+        ):
+            raise ImproperlyConfigured(
+                f"{field.field_name} of {model.__name__} has no values() path"
+            )
+        model_field = model._meta.get_field(field.source)
+
+        if isinstance(field, ManyRelatedField):
+            return self._compile_many_related(field, model_field, prefix)
+        if isinstance(field, serializers.BaseSerializer):
+            return self._compile_nested(field, model_field, prefix, values)
+
+        if isinstance(field, PrimaryKeyRelatedField):
+            lookup = f"{prefix}{model_field.attname}"
+            to_representation = (
+                field.pk_field.to_representation if field.pk_field else lambda pk: pk
+            )
+        else:
+            lookup = f"{prefix}{field.source}"
+            to_representation = field.to_representation
+        _add_value(values, lookup)
+
+        def extract(row):
+            value = row[lookup]
+            return None if value is None else to_representation(value)
+
+        return extract
+
+    def _compile_nested(self, field, model_field, prefix, values):
+        """A nested serializer of a foreign key reads the joined values."""
+        lookup = f"{prefix}{model_field.attname}"
+        _add_value(values, lookup)
+        extractors = self._compile(
+            field, model_field.related_model, f"{prefix}{field.source}__", values
+        )
+
+        def extract(row):
+            if row[lookup] is None:
+                return None
+            return {name: extract_nested(row) for name, extract_nested in extractors}
+
+        return extract
+
+    def _compile_many_related(self, field, model_field, prefix):
+        if prefix:
+            raise ImproperlyConfigured(f"{field.source} is nested in {prefix}")
+        through = model_field.remote_field.through
+        source_id = f"{model_field.m2m_field_name()}_id"
+        target = model_field.m2m_reverse_field_name()
+
+        lookups = [source_id]
+        serializer_class = getattr(field.child_relation, "serializer_class", None)
+        if serializer_class is None:
+            _add_value(lookups, f"{target}_id")
+
+            def extract_related(related_row):
+                return related_row[f"{target}_id"]
+
+        else:
+            extractors = self._compile(
+                serializer_class(), model_field.related_model, f"{target}__", lookups
+            )
+
+            def extract_related(related_row):
+                return {name: extract(related_row) for name, extract in extractors}
+
+        self.many_related[field.source] = (
+            through.objects.order_by(f"{target}_id"),
+            source_id,
+            lookups,
+            extract_related,
+        )
+        return lambda row: row[f"_many_{field.source}"]
+
+    def get_queryset(self, queryset):
+        """The rows with only the values the representation reads."""
+        return queryset.prefetch_related(None).values(*self.values)
+
+    def _add_many_related(self, rows):
+        """One query per many to many field for all the rows."""
+        pks = [row[self.pk_name] for row in rows]
+        for name, (
+            through_queryset,
+            source_id,
+            lookups,
+            extract_related,
+        ) in self.many_related.items():
+            related = defaultdict(list)
+            for related_row in through_queryset.filter(
+                **{f"{source_id}__in": pks}
+            ).values(*lookups):
+                related[related_row[source_id]].append(extract_related(related_row))
+            for row in rows:
+                row[f"_many_{name}"] = related[row[self.pk_name]]
+
+    def to_representation(self, rows) -> list:
+        rows = list(rows)
+        if self.many_related and rows:
+            self._add_many_related(rows)
+        extractors = self.extractors
+        return [{name: extract(row) for name, extract in extractors} for row in rows]
+
+    def get_row_object(self, row) -> RowObject:
+        return RowObject(self.model, row)
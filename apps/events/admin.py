@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from apps.events.models import Event, EventSeat, EventSeatType, EventTag
+from apps.events.models import (
+    Event,
+    EventSeat,
+    EventSeatInventory,
+    EventSeatType,
+    EventTag,
+)
 
 
 @admin.register(EventTag)
@@ -24,4 +30,11 @@ class EventSeatTypeAdmin(admin.ModelAdmin):
 class EventSeatAdmin(admin.ModelAdmin):
     list_display = ("event_seat_type", "seat_number")
     ordering = ("seat_number", "event_seat_type")
-    list_filter = ("event_seat_type__event", "seat_number")
+    list_filter = ("event", "seat_number")
+
+
+@admin.register(EventSeatInventory)
+class EventSeatInventoryAdmin(admin.ModelAdmin):
+    list_display = ("event", "event_seat_type", "total", "held", "sold")
+    list_filter = ("event",)
+    readonly_fields = ("event", "event_seat_type", "total", "held", "sold")
@@ -0,0 +1,12 @@
+from django_filters import rest_framework as filters
+
+from apps.events.models import EventSeat
+
+
+class EventSeatFilterSet(filters.FilterSet):
+    # filters on the event stored on the seat, which leads its keyset index
+    event_seat_type__event = filters.UUIDFilter(field_name="event")
+
+    class Meta:
+        model = EventSeat
+        fields = ("event_seat_type",)
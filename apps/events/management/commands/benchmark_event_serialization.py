@@ -0,0 +1,155 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.values_serializer import ValuesSerializer
+from apps.events.models import Event, EventSeat, EventTag
+from apps.events.views import EventSeatViewSet, EventViewSet
+from apps.venues.models import Venue
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares serializing rows with the serializers and with the values() "
+        "read path of event and event seat lists, on rows created in a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10_000,
+            help="Number of events and of event seats serialized",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of runs of each path, the fastest one is reported",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create_user(f"benchmark-{get_random_string(12)}")
+            event = self._seed(user, options["rows"])
+
+            for viewset, queryset in [
+                (
+                    EventViewSet,
+                    Event.objects.filter(user=user).prefetch_related(
+                        Prefetch("tags", queryset=EventTag.objects.order_by("id"))
+                    ),
+                ),
+                (
+                    EventSeatViewSet,
+                    EventSeat.objects.filter(event=event).select_related(
+                        "event_seat_type__event"
+                    ),
+                ),
+            ]:
+                self._benchmark(viewset, queryset, user, options)
+            transaction.set_rollback(True)
+
+    def _seed(self, user, rows) -> Event:
+        venue = Venue.objects.create(
+            name="Benchmark", address="Benchmark", location=Point(0, 0, srid=4326)
+        )
+        tags = EventTag.objects.bulk_create(
+            [EventTag(name=f"benchmark {index}") for index in range(3)]
+        )
+        start_date = timezone.now() + timedelta(days=1)
+        events = Event.objects.bulk_create(
+            [
+                Event(
+                    name=f"Benchmark {index}",
+                    user=user,
+                    venue=venue,
+                    start_date=start_date + timedelta(hours=index),
+                    end_date=start_date + timedelta(hours=index, minutes=30),
+                )
+                for index in range(rows)
+            ],
+            batch_size=5_000,
+        )
+        Event.tags.through.objects.bulk_create(
+            [
+                Event.tags.through(event=event, eventtag=tag)
+                for event in events
+                for tag in tags
+            ],
+            batch_size=5_000,
+        )
+
+        event = Event.objects.create(
+            name="Benchmark seats",
+            user=user,
+            venue=venue,
+            start_date=start_date - timedelta(hours=2),
+            end_date=start_date - timedelta(hours=1),
+        )
+        event_seat_type = event.event_seat_types.first()
+        EventSeat.objects.bulk_create(
+            [
+                EventSeat(event_seat_type=event_seat_type, seat_number=seat_number)
+                for seat_number in range(rows)
+            ],
+            batch_size=5_000,
+        )
+        return event
+
+    def _get_view(self, viewset, user):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user)
+        view = viewset(action="list", format_kwarg=None)
+        view.request = Request(request, authenticators=view.get_authenticators())
+        return view
+
+    def _benchmark(self, viewset, queryset, user, options):
+        view = self._get_view(viewset, user)
+        context = view.get_serializer_context()
+        serializer_class = view.get_serializer_class()
+        renderer = JSONRenderer()
+
+        def serialize():
+            return renderer.render(
+                serializer_class(
+                    queryset.order_by("id"), many=True, context=context
+                ).data
+            )
+
+        def serialize_values():
+            values_serializer = ValuesSerializer(serializer_class, context)
+            rows = values_serializer.get_queryset(queryset.order_by("id"))
+            return renderer.render(values_serializer.to_representation(rows))
+
+        outputs, seconds = {}, {}
+        for name, run in [("serializer", serialize), ("values", serialize_values)]:
+            runs = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                outputs[name] = run()
+                runs.append(time.perf_counter() - started)
+            seconds[name] = min(runs)
+        if outputs["serializer"] != outputs["values"]:
+            self.stderr.write(self.style.ERROR(f"{viewset.__name__} outputs differ"))
+
+        per_10k = 10_000 / options["rows"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{viewset.__name__} : serializer "
+                f"{seconds['serializer'] * per_10k * 1000:,.1f} ms / 10k rows, "
+                f"values {seconds['values'] * per_10k * 1000:,.1f} ms / 10k rows, "
+                f"{seconds['serializer'] / seconds['values']:.1f}x faster"
+            )
+        )
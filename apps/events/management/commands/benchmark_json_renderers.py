@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.models import uuid7
+from apps.core.renderers import ORJSONRenderer
+from apps.events.models import EventSeat, EventSeatType
+from apps.events.serializers import EventSeatSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares JSONRenderer and ORJSONRenderer on an event seat list "
+        "payload serialized from unsaved seats, no database is needed. Fails "
+        "when ORJSONRenderer is not faster."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=10_000, help="Number of seats in the payload"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of runs of each renderer, the fastest one is reported",
+        )
+
+    def handle(self, *args, **options):
+        data = {
+            "next": None,
+            "previous": None,
+            "results": EventSeatSerializer(
+                self._get_event_seats(options["rows"]), many=True
+            ).data,
+        }
+
+        outputs, seconds = {}, {}
+        for renderer in [JSONRenderer(), ORJSONRenderer()]:
+            name = type(renderer).__name__
+            runs = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                outputs[name] = renderer.render(data)
+                runs.append(time.perf_counter() - started)
+            seconds[name] = min(runs)
+        if outputs["JSONRenderer"] != outputs["ORJSONRenderer"]:
+            self.stderr.write(self.style.ERROR("outputs differ"))
+
+        per_10k = 10_000 / options["rows"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"JSONRenderer {seconds['JSONRenderer'] * per_10k * 1000:,.1f} "
+                f"ms / 10k seats, ORJSONRenderer "
+                f"{seconds['ORJSONRenderer'] * per_10k * 1000:,.1f} ms / 10k seats, "
+                f"{seconds['JSONRenderer'] / seconds['ORJSONRenderer']:.1f}x faster"
+            )
+        )
+        if seconds["ORJSONRenderer"] >= seconds["JSONRenderer"]:
+            raise CommandError("ORJSONRenderer is not faster than JSONRenderer")
+
+    def _get_event_seats(self, rows) -> list:
+        now = timezone.now()
+        event_seat_types = [
+            EventSeatType(
+                id=uuid7(),
+                event_id=uuid7(),
+                created=now,
+                updated=now,
+                **seat_type,
+            )
+            for seat_type in EventSeatType.DEFAULT_SEAT_TYPES
+        ]
+        return [
+            EventSeat(
+                id=uuid7(),
+                event_seat_type=event_seat_types[seat_number % len(event_seat_types)],
+                seat_number=seat_number,
+                created=now,
+                updated=now,
+            )
+            for seat_number in range(rows)
+        ]
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from apps.events.models import Event, EventSeatInventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the seat inventory counters of events from EventSeat and "
+        "ReservationEventSeat, one chunk of events per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            nargs="+",
+            help="Only reconcile the events with these ids",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of events reconciled in one transaction",
+        )
+
+    def handle(self, *args, **options):
+        event_ids = Event.objects.order_by("id").values_list("id", flat=True)
+        if options["events"]:
+            event_ids = event_ids.filter(id__in=options["events"])
+
+        chunk_size = options["chunk_size"]
+        number_of_events = 0
+        last_event_id = None
+        while True:
+            chunk = event_ids
+            if last_event_id is not None:
+                chunk = chunk.filter(id__gt=last_event_id)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+
+            EventSeatInventory.objects.rebuild(chunk)
+            number_of_events += len(chunk)
+            last_event_id = chunk[-1]
+            self.stdout.write(f"Reconciled {number_of_events} events")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seat inventories of {number_of_events} events reconciled"
+            )
+        )
@@ -1,4 +1,8 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db import models, transaction
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import Cast, Greatest
+from ordered_model.models import OrderedModelQuerySet
 
 
 class EventManager(models.Manager):
@@ -10,10 +14,220 @@ class EventManager(models.Manager):
 
     @transaction.atomic
     def _create_default_event_seat_types(self, event):
-        from apps.events.models import EventSeatType
+        from apps.core.response_cache import response_cache
+        from apps.events.models import EventSeatInventory, EventSeatType
 
         event_seat_types = [
             EventSeatType(event=event, name=seat_type["name"], price=seat_type["price"])
             for seat_type in EventSeatType.DEFAULT_SEAT_TYPES
         ]
         EventSeatType.objects.bulk_create(event_seat_types)
+
+        # bulk_create doesn't send post_save, so inventories are created here
+        EventSeatInventory.objects.create_for_event_seat_types(event_seat_types)
+        response_cache.invalidate(EventSeatType)
+
+    def search(self, search_query, queryset=None):
+        """
+        Events matching the web search syntax query on their search vector,
+        annotated with their rank. The rank is cast from real to double so
+        it compares equal to itself in a cursor.
+        """
+        queryset = self.all() if queryset is None else queryset
+        query = SearchQuery(
+            search_query, search_type="websearch", config=self.model.SEARCH_CONFIG
+        )
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+
+    def get_nearby(self, point, radius, start_date_from, start_date_to):
+        """
+        Events that are not completed, start in [start_date_from,
+        start_date_to) and whose venue is within radius meters of the point,
+        annotated with their distance in meters.
+        """
+        from apps.venues.geo import (
+            DWithin,
+            KNNDistance,
+            as_geography,
+            get_geography_point,
+        )
+
+        geography_point = get_geography_point(point)
+        venue_location = as_geography("venue__location")
+        return (
+            self.filter(
+                DWithin(venue_location, geography_point, Value(float(radius))),
+                status__in=[self.model.Status.CREATED, self.model.Status.RUNNING],
+                start_date__gte=start_date_from,
+                start_date__lt=start_date_to,
+            )
+            .annotate(distance=KNNDistance(venue_location, geography_point))
+            .select_related("user", "venue")
+            .prefetch_related("tags")
+        )
+
+
+class EventSeatTypeQuerySet(models.QuerySet):
+    @transaction.atomic
+    def delete(self):
+        """Deletes the event seat types, their seats are deleted first to be counted."""
+        from apps.events.models import EventSeat
+
+        EventSeat.objects.filter(event_seat_type__in=self.values("pk")).delete()
+        return super().delete()
+
+
+class EventSeatQuerySet(OrderedModelQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            if obj.event_id is None:
+                obj.event_id = obj.event_seat_type.event_id
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def remove_from_inventories(self):
+        """
+        Deletes the reservation event seats of the seats and moves the totals
+        of their event seat types down, one UPDATE per event seat type. Seat
+        maps of their events are rebuilt after commit.
+        """
+        from apps.events.models import EventSeatInventory
+        from apps.events.seat_map import seat_map_store
+        from apps.reservations.models import ReservationEventSeat
+
+        ReservationEventSeat.objects.filter(event_seat__in=self.values("pk")).delete()
+
+        event_ids = set()
+        for event_id, event_seat_type_id, seats in sorted(
+            self.order_by()
+            .values_list("event_id", "event_seat_type_id")
+            .annotate(seats=Count("id"))
+        ):
+            EventSeatInventory.objects.add(event_id, event_seat_type_id, total=-seats)
+            event_ids.add(event_id)
+        for event_id in event_ids:
+            seat_map_store.invalidate_on_commit(event_id)
+
+    @transaction.atomic
+    def delete(self):
+        self.remove_from_inventories()
+        return super().delete()
+
+
+class EventSeatInventoryManager(models.Manager):
+    def create_for_event(self, event):
+        return self.get_or_create(event=event, event_seat_type=None)[0]
+
+    def create_for_event_seat_types(self, event_seat_types):
+        return self.bulk_create(
+            [
+                self.model(
+                    event_id=event_seat_type.event_id, event_seat_type=event_seat_type
+                )
+                for event_seat_type in event_seat_types
+            ],
+            ignore_conflicts=True,
+        )
+
+    def get_for_event(self, event):
+        return self.filter(event=event, event_seat_type__isnull=True).first()
+
+    def add(self, event_id, event_seat_type_id, total=0, held=0, sold=0):
+        """
+        Moves the counters of an event seat type and of its event by the given
+        deltas with a single UPDATE. Counters never go below zero, drift is
+        fixed by the reconcile_seat_inventories command.
+        """
+        if not (total or held or sold):
+            return 0
+
+        return self.filter(
+            Q(event_seat_type_id=event_seat_type_id)
+            | Q(event_id=event_id, event_seat_type__isnull=True)
+        ).update(
+            total=Greatest(F("total") + total, 0),
+            held=Greatest(F("held") + held, 0),
+            sold=Greatest(F("sold") + sold, 0),
+        )
+
+    @transaction.atomic
+    def rebuild(self, event_ids):
+        """
+        Recomputes the counters of the given events from EventSeat and
+        ReservationEventSeat and overwrites the stored ones. The inventories
+        are locked before the seats are counted, so add() of another
+        transaction either committed before the counts or waits for them.
+        """
+        from apps.events.models import EventSeatType
+        from apps.reservations.models import Reservation, ReservationEventSeat
+
+        event_ids = list(event_ids)
+
+        self.bulk_create(
+            [self.model(event_id=event_id) for event_id in event_ids]
+            + [
+                self.model(event_id=event_id, event_seat_type_id=event_seat_type_id)
+                for event_seat_type_id, event_id in EventSeatType.objects.filter(
+                    event_id__in=event_ids
+                ).values_list("id", "event_id")
+            ],
+            ignore_conflicts=True,
+        )
+        # same order as _add_to_seat_inventories locks them
+        inventories = list(
+            self.select_for_update()
+            .filter(event_id__in=event_ids)
+            .order_by("event_id", "event_seat_type_id")
+        )
+
+        event_seat_types = list(
+            EventSeatType.objects.filter(event_id__in=event_ids)
+            .annotate(total=Count("event_seats"))
+            .values("id", "event_id", "total")
+        )
+        reservation_counters = {
+            row["event_seat__event_seat_type_id"]: row
+            for row in ReservationEventSeat.objects.filter(
+                reservation__event_id__in=event_ids
+            )
+            .values("event_seat__event_seat_type_id")
+            .annotate(
+                held=Count(
+                    "id", filter=Q(reservation__status__in=Reservation.HELD_STATUSES)
+                ),
+                sold=Count(
+                    "id", filter=Q(reservation__status=Reservation.Status.RESERVED)
+                ),
+            )
+        }
+
+        counters = {}
+        for event_seat_type in event_seat_types:
+            reservation_counter = reservation_counters.get(event_seat_type["id"], {})
+            counter = {
+                "total": event_seat_type["total"],
+                "held": reservation_counter.get("held", 0),
+                "sold": reservation_counter.get("sold", 0),
+            }
+            counters[event_seat_type["id"]] = counter
+
+            event_counter = counters.setdefault(
+                (event_seat_type["event_id"], None),
+                {"total": 0, "held": 0, "sold": 0},
+            )
+            for key, value in counter.items():
+                event_counter[key] += value
+
+        for inventory in inventories:
+            if inventory.event_seat_type_id is None:
+                counter = counters.get((inventory.event_id, None), {})
+            else:
+                counter = counters.get(inventory.event_seat_type_id, {})
+            inventory.total = counter.get("total", 0)
+            inventory.held = counter.get("held", 0)
+            inventory.sold = counter.get("sold", 0)
+
+        self.bulk_update(inventories, fields=["total", "held", "sold"])
+        return inventories
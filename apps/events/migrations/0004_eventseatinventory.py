@@ -0,0 +1,119 @@
+# Generated by Django 4.0 on 2026-10-18 09:12
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def create_event_seat_inventories(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventSeatType = apps.get_model("events", "EventSeatType")
+    EventSeatInventory = apps.get_model("events", "EventSeatInventory")
+    ReservationEventSeat = apps.get_model("reservations", "ReservationEventSeat")
+
+    reservation_counters = {
+        row["event_seat__event_seat_type_id"]: row
+        for row in ReservationEventSeat.objects.values(
+            "event_seat__event_seat_type_id"
+        ).annotate(
+            held=Count("id", filter=Q(reservation__status__in=[1, 3, 4])),
+            sold=Count("id", filter=Q(reservation__status=5)),
+        )
+    }
+
+    event_seat_inventories = {
+        event_id: EventSeatInventory(event_id=event_id)
+        for event_id in Event.objects.values_list("id", flat=True).iterator()
+    }
+    event_seat_type_seat_inventories = []
+    for event_seat_type in (
+        EventSeatType.objects.annotate(total=Count("event_seats"))
+        .values("id", "event_id", "total")
+        .iterator()
+    ):
+        reservation_counter = reservation_counters.get(event_seat_type["id"], {})
+        event_seat_type_seat_inventory = EventSeatInventory(
+            event_id=event_seat_type["event_id"],
+            event_seat_type_id=event_seat_type["id"],
+            total=event_seat_type["total"],
+            held=reservation_counter.get("held", 0),
+            sold=reservation_counter.get("sold", 0),
+        )
+        event_seat_type_seat_inventories.append(event_seat_type_seat_inventory)
+
+        event_seat_inventory = event_seat_inventories[event_seat_type["event_id"]]
+        event_seat_inventory.total += event_seat_type_seat_inventory.total
+        event_seat_inventory.held += event_seat_type_seat_inventory.held
+        event_seat_inventory.sold += event_seat_type_seat_inventory.sold
+
+    EventSeatInventory.objects.bulk_create(
+        [*event_seat_inventories.values(), *event_seat_type_seat_inventories],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "reservations",
+            "0006_remove_reservationeventseat_reservations_reservationeventseat_unique_reservation_event_seat_and_more",
+        ),
+        ("events", "0003_event_events_event_start_date_is_lt_end_date_and_now"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSeatInventory",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("held", models.PositiveIntegerField(default=0)),
+                ("sold", models.PositiveIntegerField(default=0)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seat_inventories",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "event_seat_type",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seat_inventory",
+                        to="events.eventseattype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "event seat inventories",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="eventseatinventory",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("event_seat_type__isnull", True)),
+                fields=("event",),
+                name="events_eventseatinventory_unique_event_level_inventory",
+            ),
+        ),
+        migrations.RunPython(
+            create_event_seat_inventories, reverse_code=migrations.RunPython.noop
+        ),
+    ]
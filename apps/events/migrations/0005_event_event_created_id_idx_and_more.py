@@ -0,0 +1,23 @@
+# Generated by Django 4.0 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_eventseatinventory"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["created", "id"], name="event_created_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="eventseat",
+            index=models.Index(
+                fields=["seat_number", "id"], name="event_seat_number_id_idx"
+            ),
+        ),
+    ]
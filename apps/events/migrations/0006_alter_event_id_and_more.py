@@ -0,0 +1,65 @@
+# Generated by Django 4.0 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_event_created_id_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="event",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventseat",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventseatinventory",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventseattype",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventtag",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.0 on 2026-10-18 13:10
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_alter_event_id_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="event",
+            name="events_event_start_date_is_lt_end_date_and_now",
+        ),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("start_date__lt", django.db.models.expressions.F("end_date"))
+                ),
+                name="events_event_start_date_is_lt_end_date",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                condition=models.Q(("status", 1)),
+                fields=["status", "start_date"],
+                name="event_due_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                condition=models.Q(("status", 2)),
+                fields=["status", "end_date"],
+                name="event_due_end_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0 on 2026-10-18 14:05
+
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+import apps.events.models.event
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_remove_event_start_date_is_lt_end_date_and_now_and_more"),
+    ]
+
+    operations = [
+        # gist index on the venue equality
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ("venue", "="),
+                    (
+                        apps.events.models.event.TsTzRange("start_date", "end_date"),
+                        "&&",
+                    ),
+                ],
+                name="events_event_venue_is_not_double_booked",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0008_event_venue_is_not_double_booked"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["venue", "start_date"], name="event_venue_start_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.0 on 2026-10-18 16:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_event_seat_events(apps, schema_editor):
+    EventSeat = apps.get_model("events", "EventSeat")
+    EventSeatType = apps.get_model("events", "EventSeatType")
+    EventSeat.objects.update(
+        event_id=Subquery(
+            EventSeatType.objects.filter(id=OuterRef("event_seat_type_id")).values(
+                "event_id"
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0010_event_search_vector_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventseat",
+            name="event",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="event_seats",
+                to="events.event",
+            ),
+        ),
+        migrations.RunPython(fill_event_seat_events, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="eventseat",
+            name="event",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="event_seats",
+                to="events.event",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="eventseat",
+            name="event_seat_number_id_idx",
+        ),
+        migrations.AlterField(
+            model_name="eventseat",
+            name="seat_number",
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="eventseat",
+            index=models.Index(
+                fields=["event", "seat_number", "id"],
+                name="event_seat_event_number_id_idx",
+            ),
+        ),
+    ]
@@ -2,5 +2,6 @@ from apps.events.models.event_tag import EventTag
 from apps.events.models.event import Event
 from apps.events.models.event_seat_type import EventSeatType
 from apps.events.models.event_seat import EventSeat
+from apps.events.models.event_seat_inventory import EventSeatInventory
 
-__all__ = ["EventTag", "Event", "EventSeatType", "EventSeat"]
+__all__ = ["EventTag", "Event", "EventSeatType", "EventSeat", "EventSeatInventory"]
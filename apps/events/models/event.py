@@ -1,7 +1,10 @@
 from django.contrib.auth.models import User
-from django.contrib.postgres.functions import TransactionNow
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from django.db.models import F, Q
+from django.db.models import F, Func, Q, Value
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.fields import AutoSlugField
 
@@ -11,6 +14,11 @@ from apps.events.models import EventTag
 from apps.venues.models import Venue
 
 
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
 class Event(BaseModel):
     class Status(models.IntegerChoices):
         CREATED = 1, "Created"
@@ -18,6 +26,10 @@ class Event(BaseModel):
         COMPLETED = 3, "Completed"
         COMPLETED_WITH_ERROR = 4, "Completed with error"
 
+    # name of the exclusion constraint violated by overlapping events of a venue
+    VENUE_IS_DOUBLE_BOOKED = "events_event_venue_is_not_double_booked"
+    SEARCH_CONFIG = "english"
+
     name = models.CharField(max_length=256)
     slug = AutoSlugField(populate_from=["name"])
     description = models.TextField(blank=True)
@@ -29,20 +41,78 @@ class Event(BaseModel):
     status = models.SmallIntegerField(choices=Status.choices, default=Status.CREATED)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
+    # weighted name and description, written by save()
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = EventManager()
 
     class Meta:
+        indexes = [
+            models.Index(fields=["created", "id"], name="event_created_id_idx"),
+            GinIndex(fields=["search_vector"], name="event_search_vector_idx"),
+            models.Index(
+                fields=["venue", "start_date"], name="event_venue_start_date_idx"
+            ),
+            # due events are found by the transition sweepers
+            models.Index(
+                fields=["status", "start_date"],
+                condition=Q(status=1),
+                name="event_due_start_idx",
+            ),
+            models.Index(
+                fields=["status", "end_date"],
+                condition=Q(status=2),
+                name="event_due_end_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
-                check=Q(start_date__lt=F("end_date"), start_date__gt=TransactionNow()),
-                name="%(app_label)s_%(class)s_start_date_is_lt_end_date_and_now",
-            )
+                check=Q(start_date__lt=F("end_date")),
+                name="%(app_label)s_%(class)s_start_date_is_lt_end_date",
+            ),
+            # a venue hosts one event at a time, back to back events are fine
+            ExclusionConstraint(
+                name="%(app_label)s_%(class)s_venue_is_not_double_booked",
+                expressions=[
+                    ("venue", RangeOperators.EQUAL),
+                    (TsTzRange("start_date", "end_date"), RangeOperators.OVERLAPS),
+                ],
+            ),
         ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        event = super().from_db(db, field_names, values)
+        loaded_values = dict(zip(field_names, values))
+        event._loaded_dates = (
+            loaded_values.get("start_date"),
+            loaded_values.get("end_date"),
+        )
+        return event
+
+    @classmethod
+    def get_search_vector(cls, name="name", description="description"):
+        return SearchVector(name, weight="A", config=cls.SEARCH_CONFIG) + SearchVector(
+            description, weight="B", config=cls.SEARCH_CONFIG
+        )
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or {"name", "description"} & set(update_fields):
+            # from the values, so an INSERT writes it too and no UPDATE follows
+            self.search_vector = self.get_search_vector(
+                Value(self.name), Value(self.description)
+            )
+            if update_fields is not None:
+                update_fields = {*update_fields, "search_vector"}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def is_rescheduled(self) -> bool:
+        """Whether the dates changed since the event was loaded or saved."""
+        return getattr(self, "_loaded_dates", None) != (self.start_date, self.end_date)
+
     @staticmethod
     def has_read_permission(request):
         return True
@@ -55,43 +125,49 @@ class Event(BaseModel):
         return True
 
     def has_object_write_permission(self, request):
-        if self.user == request.user:
-            return True
-        return False
+        return self.user_id == request.user.id
 
     def get_event_seats(self):
         from apps.events.models import EventSeat
 
         event = self
         return EventSeat.objects.select_related("event_seat_type__event").filter(
-            event_seat_type__event=event
+            event=event
         )
 
     def get_reserved_event_seats(self):
-        from apps.reservations.models import Reservation, ReservationEventSeat
+        from apps.events.models import EventSeat
+        from apps.reservations.models import Reservation
 
-        event = self
-        reserved_event_seats_of_a_event = [
-            reservation_event_seat.event_seat
-            for reservation_event_seat in ReservationEventSeat.objects.select_related(
-                "event_seat__event_seat_type",
-            ).filter(
-                reservation__status=Reservation.Status.RESERVED,
-                reservation__event=event,
-            )
-        ]
+        return EventSeat.objects.select_related("event_seat_type").filter(
+            reservations__reservation__status=Reservation.Status.RESERVED,
+            reservations__reservation__event=self,
+        )
 
-        return reserved_event_seats_of_a_event
+    def is_houseful(self) -> bool:
+        from apps.events.models import EventSeatInventory
+
+        event_seat_inventory = EventSeatInventory.objects.get_for_event(self)
+        if event_seat_inventory is None:
+            return not self.get_event_seats().exists()
+        return event_seat_inventory.is_houseful()
+
+    def get_status_error(self):
+        if self.status == Event.Status.COMPLETED:
+            return {"status": _("Event is complete")}
+
+        elif self.status == Event.Status.COMPLETED_WITH_ERROR:
+            return {"status": _("Event has completed with errors")}
+
+        return None
 
     def is_eligible_for_reservation(self):
         event = self
-        if event.status == Event.Status.COMPLETED:
-            return False, _("Event is complete")
-
-        elif event.status == Event.Status.COMPLETED_WITH_ERROR:
-            return False, _("Event has completed with errors")
+        status_error = event.get_status_error()
+        if status_error:
+            return False, status_error["status"]
 
-        elif len(event.get_event_seats()) == len(event.get_reserved_event_seats()):
+        elif event.is_houseful():
             return False, _("Event is houseful")
 
         return True, _("Ready for reservation")
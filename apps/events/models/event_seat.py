@@ -1,8 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from ordered_model.models import OrderedModelBase
 
 from apps.core.models import BaseModel
-from apps.events.models import EventSeatType
+from apps.events.managers import EventSeatQuerySet
+from apps.events.models import Event, EventSeatType
 
 
 class EventSeat(BaseModel, OrderedModelBase):
@@ -10,17 +11,40 @@ class EventSeat(BaseModel, OrderedModelBase):
     event_seat_type = models.ForeignKey(
         EventSeatType, on_delete=models.CASCADE, related_name="event_seats"
     )
-    seat_number = models.PositiveIntegerField(editable=False, db_index=True)
+    # event of the seat type, stored so seats of an event are read from an index
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="event_seats", editable=False
+    )
+    seat_number = models.PositiveIntegerField(editable=False)
 
     order_field_name = "seat_number"
-    order_with_respect_to = "event_seat_type__event"
+    order_with_respect_to = "event_id"
+
+    objects = EventSeatQuerySet.as_manager()
 
     class Meta:
         ordering = ("seat_number",)
+        indexes = [
+            models.Index(
+                fields=["event", "seat_number", "id"],
+                name="event_seat_event_number_id_idx",
+            )
+        ]
 
     def __str__(self):
         return f"{self.event_seat_type} | {str(self.seat_number)}"
 
+    def save(self, *args, **kwargs):
+        if self.event_id is None:
+            self.event_id = self.event_seat_type.event_id
+        super().save(*args, **kwargs)
+
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        # seat numbers after the deleted seat are shifted by OrderedModelBase
+        EventSeat.objects.filter(pk=self.pk).remove_from_inventories()
+        return super().delete(*args, **kwargs)
+
     @staticmethod
     def has_read_permission(request):
         return True
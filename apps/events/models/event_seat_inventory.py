@@ -0,0 +1,51 @@
+from django.db import models
+from django.db.models import Q
+
+from apps.core.models import BaseModel
+from apps.events.managers import EventSeatInventoryManager
+from apps.events.models import Event, EventSeatType
+
+
+class EventSeatInventory(BaseModel):
+    """
+    Seat counters of an event, kept up to date in the same transaction as the
+    changes of seats, reservation seats and reservation statuses.
+    The row without event_seat_type holds the counters of the whole event,
+    others hold the counters of a single event seat type.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="seat_inventories"
+    )
+    event_seat_type = models.OneToOneField(
+        EventSeatType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="seat_inventory",
+    )
+    total = models.PositiveIntegerField(default=0)
+    held = models.PositiveIntegerField(default=0)
+    sold = models.PositiveIntegerField(default=0)
+
+    objects = EventSeatInventoryManager()
+
+    class Meta:
+        verbose_name_plural = "event seat inventories"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event"],
+                condition=Q(event_seat_type__isnull=True),
+                name="%(app_label)s_%(class)s_unique_event_level_inventory",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.event_seat_type or self.event} | {self.sold}/{self.total}"
+
+    @property
+    def available(self) -> int:
+        return max(self.total - self.sold, 0)
+
+    def is_houseful(self) -> bool:
+        return self.sold >= self.total
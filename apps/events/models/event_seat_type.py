@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 
 from apps.core.models import BaseModel
+from apps.events.managers import EventSeatTypeQuerySet
 from apps.events.models import Event
 
 
@@ -19,9 +20,19 @@ class EventSeatType(BaseModel):
     price = models.PositiveIntegerField(default=0)
     info = models.CharField(max_length=150, blank=True)
 
+    objects = EventSeatTypeQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.event.name} | {self.name}"
 
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        from apps.events.models import EventSeat
+
+        # seats are deleted first so they leave the event seat inventory
+        EventSeat.objects.filter(event_seat_type=self).delete()
+        return super().delete(*args, **kwargs)
+
     @staticmethod
     def has_read_permission(request):
         return True
@@ -34,6 +45,4 @@ class EventSeatType(BaseModel):
         return True
 
     def has_object_write_permission(self, request):
-        if self.event.user == request.user:
-            return True
-        return False
+        return self.event.user_id == request.user.id
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django_extensions.db.fields import AutoSlugField
 
 from apps.core.models import BaseModel
@@ -8,6 +10,15 @@ class EventTag(BaseModel):
     name = models.CharField(max_length=200)
     slug = AutoSlugField(populate_from=["name"])
 
+    class Meta:
+        indexes = [
+            # serves the case insensitive prefix search of the tag autocomplete
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="event_tag_name_trgm_idx",
+            )
+        ]
+
     def __str__(self):
         return self.name
 
@@ -0,0 +1,245 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.events.seat_map import SeatMap, seat_map_store
+
+
+class FreeRunIndex:
+    """
+    Runs of consecutive free seat numbers as (length, start, free_before,
+    free_after), sorted so the smallest run that fits a number of seats is
+    found with a binary search. free_before and free_after count the free
+    seats right around the run (up to 2), they are of other event seat types
+    when the index is of one type. The starts of the runs are kept sorted
+    too, so the runs around changed seats are found with binary searches.
+    """
+
+    def __init__(self, runs=()):
+        self.runs = sorted(runs)
+        self._runs_by_start = {run[1]: run for run in self.runs}
+        self._starts = sorted(self._runs_by_start)
+
+    def copy(self):
+        return FreeRunIndex(self.runs)
+
+    @staticmethod
+    def _get_runs(seat_map, seat_numbers):
+        """Runs of the free seats of seat_numbers, which must be sorted."""
+        runs = []
+        start = previous = None
+        for seat_number in seat_numbers:
+            if (
+                seat_number >= seat_map.size
+                or seat_map.get(seat_number) != SeatMap.FREE
+            ):
+                continue
+            if previous is not None and seat_number == previous + 1:
+                previous = seat_number
+                continue
+            if start is not None:
+                runs.append((start, previous))
+            start = previous = seat_number
+        if start is not None:
+            runs.append((start, previous))
+        return [
+            (
+                end - start + 1,
+                start,
+                seat_map.count_free(start - 1, -1),
+                seat_map.count_free(end + 1, 1),
+            )
+            for start, end in runs
+        ]
+
+    @classmethod
+    def from_seat_numbers(cls, seat_map, seat_numbers):
+        """seat_numbers are the sorted seat numbers of the index."""
+        return cls(cls._get_runs(seat_map, seat_numbers))
+
+    def get_spans(self, changed_seat_numbers):
+        """
+        Seat number ranges to scan again after the seats changed : around
+        every changed seat, widened to the runs they touch, merged.
+        """
+        spans = []
+        for seat_number in changed_seat_numbers:
+            low, high = seat_number - 2, seat_number + 2
+            spans.append((low, high))
+            # runs don't overlap, the ends of the runs starting up to high
+            # are sorted too
+            index = bisect_right(self._starts, high) - 1
+            while index >= 0:
+                length, start, _, _ = self._runs_by_start[self._starts[index]]
+                if start + length - 1 < low:
+                    break
+                spans.append((start, start + length - 1))
+                index -= 1
+        merged = []
+        for low, high in sorted(spans):
+            if merged and low <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+            else:
+                merged.append((low, high))
+        return merged
+
+    def update(self, seat_map, spans, seat_numbers):
+        """
+        Replaces the runs within spans by the runs of the sorted seat_numbers
+        of the index in spans.
+        """
+        # runs touching the spans were widened into them, others are outside
+        for low, high in spans:
+            first = bisect_left(self._starts, low)
+            last = bisect_right(self._starts, high)
+            for start in self._starts[first:last]:
+                run = self._runs_by_start.pop(start)
+                del self.runs[bisect_left(self.runs, run)]
+            del self._starts[first:last]
+
+        for run in self._get_runs(seat_map, seat_numbers):
+            insort(self.runs, run)
+            insort(self._starts, run[1])
+            self._runs_by_start[run[1]] = run
+
+    def find(self, count):
+        """
+        Returns the first seat number of the best block of count adjacent
+        seats or None. Runs are tried from the smallest that fits, found with
+        a binary search, a block is taken that leaves no single free seat on
+        either side, the rule of the final validation of a reservation. When
+        the smallest runs can't take one, the next runs are tried in turn.
+        """
+        for index in range(bisect_left(self.runs, (count,)), len(self.runs)):
+            length, start, free_before, free_after = self.runs[index]
+            for offset in sorted({0, 1, 2, length - count}):
+                if offset <= length - count and 1 not in (
+                    free_before + offset,
+                    free_after + length - count - offset,
+                ):
+                    return start + offset
+        return None
+
+
+class BestSeatsFinder:
+    """
+    Keeps a FreeRunIndex per event (and optionally per event seat type) in
+    the cache with the version of the seat map it was built from, and the
+    last ones used in a small in-process LRU cache, so a search of an
+    unchanged map reads no index. When the map changed, the index is
+    patched around the seats changed since that version, it is only built
+    again from all seats when they are not known.
+    """
+
+    timeout = 60 * 60
+    max_size = 256
+
+    def __init__(self):
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, event_id, event_seat_type_id):
+        return f"events:free_runs:{event_id}:{event_seat_type_id}"
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._indexes.get(key)
+            if entry is not None:
+                self._indexes.move_to_end(key)
+            return entry
+
+    def _set_local(self, key, version, free_run_index):
+        with self._lock:
+            self._indexes[key] = (version, free_run_index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+
+    def _get_seat_numbers(self, seat_map, event_id, event_seat_type_id, spans=None):
+        from apps.events.models import EventSeat
+
+        if event_seat_type_id is None:
+            # every seat of the event is on the map
+            ranges = spans or [(0, seat_map.size - 1)]
+            return (
+                seat_number
+                for low, high in ranges
+                for seat_number in range(max(low, 0), min(high, seat_map.size - 1) + 1)
+                if seat_map.get(seat_number) != SeatMap.NO_SEAT
+            )
+
+        event_seats = EventSeat.objects.filter(
+            event_id=event_id, event_seat_type_id=event_seat_type_id
+        )
+        if spans is not None:
+            in_spans = Q()
+            for low, high in spans:
+                in_spans |= Q(seat_number__range=(low, high))
+            event_seats = event_seats.filter(in_spans)
+        return (
+            event_seats.order_by("seat_number")
+            .values_list("seat_number", flat=True)
+            .iterator()
+        )
+
+    def _build(self, seat_map, event_id, event_seat_type_id):
+        return FreeRunIndex.from_seat_numbers(
+            seat_map, self._get_seat_numbers(seat_map, event_id, event_seat_type_id)
+        )
+
+    def get_index(self, event_id, event_seat_type_id=None) -> FreeRunIndex:
+        seat_map = seat_map_store.get(event_id)
+        if seat_map.version is None:
+            return self._build(seat_map, event_id, event_seat_type_id)
+
+        key = self._key(event_id, event_seat_type_id)
+        local = self._get_local(key)
+        if local is not None and local[0] == seat_map.version:
+            return local[1]
+
+        cached = cache.get(key)
+        if cached is not None and cached[0] == seat_map.version:
+            free_run_index = FreeRunIndex(cached[1])
+            self._set_local(key, seat_map.version, free_run_index)
+            return free_run_index
+
+        # the local index is patched on a copy, other threads may search it
+        if local is not None:
+            version, free_run_index = local[0], local[1].copy()
+        elif cached is not None:
+            version, free_run_index = cached[0], FreeRunIndex(cached[1])
+        else:
+            version = free_run_index = None
+        changed_seat_numbers = (
+            None
+            if version is None
+            else seat_map_store.get_changes(event_id, version, seat_map.version)
+        )
+        if changed_seat_numbers is None:
+            free_run_index = self._build(seat_map, event_id, event_seat_type_id)
+        else:
+            spans = free_run_index.get_spans(changed_seat_numbers)
+            if spans:
+                free_run_index.update(
+                    seat_map,
+                    spans,
+                    self._get_seat_numbers(
+                        seat_map, event_id, event_seat_type_id, spans
+                    ),
+                )
+        cache.set(key, (seat_map.version, free_run_index.runs), self.timeout)
+        self._set_local(key, seat_map.version, free_run_index)
+        return free_run_index
+
+    def find(self, event_id, count, event_seat_type_id=None):
+        """Returns the seat numbers of the best count adjacent free seats."""
+        start = self.get_index(event_id, event_seat_type_id).find(count)
+        if start is None:
+            return []
+        return list(range(start, start + count))
+
+
+best_seats_finder = BestSeatsFinder()
@@ -0,0 +1,267 @@
+import base64
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+
+
+class SeatMap:
+    """
+    Availability of all seats of an event packed into 2 bits per seat,
+    indexed by seat_number. version changes with every write to the cache.
+    """
+
+    FREE = 0
+    HELD = 1
+    SOLD = 2
+    NO_SEAT = 3
+
+    STATES = {"free": FREE, "held": HELD, "sold": SOLD, "no_seat": NO_SEAT}
+
+    def __init__(self, size, data=None, version=None):
+        self.size = size
+        self.data = bytearray(data) if data is not None else self._empty_data(size)
+        self.version = version
+
+    @staticmethod
+    def _empty_data(size):
+        # every seat starts as NO_SEAT (0b11) until it is set
+        return bytearray(b"\xff" * ((size + 3) // 4))
+
+    def get(self, seat_number) -> int:
+        byte, shift = divmod(seat_number, 4)
+        return (self.data[byte] >> (shift * 2)) & 0b11
+
+    def set(self, seat_number, state):
+        byte, shift = divmod(seat_number, 4)
+        self.data[byte] = (self.data[byte] & ~(0b11 << (shift * 2))) | (
+            state << (shift * 2)
+        )
+
+    def count_free(self, seat_number, step, limit=2) -> int:
+        """Free seats in a row from seat_number on by step, counted up to limit."""
+        count = 0
+        while (
+            count < limit
+            and 0 <= seat_number < self.size
+            and self.get(seat_number) == self.FREE
+        ):
+            count += 1
+            seat_number += step
+        return count
+
+    def leaves_single_seat(self, first_seat_number, last_seat_number) -> bool:
+        """Whether taking the seats in between leaves 1 free seat on a side."""
+        return 1 in (
+            self.count_free(first_seat_number - 1, -1),
+            self.count_free(last_seat_number + 1, 1),
+        )
+
+    def to_cache(self) -> tuple:
+        self.version = uuid.uuid4().hex
+        return self.size, bytes(self.data), self.version
+
+    def to_runs(self) -> list:
+        """Flat run-length encoding : [state, length, state, length, ...]."""
+        runs = []
+        for seat_number in range(self.size):
+            state = self.get(seat_number)
+            if runs and runs[-2] == state:
+                runs[-1] += 1
+            else:
+                runs.extend((state, 1))
+        return runs
+
+    def to_base64(self) -> str:
+        return base64.b64encode(bytes(self.data)).decode()
+
+    def counts(self) -> dict:
+        counts = dict.fromkeys(self.STATES, 0)
+        names = {state: name for name, state in self.STATES.items()}
+        for seat_number in range(self.size):
+            counts[names[self.get(seat_number)]] += 1
+        return counts
+
+
+def _get_event_seat_states(queryset):
+    from apps.reservations.models import Reservation, ReservationEventSeat
+
+    reservation_event_seats = ReservationEventSeat.objects.filter(
+        event_seat=OuterRef("pk")
+    )
+    return queryset.annotate(
+        is_sold=Exists(
+            reservation_event_seats.filter(
+                reservation__status=Reservation.Status.RESERVED
+            )
+        ),
+        is_held=Exists(
+            reservation_event_seats.filter(
+                reservation__status__in=Reservation.HELD_STATUSES
+            )
+        ),
+    ).values_list("seat_number", "is_sold", "is_held")
+
+
+def _get_state(is_sold, is_held):
+    if is_sold:
+        return SeatMap.SOLD
+    elif is_held:
+        return SeatMap.HELD
+    return SeatMap.FREE
+
+
+class SeatMapStore:
+    """
+    Keeps one SeatMap per event in the cache. Maps are built once from the
+    database and then patched for the seats whose reservations changed.
+    Writers serialize on a per-event lock, a writer that can't get the lock
+    marks the map stale so the next reader rebuilds it. While a reader
+    rebuilds a map, the others read the stale one or wait for the new one
+    a moment before building it themselves. Every patch records
+    the seat numbers it changed under the new version, so what is derived
+    from a map is patched too instead of being derived again.
+    """
+
+    timeout = 60 * 60
+    lock_timeout = 5
+    lock_wait_seconds = 1
+    max_changes_steps = 50
+
+    def _key(self, event_id):
+        return f"events:seat_map:{event_id}"
+
+    def _lock_key(self, event_id):
+        return f"events:seat_map:{event_id}:lock"
+
+    def _stale_key(self, event_id):
+        return f"events:seat_map:{event_id}:stale"
+
+    def _changes_key(self, event_id, version):
+        return f"events:seat_map:{event_id}:changes:{version}"
+
+    def _acquire(self, event_id, wait=True) -> bool:
+        deadline = time.monotonic() + (self.lock_wait_seconds if wait else 0)
+        while not cache.add(self._lock_key(event_id), 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _release(self, event_id):
+        cache.delete(self._lock_key(event_id))
+
+    def build(self, event_id) -> SeatMap:
+        from apps.events.models import EventSeat
+
+        event_seats = EventSeat.objects.filter(event_id=event_id)
+        max_seat_number = event_seats.aggregate(max_seat_number=Max("seat_number"))[
+            "max_seat_number"
+        ]
+        seat_map = SeatMap(0 if max_seat_number is None else max_seat_number + 1)
+        for seat_number, is_sold, is_held in _get_event_seat_states(
+            event_seats.order_by()
+        ).iterator():
+            seat_map.set(seat_number, _get_state(is_sold, is_held))
+        return seat_map
+
+    def get(self, event_id) -> SeatMap:
+        cached = cache.get(self._key(event_id))
+        if cached is not None and cache.get(self._stale_key(event_id)) is None:
+            return SeatMap(*cached)
+
+        if not self._acquire(event_id, wait=False):
+            deadline = time.monotonic() + self.lock_wait_seconds
+            while cached is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+                cached = cache.get(self._key(event_id))
+            return self.build(event_id) if cached is None else SeatMap(*cached)
+        try:
+            cache.delete(self._stale_key(event_id))
+            seat_map = self.build(event_id)
+            cache.set(self._key(event_id), seat_map.to_cache(), self.timeout)
+        finally:
+            self._release(event_id)
+        return seat_map
+
+    def refresh_seats(self, event_id, event_seat_ids):
+        """Re-reads the states of the given seats and patches the cached map."""
+        from apps.events.models import EventSeat
+
+        if cache.get(self._key(event_id)) is None:
+            return
+
+        if not self._acquire(event_id):
+            cache.set(self._stale_key(event_id), 1, self.timeout)
+            return
+        try:
+            cached = cache.get(self._key(event_id))
+            if cached is None:
+                return
+            seat_map = SeatMap(*cached)
+            previous_version, seat_numbers = seat_map.version, []
+            for seat_number, is_sold, is_held in _get_event_seat_states(
+                EventSeat.objects.filter(id__in=event_seat_ids)
+            ):
+                if seat_number >= seat_map.size:
+                    # seat added after the map was built
+                    cache.delete(self._key(event_id))
+                    return
+                seat_map.set(seat_number, _get_state(is_sold, is_held))
+                seat_numbers.append(seat_number)
+            cached = seat_map.to_cache()
+            cache.set_many(
+                {
+                    self._key(event_id): cached,
+                    self._changes_key(event_id, seat_map.version): (
+                        previous_version,
+                        seat_numbers,
+                    ),
+                },
+                self.timeout,
+            )
+        finally:
+            self._release(event_id)
+
+    def get_changes(self, event_id, from_version, to_version):
+        """
+        Seat numbers changed by the patches from from_version to to_version of
+        the map, None when they are not all known.
+        """
+        seat_numbers, version = set(), to_version
+        for _ in range(self.max_changes_steps):
+            if version == from_version:
+                return seat_numbers
+            changes = cache.get(self._changes_key(event_id, version))
+            if changes is None:
+                return None
+            version, changed_seat_numbers = changes
+            seat_numbers.update(changed_seat_numbers)
+        return seat_numbers if version == from_version else None
+
+    def refresh_seats_on_commit(self, event_id, event_seat_ids, seat_numbers, state):
+        """
+        Patches the map after commit, and sends the seats, which all moved to
+        state, to the seat stream subscribers of the event.
+        """
+        from apps.events.seat_stream import notify_seats
+
+        event_seat_ids, seat_numbers = list(event_seat_ids), list(seat_numbers)
+        transaction.on_commit(lambda: self.refresh_seats(event_id, event_seat_ids))
+        # after the map, so a subscriber that resyncs reads the patched map
+        transaction.on_commit(lambda: notify_seats(event_id, seat_numbers, state))
+
+    def invalidate(self, event_id):
+        cache.set(self._stale_key(event_id), 1, self.timeout)
+        cache.delete(self._key(event_id))
+
+    def invalidate_on_commit(self, event_id):
+        from apps.events.seat_stream import notify_reset
+
+        transaction.on_commit(lambda: self.invalidate(event_id))
+        transaction.on_commit(lambda: notify_reset(event_id))
+
+
+seat_map_store = SeatMapStore()
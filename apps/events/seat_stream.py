@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import re
+import uuid
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+
+import orjson
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, connections
+
+from apps.core.renderers import dumps
+from apps.events.seat_map import SeatMap
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "event_seats"
+# NOTIFY payloads must stay under 8000 bytes
+SEATS_PER_NOTIFY = 500
+
+
+def _notify(payloads):
+    try:
+        with connection.cursor() as cursor:
+            for payload in payloads:
+                cursor.execute(
+                    "SELECT pg_notify(%s, %s)", [CHANNEL, dumps(payload).decode()]
+                )
+    except DatabaseError:
+        # runs after commit, the write must not fail for its subscribers
+        logger.exception("seat stream notify failed")
+
+
+def notify_seats(event_id, seat_numbers, state):
+    """Sends the seats, which all moved to state, to the subscribers of the event."""
+    seats = [value for seat_number in seat_numbers for value in (seat_number, state)]
+    step = SEATS_PER_NOTIFY * 2
+    _notify(
+        {"event": str(event_id), "seats": seats[start : start + step]}
+        for start in range(0, len(seats), step)
+    )
+
+
+def notify_reset(event_id):
+    """Subscribers of the event get a new snapshot, seats were added or removed."""
+    _notify([{"event": str(event_id), "reset": True}])
+
+
+class SeatStreamHub:
+    """
+    Fans the seat notifications of Postgres out to the subscribers of their
+    event. A process has one connection listening on CHANNEL, it is read by
+    the event loop when it has notifications, no thread is involved.
+
+    Every subscriber has a bounded queue, a subscriber too slow to keep up
+    gets RESET in place of what it missed. When the connection fails the
+    subscribers get CLOSED and the next subscriber connects again.
+    """
+
+    RESET = "reset"
+    CLOSED = "closed"
+    max_queue_size = 100
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._connection = None
+        self._loop = None
+        self._lock = None
+
+    def _connect(self):
+        listen_connection = psycopg2.connect(
+            **connections["default"].get_connection_params()
+        )
+        listen_connection.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+        )
+        with listen_connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return listen_connection
+
+    async def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._stop()
+            self._loop, self._lock = loop, asyncio.Lock()
+        async with self._lock:
+            if self._connection is None:
+                self._connection = await loop.run_in_executor(None, self._connect)
+                loop.add_reader(self._connection.fileno(), self._read)
+
+    def _stop(self):
+        if self._connection is None:
+            return
+        if not self._loop.is_closed():
+            self._loop.remove_reader(self._connection.fileno())
+        self._connection.close()
+        self._connection = None
+
+    def _put(self, queue, message):
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            message = self.RESET
+        queue.put_nowait(message)
+
+    def _read(self):
+        try:
+            self._connection.poll()
+        except psycopg2.Error:
+            logger.exception("seat stream listener failed")
+            self._stop()
+            for queues in self._subscribers.values():
+                for queue in queues:
+                    self._put(queue, self.CLOSED)
+            return
+
+        while self._connection.notifies:
+            message = orjson.loads(self._connection.notifies.pop(0).payload)
+            for queue in self._subscribers.get(message["event"], ()):
+                self._put(queue, self.RESET if "reset" in message else message["seats"])
+
+    async def subscribe(self, event_id) -> asyncio.Queue:
+        await self._start()
+        queue = asyncio.Queue(self.max_queue_size)
+        self._subscribers[str(event_id)].add(queue)
+        return queue
+
+    def unsubscribe(self, event_id, queue):
+        queues = self._subscribers.get(str(event_id))
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[str(event_id)]
+
+    def close(self):
+        self._stop()
+
+
+seat_stream_hub = SeatStreamHub()
+
+
+def _get_user(headers):
+    from django.contrib.auth import get_user
+
+    close_old_connections()
+    cookie = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1"))
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+    session_store = import_module(settings.SESSION_ENGINE).SessionStore
+    user = get_user(SimpleNamespace(session=session_store(morsel.value)))
+    return user if user.is_authenticated else None
+
+
+def _get_snapshot(event_id):
+    from apps.events.models import Event
+    from apps.events.seat_map import seat_map_store
+
+    close_old_connections()
+    if not Event.objects.filter(id=event_id).exists():
+        return None
+    seat_map = seat_map_store.get(event_id)
+    return {
+        "event": str(event_id),
+        "number_of_seats": seat_map.size,
+        "states": SeatMap.STATES,
+        "encoding": "rle",
+        "runs": seat_map.to_runs(),
+    }
+
+
+def _format_event(name, data) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+class SeatStreamApplication:
+    """
+    ASGI application serving GET /api/events/<id>/seat_stream as server sent
+    events to users logged in with a session, other requests go to the
+    wrapped application. A subscriber gets a snapshot event, the seat map
+    run-length encoded, then seats events with [seat_number, state, ...] of
+    the seats that changed, and a new snapshot when it must resync.
+    """
+
+    path_re = re.compile(r"^/api/events/(?P<event_id>[0-9a-f-]{36})/seat_stream$")
+    keepalive_seconds = 15
+    retry_milliseconds = 2000
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        match = (
+            self.path_re.match(scope["path"])
+            if scope["type"] == "http" and scope["method"] == "GET"
+            else None
+        )
+        if match is None:
+            return await self.application(scope, receive, send)
+
+        try:
+            event_id = uuid.UUID(match["event_id"])
+        except ValueError:
+            return await self._send_error(send, 404)
+        if await sync_to_async(_get_user)(dict(scope["headers"])) is None:
+            return await self._send_error(send, 401)
+        await self._stream(event_id, receive, send)
+
+    async def _send_error(self, send, status):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def _stream(self, event_id, receive, send):
+        # subscribed before the snapshot is read, so no change is missed
+        queue = await seat_stream_hub.subscribe(event_id)
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            snapshot = await sync_to_async(_get_snapshot)(event_id)
+            if snapshot is None:
+                return await self._send_error(send, 404)
+
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                    ],
+                }
+            )
+            await self._send(
+                send,
+                f"retry: {self.retry_milliseconds}\n\n".encode()
+                + _format_event("snapshot", snapshot),
+            )
+            await self._send_changes(event_id, queue, disconnected, send)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnected.cancel()
+            seat_stream_hub.unsubscribe(event_id, queue)
+
+    async def _send_changes(self, event_id, queue, disconnected, send):
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {get, disconnected},
+                timeout=self.keepalive_seconds,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if get not in done:
+                get.cancel()
+                if disconnected in done:
+                    return
+                await self._send(send, b": keepalive\n\n")
+                continue
+
+            seats = get.result()
+            if seats == seat_stream_hub.CLOSED:
+                return
+            elif seats == seat_stream_hub.RESET:
+                snapshot = await sync_to_async(_get_snapshot)(event_id)
+                if snapshot is None:
+                    return
+                await self._send(send, _format_event("snapshot", snapshot))
+            else:
+                await self._send(send, _format_event("seats", {"seats": seats}))
+
+    async def _send(self, send, body):
+        await send({"type": "http.response.body", "body": body, "more_body": True})
@@ -1,12 +1,22 @@
 from apps.events.serializers.event_tag import EventTagSerializer
-from apps.events.serializers.event import EventSerializer
+from apps.events.serializers.event import (
+    EventSerializer,
+    NearbyEventSerializer,
+    NearbyEventsQuerySerializer,
+)
 from apps.events.serializers.event_seat_type import EventSeatTypeSerializer
-from apps.events.serializers.event_seat import EventSeatSerializer
+from apps.events.serializers.event_seat import (
+    BestEventSeatsQuerySerializer,
+    EventSeatSerializer,
+)
 
 
 __all__ = [
     "EventTagSerializer",
     "EventSerializer",
+    "NearbyEventSerializer",
+    "NearbyEventsQuerySerializer",
     "EventSeatTypeSerializer",
     "EventSeatSerializer",
+    "BestEventSeatsQuerySerializer",
 ]
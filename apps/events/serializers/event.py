@@ -1,7 +1,9 @@
 import datetime
+from contextlib import contextmanager
 
 import pytz
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from dry_rest_permissions.generics import DRYPermissionsField
 from rest_framework import serializers
@@ -11,8 +13,10 @@ from apps.events.serializers import EventTagSerializer
 
 
 class EventTagPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    serializer_class = EventTagSerializer
+
     def to_representation(self, event_tag):
-        return EventTagSerializer(event_tag).data
+        return self.serializer_class(event_tag).data
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -76,126 +80,49 @@ class EventSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(_("status can't be downgrade"))
         return value
 
-    def validate_venue_for_partial_update(self, data):
-        if Event.objects.filter(
-            ~Q(id=self.instance.id)
-            & Q(venue=data["venue"])
-            & (
-                Q(
-                    start_date__lte=self.instance.start_date,
-                    end_date__gte=self.instance.start_date,
-                )
-                | Q(
-                    start_date__lte=self.instance.end_date,
-                    end_date__gte=self.instance.end_date,
-                )
-            )
-        ).exists():
-            self._object_level_validation_errors.append(
-                self._default_custom_error_message["venue"]
-            )
-
-    def validate_start_date_for_partial_update(self, data):
-        if data["start_date"] > self.instance.end_date:
-            self._object_level_validation_errors.append(
-                self._default_custom_error_message["start_date"]
-            )
+    def _get_start_end_date_error(self, data):
+        start_date = data.get("start_date", getattr(self.instance, "start_date", None))
+        end_date = data.get("end_date", getattr(self.instance, "end_date", None))
+        if start_date is None or end_date is None or start_date < end_date:
+            return None
 
-    def validate_end_date_for_partial_update(self, data):
-        if data["end_date"] < self.instance.start_date:
-            self._object_level_validation_errors.append(
-                self._default_custom_error_message["end_date"]
-            )
+        if "start_date" in data and "end_date" in data:
+            return self._default_custom_error_message["start_date_end_date"]
+        elif "start_date" in data:
+            return self._default_custom_error_message["start_date"]
+        return self._default_custom_error_message["end_date"]
 
-    def validate_start_end_date(self, data):
-        if data["start_date"] > data["end_date"]:
-            self._object_level_validation_errors.append(
-                self._default_custom_error_message["start_date_end_date"]
-            )
-
-    def validate_venue_start_end_date_create(self, data):
-
-        if Event.objects.filter(
-            Q(venue=data["venue"])
-            & (
-                Q(start_date__range=(data["start_date"], data["end_date"]))
-                | Q(end_date__range=(data["start_date"], data["end_date"]))
-            )
-        ).exists():
-            self._object_level_validation_errors.append(
-                self._default_custom_error_message["venue_start_date_end_date"]
-            )
-
-        # if Event.objects.filter(
-        #     Q(venue=data["venue"])
-        #     & (
-        #         (
-        #             Q(start_date__gte=data["start_date"])
-        #             & Q(end_date__lte=data["start_date"])
-        #         )
-        #         | (
-        #             Q(start_date__gte=data["end_date"])
-        #             & Q(end_date__lte=data["end_date"])
-        #         )
-        #     )
-        # ).exists():
-        #     self._object_level_validation_errors.append(
-        #         self._default_custom_error_message["venue_start_date_end_date"]
-        #     )
-
-    def validate_venue_start_end_date_for_update_partial_update(self, data):
-        if Event.objects.filter(
-            ~Q(id=self.instance.id)
-            & Q(venue=data["venue"])
-            & (
-                Q(start_date__lte=data["start_date"], end_date__gte=data["start_date"])
-                | Q(start_date__lte=data["end_date"], end_date__gte=data["end_date"])
-            )
-        ).exists():
-            self._object_level_validation_errors.append(
-                self._default_custom_error_message["venue_start_date_end_date"]
-            )
+    def _get_venue_error(self, data):
+        if "start_date" in data or "end_date" in data:
+            return self._default_custom_error_message["venue_start_date_end_date"]
+        return self._default_custom_error_message["venue"]
 
     def validate(self, data):
-
-        self._object_level_validation_errors = []
-
-        if self.context["view"].action == "create":
-
-            self.validate_start_end_date(data)
-            self.validate_venue_start_end_date_create(data)
-
-        elif self.context["view"].action == "update":
-
-            self.validate_start_end_date(data)
-            self.validate_venue_start_end_date_for_update_partial_update(data)
-
-        elif self.context["view"].action == "partial_update":
-
-            if all([key in data for key in ["venue", "start_date", "end_date"]]):
-                self.validate_start_end_date(data)
-                self.validate_venue_start_end_date_for_update_partial_update(data)
-
-            elif all([key in data for key in ["start_date", "end_date"]]):
-                self.validate_start_end_date(data)
-
-            elif all([key in data for key in ["start_date"]]):
-                self.validate_start_date_for_partial_update(data)
-
-            elif all([key in data for key in ["end_date"]]):
-                self.validate_end_date_for_partial_update(data)
-
-            elif all([key in data for key in ["venue"]]):
-                self.validate_venue_for_partial_update(data)
-
-        if self._object_level_validation_errors:
-            raise serializers.ValidationError(self._object_level_validation_errors)
-
+        # venue overlaps are rejected by the exclusion constraint on save
+        error = self._get_start_end_date_error(data)
+        if error:
+            raise serializers.ValidationError([error])
         return data
 
+    @contextmanager
+    def _translate_venue_is_double_booked(self):
+        try:
+            with transaction.atomic():
+                yield
+        except IntegrityError as exc:
+            if (
+                getattr(getattr(exc.__cause__, "diag", None), "constraint_name", None)
+                != Event.VENUE_IS_DOUBLE_BOOKED
+            ):
+                raise
+            raise serializers.ValidationError(
+                [self._get_venue_error(self.validated_data)]
+            )
+
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
-        event = Event.objects.create(**validated_data)
+        with self._translate_venue_is_double_booked():
+            event = Event.objects.create(**validated_data)
         event.tags.add(*tags)
         return event
 
@@ -203,6 +130,48 @@ class EventSerializer(serializers.ModelSerializer):
         tags = validated_data.pop("tags", [])
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        with self._translate_venue_is_double_booked():
+            instance.save()
         instance.tags.add(*tags)
         return instance
+
+
+class NearbyEventSerializer(EventSerializer):
+    """Events of the nearby search, shared by every user through the cache."""
+
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(EventSerializer.Meta):
+        fields = tuple(
+            field
+            for field in EventSerializer.Meta.fields
+            if field != "object_permissions"
+        ) + ("distance",)
+
+
+class NearbyEventsQuerySerializer(serializers.Serializer):
+    MAX_NUMBER_OF_DAYS = 31
+
+    x = serializers.FloatField(min_value=-180, max_value=180)
+    y = serializers.FloatField(min_value=-90, max_value=90)
+    radius = serializers.FloatField(min_value=1, max_value=50_000, default=5_000)
+    from_date = serializers.DateField(required=False)
+    to_date = serializers.DateField(required=False)
+
+    def get_fields(self):
+        # from and to are python keywords
+        fields = super().get_fields()
+        fields["from"] = fields.pop("from_date")
+        fields["to"] = fields.pop("to_date")
+        return fields
+
+    def validate(self, data):
+        data.setdefault("from", timezone.now().date())
+        data.setdefault("to", data["from"])
+        if data["to"] < data["from"]:
+            raise serializers.ValidationError({"to": [_("Must not be before from")]})
+        if (data["to"] - data["from"]).days >= self.MAX_NUMBER_OF_DAYS:
+            raise serializers.ValidationError(
+                {"to": [_("Must be within %d days of from") % self.MAX_NUMBER_OF_DAYS]}
+            )
+        return data
@@ -31,3 +31,8 @@ class EventSeatSerializer(serializers.ModelSerializer):
                 _("Only Creator of event or admin/staff can create, destroy event seat")
             )
         return value
+
+
+class BestEventSeatsQuerySerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, max_value=100)
+    seat_type = serializers.UUIDField(required=False)
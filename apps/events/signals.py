@@ -0,0 +1,76 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.response_cache import response_cache
+from apps.events.models import (
+    Event,
+    EventSeat,
+    EventSeatInventory,
+    EventSeatType,
+    EventTag,
+)
+from apps.events.seat_map import seat_map_store
+from apps.events.tag_autocomplete import tag_autocomplete
+
+
+@receiver(post_save, sender=Event)
+def create_event_seat_inventory(sender, instance, created, **kwargs):
+    if created:
+        EventSeatInventory.objects.create_for_event(instance)
+
+
+@receiver(post_save, sender=Event)
+def schedule_event_transitions(sender, instance, created, **kwargs):
+    from apps.workers.tasks import schedule_event_transitions_on_commit
+
+    if created or instance.is_rescheduled():
+        schedule_event_transitions_on_commit(instance)
+        instance._loaded_dates = (instance.start_date, instance.end_date)
+
+
+@receiver(post_save, sender=EventSeatType)
+def create_event_seat_type_seat_inventory(sender, instance, created, **kwargs):
+    if created:
+        EventSeatInventory.objects.create_for_event_seat_types([instance])
+
+
+@receiver(post_save, sender=EventSeat)
+def increase_event_seat_inventory_total(sender, instance, created, **kwargs):
+    if created:
+        EventSeatInventory.objects.add(
+            instance.event_seat_type.event_id, instance.event_seat_type_id, total=1
+        )
+        seat_map_store.invalidate_on_commit(instance.event_seat_type.event_id)
+
+
+@receiver(post_save, sender=EventTag)
+@receiver(post_delete, sender=EventTag)
+def clear_tag_autocomplete(sender, **kwargs):
+    # other processes see the change when their entries expire
+    tag_autocomplete.clear()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventSeatType)
+@receiver(post_delete, sender=EventSeatType)
+def invalidate_response_cache(sender, instance, **kwargs):
+    response_cache.invalidate(sender, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def invalidate_event_tags_response_cache(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # events of a tag, pk_set is None when they are cleared
+        response_cache.invalidate_model(Event)
+    else:
+        response_cache.invalidate(Event, [instance.pk])
+
+
+@receiver(post_save, sender=EventTag)
+@receiver(post_delete, sender=EventTag)
+def invalidate_events_response_cache(sender, **kwargs):
+    # tags are rendered inside the events
+    response_cache.invalidate_model(Event)
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models.functions import Length, Upper
+
+
+def _upper(text):
+    # character by character like upper() of Postgres, which keeps "ß" as it is
+    return "".join(
+        upper_char if len(upper_char) == 1 else char
+        for char, upper_char in ((char, char.upper()) for char in text)
+    )
+
+
+class TagAutocomplete:
+    """
+    Finds the tags whose name starts with a prefix through a trigram index,
+    shortest names first. Results are kept in a small in-process LRU cache,
+    a prefix whose matches all fit in a cached shorter prefix is answered
+    from it without a query. The prefix is upper cased in Python and matched
+    against the names upper cased by the database, which are cached with the
+    tags, so both ways compare the same strings. Prefixes shorter than 3
+    characters have no trigram and scan the whole index.
+    """
+
+    limit = 10
+    timeout = 60
+    max_size = 1024
+
+    def __init__(self):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_cached(self, prefix):
+        now = time.monotonic()
+        with self._lock:
+            for length in range(len(prefix), 0, -1):
+                entry = self._cache.get(prefix[:length])
+                if entry is None or entry[0] < now:
+                    continue
+                _, rows, is_complete = entry
+                if length == len(prefix):
+                    self._cache.move_to_end(prefix)
+                    return [tag for _, tag in rows]
+                if is_complete:
+                    return [
+                        tag for upper_name, tag in rows if upper_name.startswith(prefix)
+                    ]
+        return None
+
+    def _set_cached(self, prefix, rows, is_complete):
+        with self._lock:
+            self._cache[prefix] = (
+                time.monotonic() + self.timeout,
+                rows,
+                is_complete,
+            )
+            self._cache.move_to_end(prefix)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def find(self, prefix) -> list:
+        from apps.events.models import EventTag
+
+        prefix = _upper(prefix)
+        tags = self._get_cached(prefix)
+        if tags is not None:
+            return tags
+
+        rows = [
+            (tag.pop("upper_name"), tag)
+            for tag in EventTag.objects.annotate(upper_name=Upper("name"))
+            .filter(upper_name__startswith=prefix)
+            .order_by(Length("name"), "name")
+            .values("id", "name", "slug", "upper_name")[: self.limit + 1]
+        ]
+        is_complete = len(rows) <= self.limit
+        rows = rows[: self.limit]
+        self._set_cached(prefix, rows, is_complete)
+        return [tag for _, tag in rows]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+tag_autocomplete = TagAutocomplete()
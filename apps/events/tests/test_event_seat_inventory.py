@@ -0,0 +1,189 @@
+import datetime
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+import pytz
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from apps.events.models import Event, EventSeat, EventSeatInventory
+from apps.reservations.models import Reservation, ReservationEventSeat
+from apps.venues.models import Venue
+
+
+class EventSeatInventoryTestCase(TestCase):
+    def setUp(self) -> None:
+        self._user = baker.make(User)
+        self._event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        self._event_seat_type = self._event.event_seat_types.first()
+        self._event_seats = [
+            EventSeat.objects.create(event_seat_type=self._event_seat_type)
+            for _ in range(4)
+        ]
+
+    def _get_counters(self, **kwargs):
+        return EventSeatInventory.objects.filter(**kwargs).values(
+            "total", "held", "sold"
+        )[0]
+
+    def test_inventories_are_created_with_event_and_event_seat_types(self):
+        self.assertEqual(
+            EventSeatInventory.objects.filter(event=self._event).count(), 4
+        )
+        self.assertDictEqual(
+            self._get_counters(event=self._event, event_seat_type__isnull=True),
+            {"total": 4, "held": 0, "sold": 0},
+        )
+
+    def test_counters_follow_reservation_status(self):
+        reservation = baker.make(Reservation, event=self._event, user=self._user)
+        for event_seat in self._event_seats[:2]:
+            baker.make(
+                ReservationEventSeat, reservation=reservation, event_seat=event_seat
+            )
+        self.assertDictEqual(
+            self._get_counters(event_seat_type=self._event_seat_type),
+            {"total": 4, "held": 2, "sold": 0},
+        )
+
+        Reservation.objects.filter(id=reservation.id).update_status(
+            Reservation.Status.RESERVED, payment_id="payment_id"
+        )
+        self.assertDictEqual(
+            self._get_counters(event=self._event, event_seat_type__isnull=True),
+            {"total": 4, "held": 0, "sold": 2},
+        )
+        self.assertFalse(self._event.is_houseful())
+
+    def test_event_is_houseful_when_all_seats_are_sold(self):
+        reservation = baker.make(
+            Reservation,
+            event=self._event,
+            user=self._user,
+            status=Reservation.Status.RESERVED,
+            payment_id="payment_id",
+        )
+        for event_seat in self._event_seats:
+            baker.make(
+                ReservationEventSeat, reservation=reservation, event_seat=event_seat
+            )
+        self.assertTrue(self._event.is_houseful())
+
+        reservation.delete()
+        self.assertFalse(self._event.is_houseful())
+
+    def test_reconcile_command_rebuilds_counters(self):
+        reservation = baker.make(Reservation, event=self._event, user=self._user)
+        baker.make(
+            ReservationEventSeat,
+            reservation=reservation,
+            event_seat=self._event_seats[0],
+        )
+        EventSeatInventory.objects.filter(event=self._event).update(
+            total=0, held=0, sold=0
+        )
+        Reservation.objects.filter(id=reservation.id).update(
+            status=Reservation.Status.RESERVED, payment_id="payment_id"
+        )
+
+        call_command("reconcile_seat_inventories", chunk_size=1, stdout=StringIO())
+
+        self.assertDictEqual(
+            self._get_counters(event=self._event, event_seat_type__isnull=True),
+            {"total": 4, "held": 0, "sold": 1},
+        )
+
+    def test_deletes_move_counters_with_one_update_per_event_seat_type(self):
+        def delete_reservation(event_seats):
+            reservation = baker.make(Reservation, event=self._event, user=self._user)
+            ReservationEventSeat.objects.bulk_add(reservation, event_seats)
+            with CaptureQueriesContext(connection) as queries:
+                reservation.delete()
+            return len(queries)
+
+        self.assertEqual(
+            delete_reservation(self._event_seats[:1]),
+            delete_reservation(self._event_seats),
+        )
+        self.assertDictEqual(
+            self._get_counters(event=self._event, event_seat_type__isnull=True),
+            {"total": 4, "held": 0, "sold": 0},
+        )
+
+        reservation = baker.make(Reservation, event=self._event, user=self._user)
+        ReservationEventSeat.objects.bulk_add(reservation, self._event_seats[:2])
+        EventSeat.objects.filter(
+            id__in=[event_seat.id for event_seat in self._event_seats[1:]]
+        ).delete()
+
+        self.assertDictEqual(
+            self._get_counters(event_seat_type=self._event_seat_type),
+            {"total": 1, "held": 1, "sold": 0},
+        )
+        self.assertEqual(reservation.event_seats.count(), 1)
+
+
+class EventSeatInventoryRebuildTestCase(TransactionTestCase):
+    """add() of another transaction runs while the counters are rebuilt."""
+
+    def setUp(self) -> None:
+        for task in ["start_event", "stop_event"]:
+            patcher = patch(f"apps.workers.tasks.{task}.apply_async")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self._event = Event.objects.create(
+            name="Happy New Year",
+            user=baker.make(User),
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        self._event_seat_type = self._event.event_seat_types.first()
+        EventSeat.objects.create(event_seat_type=self._event_seat_type)
+
+    def _add_held_seat(self):
+        try:
+            EventSeatInventory.objects.add(
+                self._event.id, self._event_seat_type.id, held=1
+            )
+        finally:
+            connections.close_all()
+
+    def test_add_between_count_and_write_is_not_lost(self):
+        bulk_update = EventSeatInventory.objects.bulk_update
+        adding = threading.Thread(target=self._add_held_seat)
+
+        def add_then_bulk_update(*args, **kwargs):
+            adding.start()
+            # the inventories are locked, add() waits for the rebuild
+            adding.join(0.5)
+            return bulk_update(*args, **kwargs)
+
+        with patch.object(
+            EventSeatInventory.objects,
+            "bulk_update",
+            side_effect=add_then_bulk_update,
+        ):
+            EventSeatInventory.objects.rebuild([self._event.id])
+        adding.join()
+
+        self.assertDictEqual(
+            EventSeatInventory.objects.filter(
+                event=self._event, event_seat_type__isnull=True
+            ).values("total", "held", "sold")[0],
+            {"total": 1, "held": 1, "sold": 0},
+        )
@@ -0,0 +1,69 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from apps.events.models import Event
+from apps.venues.models import Venue
+from apps.workers.tasks import event_starter, event_stopper, start_event
+
+
+class EventTransitionTestCase(TestCase):
+    def setUp(self) -> None:
+        self._user = baker.make(User)
+
+    def _create_event(self, status, start_in_hours, end_in_hours):
+        now = timezone.now()
+        return Event.objects.create(
+            name="Happy New Year",
+            user=self._user,
+            status=status,
+            venue=baker.make(Venue),
+            start_date=now + datetime.timedelta(hours=start_in_hours),
+            end_date=now + datetime.timedelta(hours=end_in_hours),
+        )
+
+    def test_sweepers_only_move_due_events(self):
+        due_to_start = self._create_event(Event.Status.CREATED, -1, 1)
+        not_due = self._create_event(Event.Status.CREATED, 1, 2)
+        due_to_stop = self._create_event(Event.Status.RUNNING, -2, -1)
+        running = self._create_event(Event.Status.RUNNING, -1, 1)
+
+        self.assertEqual(event_starter(), 1)
+        self.assertEqual(event_stopper(), 1)
+
+        statuses = dict(Event.objects.values_list("id", "status"))
+        self.assertEqual(statuses[due_to_start.id], Event.Status.RUNNING)
+        self.assertEqual(statuses[not_due.id], Event.Status.CREATED)
+        self.assertEqual(statuses[due_to_stop.id], Event.Status.COMPLETED)
+        self.assertEqual(statuses[running.id], Event.Status.RUNNING)
+
+    def test_transitions_are_scheduled_when_event_is_created_or_rescheduled(self):
+        with patch("apps.workers.tasks.start_event.apply_async") as start_mock, patch(
+            "apps.workers.tasks.stop_event.apply_async"
+        ) as stop_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                event = self._create_event(Event.Status.CREATED, 1, 2)
+            start_mock.assert_called_once_with((event.id,), eta=event.start_date)
+            stop_mock.assert_called_once_with((event.id,), eta=event.end_date)
+
+            event = Event.objects.get(id=event.id)
+            with self.captureOnCommitCallbacks(execute=True):
+                event.name = "New Year"
+                event.save()
+            self.assertEqual(start_mock.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                event.start_date += datetime.timedelta(minutes=30)
+                event.save()
+            self.assertEqual(start_mock.call_count, 2)
+
+    def test_start_event_is_a_no_op_for_rescheduled_event(self):
+        event = self._create_event(Event.Status.CREATED, 1, 2)
+
+        self.assertEqual(start_event(event.id), 0)
+        event.refresh_from_db()
+        self.assertEqual(event.status, Event.Status.CREATED)
@@ -0,0 +1,98 @@
+import asyncio
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from model_bakery import baker
+
+from apps.events.models import Event, EventSeat, EventSeatType
+from apps.events.seat_map import SeatMap
+from apps.events.seat_stream import SeatStreamApplication, seat_stream_hub
+from apps.reservations.models import Reservation, ReservationEventSeat
+
+
+class SeatStreamTestCase(TransactionTestCase):
+    """Notifications are only delivered on commit, so nothing is rolled back."""
+
+    def setUp(self) -> None:
+        for task in ["start_event", "stop_event"]:
+            patcher = patch(f"apps.workers.tasks.{task}.apply_async")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(seat_stream_hub.close)
+
+        self._user = baker.make(User)
+        self._event = baker.make(Event)
+        event_seat_type = baker.make(EventSeatType, event=self._event)
+        self._event_seats = [
+            EventSeat.objects.create(event_seat_type=event_seat_type) for _ in range(3)
+        ]
+        self._application = SeatStreamApplication(None)
+        self._path = f"/api/events/{self._event.id}/seat_stream"
+
+    def _get_scope(self, user=None):
+        headers = []
+        if user is not None:
+            self.client.force_login(user)
+            session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+            headers.append(
+                (b"cookie", f"{settings.SESSION_COOKIE_NAME}={session_key}".encode())
+            )
+        return {"type": "http", "method": "GET", "path": self._path, "headers": headers}
+
+    def _hold_seat(self):
+        ReservationEventSeat.objects.create(
+            reservation=baker.make(Reservation, event=self._event, user=self._user),
+            event_seat=self._event_seats[0],
+        )
+
+    def _sell_seat(self):
+        Reservation.objects.filter(event=self._event).update_status(
+            Reservation.Status.RESERVED, payment_id="payment_id"
+        )
+
+    async def test_subscriber_gets_a_snapshot_then_seat_changes(self):
+        scope = await sync_to_async(self._get_scope)(self._user)
+        messages = asyncio.Queue()
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        stream = asyncio.ensure_future(self._application(scope, receive, messages.put))
+        start = await asyncio.wait_for(messages.get(), 5)
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        snapshot = (await asyncio.wait_for(messages.get(), 5))["body"]
+        self.assertIn(b"event: snapshot\n", snapshot)
+
+        await sync_to_async(self._hold_seat)()
+        seats = (await asyncio.wait_for(messages.get(), 5))["body"]
+        self.assertEqual(
+            seats,
+            b'event: seats\ndata: {"seats":[%d,%d]}\n\n'
+            % (self._event_seats[0].seat_number, SeatMap.HELD),
+        )
+
+        await sync_to_async(self._sell_seat)()
+        seats = (await asyncio.wait_for(messages.get(), 5))["body"]
+        self.assertEqual(
+            seats,
+            b'event: seats\ndata: {"seats":[%d,%d]}\n\n'
+            % (self._event_seats[0].seat_number, SeatMap.SOLD),
+        )
+
+        disconnected.set()
+        await asyncio.wait_for(stream, 5)
+
+    async def test_anonymous_user_is_unauthorized(self):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await self._application(self._get_scope(), None, send)
+        self.assertEqual(messages[0]["status"], 401)
@@ -1,18 +1,21 @@
 import datetime
 import json
+from unittest.mock import patch
 
 import pytz
 from django.contrib.auth.models import User
 from model_bakery import baker
-from rest_framework import status
+from rest_framework import mixins, status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
 
+from apps.core.query_budget import QueryBudgetTestMixin
 from apps.events.models import Event, EventSeat, EventTag
+from apps.events.views import EventSeatViewSet
 from apps.venues.models import Venue
 
 
-class EventSeatAPITestCase(APITestCase):
+class EventSeatAPITestCase(QueryBudgetTestMixin, APITestCase):
     EVENT_SEATS_LIST_PATH = reverse("events:eventseat-list")
 
     def setUp(self) -> None:
@@ -65,4 +68,111 @@ class EventSeatAPITestCase(APITestCase):
             self.EVENT_SEATS_LIST_PATH, {"event_seat_type__event": event_1.id}
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(json.loads(response.content)), 15)
+        self.assertEqual(len(json.loads(response.content)["results"]), 15)
+
+    def test_seats_of_a_event_are_paginated_by_seat_number(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        for event_seat_type in event.event_seat_types.all():
+            for _ in range(5):
+                EventSeat.objects.create(event_seat_type=event_seat_type)
+
+        response = self._client_general.get(
+            self.EVENT_SEATS_LIST_PATH,
+            {"event_seat_type__event": event.id, "page_size": 10},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = json.loads(response.content)
+        self.assertIsNone(first_page["previous"])
+        self.assertListEqual(
+            [event_seat["seat_number"] for event_seat in first_page["results"]],
+            list(range(10)),
+        )
+
+        response = self._client_general.get(first_page["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second_page = json.loads(response.content)
+        self.assertIsNone(second_page["next"])
+        self.assertListEqual(
+            [event_seat["seat_number"] for event_seat in second_page["results"]],
+            list(range(10, 15)),
+        )
+
+        response = self._client_general.get(second_page["previous"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            json.loads(response.content)["results"], first_page["results"]
+        )
+
+    def test_seat_reads_stay_within_query_budgets(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        event_seat_types = list(event.event_seat_types.all())
+
+        def create_event_seats(size):
+            return [
+                EventSeat.objects.create(
+                    event_seat_type=event_seat_types[index % len(event_seat_types)]
+                )
+                for index in range(size)
+            ]
+
+        self.assertQueryBudget(
+            EventSeatViewSet,
+            "list",
+            self._client_general,
+            create_event_seats,
+            self.EVENT_SEATS_LIST_PATH,
+            {"event_seat_type__event": event.id},
+        )
+        self.assertQueryBudget(
+            EventSeatViewSet,
+            "retrieve",
+            self._client_general,
+            create_event_seats,
+            lambda event_seats: reverse(
+                "events:eventseat-detail", kwargs={"pk": event_seats[-1].id}
+            ),
+        )
+
+    def test_values_read_path_renders_like_serializer(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        event_seats = [
+            EventSeat.objects.create(event_seat_type=event_seat_type)
+            for event_seat_type in event.event_seat_types.all()
+        ]
+        paths = [
+            self.EVENT_SEATS_LIST_PATH,
+            reverse("events:eventseat-detail", kwargs={"pk": event_seats[0].id}),
+        ]
+
+        responses = [self._client_general.get(path) for path in paths]
+        with patch.object(
+            EventSeatViewSet, "list", mixins.ListModelMixin.list
+        ), patch.object(
+            EventSeatViewSet, "retrieve", mixins.RetrieveModelMixin.retrieve
+        ):
+            serializer_responses = [self._client_general.get(path) for path in paths]
+
+        for response, serializer_response in zip(responses, serializer_responses):
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, serializer_response.content)
@@ -46,7 +46,7 @@ class EventSeatTypeAPITestCase(APITestCase):
             self.EVENT_SEAT_TYPE_LIST_PATH, {"event": event.id}
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(json.loads(response.content)), 3)
+        self.assertEqual(len(json.loads(response.content)["results"]), 3)
 
     def test_only_creator_of_event_can_create_event_seat_types_for_a_event(
         self,
@@ -1,17 +1,28 @@
 import datetime
+from unittest.mock import patch
 
 import pytz
 from django.contrib.auth.models import User
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.utils import timezone
 from model_bakery import baker
-from rest_framework import status
+from rest_framework import mixins, status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
 
-from apps.events.models import Event, EventTag
+from apps.core.query_budget import QueryBudgetTestMixin
+from apps.core.renderers import ORJSONRenderer
+from apps.events.models import Event, EventSeat, EventSeatType, EventTag
+from apps.events.seat_map import SeatMap, seat_map_store
+from apps.events.serializers import EventSeatSerializer, EventSerializer
+from apps.events.tag_autocomplete import tag_autocomplete
+from apps.events.views import EventViewSet
+from apps.reservations.models import Reservation, ReservationEventSeat
 from apps.venues.models import Venue
 
 
-class EventAPITestCase(APITestCase):
+class EventAPITestCase(QueryBudgetTestMixin, APITestCase):
     EVENT_LIST_PATH = reverse("events:event-list")
 
     def setUp(self) -> None:
@@ -143,6 +154,42 @@ class EventAPITestCase(APITestCase):
         response = self._client_admin.post(self.EVENT_LIST_PATH, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_cant_create_event_inside_other_event_of_venue(self):
+        start_date = timezone.now() + datetime.timedelta(days=10)
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=start_date,
+            end_date=start_date + datetime.timedelta(days=5),
+        )
+        data = {
+            "name": "New Year Celebration",
+            "venue": event.venue.id,
+            "tags": [],
+            "start_date": start_date + datetime.timedelta(days=1),
+            "end_date": start_date + datetime.timedelta(days=2),
+        }
+        response = self._client_admin.post(self.EVENT_LIST_PATH, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertListEqual(
+            [str(error) for error in response.data],
+            [
+                str(
+                    EventSerializer._default_custom_error_message[
+                        "venue_start_date_end_date"
+                    ]
+                )
+            ],
+        )
+
+        # back to back events don't overlap
+        data["start_date"] = event.end_date
+        data["end_date"] = event.end_date + datetime.timedelta(days=1)
+        response = self._client_admin.post(self.EVENT_LIST_PATH, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_cant_create_event_with_end_date_less_than_start_date(self):
         data = {
             "name": "New Year Celebration",
@@ -172,3 +219,476 @@ class EventAPITestCase(APITestCase):
         }
         response = self._client_admin.patch(single_event_url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_map_of_event(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        event_seats = [
+            EventSeat.objects.create(event_seat_type=event.event_seat_types.first())
+            for _ in range(6)
+        ]
+        reserved = baker.make(
+            Reservation,
+            event=event,
+            status=Reservation.Status.RESERVED,
+            payment_id="payment_id",
+        )
+        created = baker.make(Reservation, event=event)
+        for event_seat in event_seats[1:3]:
+            baker.make(
+                ReservationEventSeat, reservation=reserved, event_seat=event_seat
+            )
+        baker.make(ReservationEventSeat, reservation=created, event_seat=event_seats[3])
+
+        seat_map_url = reverse("events:event-seat-map", kwargs={"pk": event.id})
+        response = self._client_general.get(seat_map_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["number_of_seats"], 6)
+        self.assertListEqual(
+            response.data["runs"],
+            [SeatMap.FREE, 1, SeatMap.SOLD, 2, SeatMap.HELD, 1, SeatMap.FREE, 2],
+        )
+
+        response = self._client_general.get(seat_map_url, {"encoding": "bitset"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["encoding"], "bitset")
+
+    def test_seat_map_readers_get_the_stale_map_while_it_is_rebuilt(self):
+        event = baker.make(Event)
+        EventSeat.objects.create(event_seat_type=baker.make(EventSeatType, event=event))
+        seat_map = seat_map_store.get(event.id)
+
+        # a writer couldn't patch the map and another reader is rebuilding it
+        cache.set(seat_map_store._stale_key(event.id), 1)
+        self.assertTrue(seat_map_store._acquire(event.id, wait=False))
+        self.addCleanup(seat_map_store._release, event.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(seat_map_store.get(event.id).version, seat_map.version)
+
+    def test_best_seats_never_leave_single_seat(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        event_seat_type = baker.make(EventSeatType, event=event)
+        event_seats = [
+            EventSeat.objects.create(event_seat_type=event_seat_type) for _ in range(6)
+        ]
+        reservation = baker.make(
+            Reservation,
+            event=event,
+            status=Reservation.Status.RESERVED,
+            payment_id="payment_id",
+        )
+        for event_seat in event_seats[1:3]:
+            baker.make(
+                ReservationEventSeat, reservation=reservation, event_seat=event_seat
+            )
+
+        best_seats_url = reverse("events:event-best-seats", kwargs={"pk": event.id})
+
+        response = self._client_general.get(
+            best_seats_url, {"count": 3, "seat_type": event_seat_type.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            [event_seat["seat_number"] for event_seat in response.data],
+            [event_seat.seat_number for event_seat in event_seats[3:]],
+        )
+
+        response = self._client_general.get(best_seats_url, {"count": 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_best_seats_of_seat_type_never_leave_single_seat_of_other_type(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        vip, general = baker.make(EventSeatType, event=event, _quantity=2)
+        event_seats = [EventSeat.objects.create(event_seat_type=vip)] + [
+            EventSeat.objects.create(event_seat_type=general) for _ in range(7)
+        ]
+        best_seats_url = reverse("events:event-best-seats", kwargs={"pk": event.id})
+
+        def get_best_seat_numbers():
+            response = self._client_general.get(
+                best_seats_url, {"count": 2, "seat_type": general.id}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [event_seat["seat_number"] for event_seat in response.data]
+
+        seat_numbers = [event_seat.seat_number for event_seat in event_seats]
+        # the free vip seat before the general ones is not left alone
+        self.assertListEqual(get_best_seat_numbers(), seat_numbers[2:4])
+
+        reservation = baker.make(Reservation, event=event)
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationEventSeat.objects.bulk_add(reservation, event_seats[2:4])
+
+        # the index is patched around the seats of the reservation
+        self.assertListEqual(get_best_seat_numbers(), seat_numbers[4:6])
+
+        # an unchanged map is searched in the index kept in process
+        with patch("apps.events.seat_finder.cache") as index_cache:
+            self.assertListEqual(get_best_seat_numbers(), seat_numbers[4:6])
+        index_cache.get.assert_not_called()
+
+    def test_nearby_events_are_ordered_by_distance(self):
+        start_date = timezone.now() + datetime.timedelta(hours=1)
+        events = [
+            Event.objects.create(
+                name=name,
+                user=self._user_admin,
+                status=Event.Status.CREATED,
+                venue=baker.make(Venue, location=Point(x, y, srid=4326)),
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(hours=3),
+            )
+            for name, x, y in [
+                ("Far", 90.4200, 23.8100),
+                ("Near", 90.4100, 23.8100),
+                ("Other city", 91.8300, 22.3500),
+            ]
+        ]
+        query = {
+            "x": 90.4101,
+            "y": 23.8101,
+            "radius": 3000,
+            "from": start_date.date(),
+            "to": start_date.date() + datetime.timedelta(days=1),
+        }
+
+        response = self._client_general.get(
+            reverse("events:event-nearby"), {**query, "page_size": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            [event["id"] for event in response.data["results"]], [str(events[1].id)]
+        )
+
+        response = self._client_general.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            [event["id"] for event in response.data["results"]], [str(events[0].id)]
+        )
+        self.assertGreater(response.data["results"][0]["distance"], 500)
+        self.assertIsNone(response.data["next"])
+
+    def test_cached_nearby_pages_link_to_the_point_of_each_caller(self):
+        start_date = timezone.now() + datetime.timedelta(hours=1)
+        for x in [90.4100, 90.4110]:
+            Event.objects.create(
+                name="Nearby",
+                user=self._user_admin,
+                status=Event.Status.CREATED,
+                venue=baker.make(Venue, location=Point(x, 23.8100, srid=4326)),
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(hours=3),
+            )
+        query = {
+            "radius": 3000,
+            "from": start_date.date(),
+            "to": start_date.date(),
+            "page_size": 1,
+        }
+
+        # both points are in the same geohash cell, so share its cached pages
+        first = self._client_general.get(
+            reverse("events:event-nearby"), {**query, "x": 90.4102, "y": 23.8102}
+        )
+        second = self._client_staff.get(
+            reverse("events:event-nearby"), {**query, "x": 90.4105, "y": 23.8104}
+        )
+        self.assertEqual(first.data["results"], second.data["results"])
+        self.assertIn("x=90.4102", first.data["next"])
+        self.assertIn("x=90.4105", second.data["next"])
+        self.assertNotIn("90.4102", second.data["next"])
+
+        response = self._client_staff.get(second.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("x=90.4105", response.data["previous"])
+
+    def test_search_ranks_name_matches_first(self):
+        start_date = timezone.now() + datetime.timedelta(hours=1)
+        description_match, name_match, _ = [
+            baker.make(
+                Event,
+                name=name,
+                description=description,
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(hours=3),
+            )
+            for name, description in [
+                ("Spring fair", "Open air jazz concerts all day"),
+                ("Jazz night", "Live music"),
+                ("Book fair", "Meet the authors"),
+            ]
+        ]
+
+        response = self._client_general.get(self.EVENT_LIST_PATH, {"q": "jazz"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            [event["id"] for event in response.data["results"]],
+            [str(name_match.id), str(description_match.id)],
+        )
+
+        # the search vector is written by the UPDATE of the event itself
+        name_match.name = "Blues night"
+        with self.assertNumQueries(1):
+            name_match.save(update_fields=["name"])
+        response = self._client_general.get(self.EVENT_LIST_PATH, {"q": "blues"})
+        self.assertListEqual(
+            [event["id"] for event in response.data["results"]], [str(name_match.id)]
+        )
+
+    def test_tag_autocomplete_matches_prefix(self):
+        for name in ["Music", "Musical", "Museum", "Comedy"]:
+            baker.make(EventTag, name=name)
+        autocomplete_url = reverse("events:eventtag-autocomplete")
+
+        response = self._client_general.get(autocomplete_url, {"prefix": "mus"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            [tag["name"] for tag in response.data], ["Music", "Museum", "Musical"]
+        )
+
+        # answered from the cached shorter prefix
+        with self.assertNumQueries(0):
+            tags = tag_autocomplete.find("Musi")
+        self.assertListEqual([tag["name"] for tag in tags], ["Music", "Musical"])
+
+        # the cache compares the prefix with the names as the database does
+        baker.make(EventTag, name="Straßenfest")
+        self.assertListEqual(
+            [tag["name"] for tag in tag_autocomplete.find("str")], ["Straßenfest"]
+        )
+        with self.assertNumQueries(0):
+            tags = tag_autocomplete.find("straß")
+        self.assertListEqual([tag["name"] for tag in tags], ["Straßenfest"])
+
+        response = self._client_general.get(autocomplete_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_event_reads_stay_within_query_budgets(self):
+        start_date = timezone.now() + datetime.timedelta(days=1)
+        tags = baker.make(EventTag, _quantity=2)
+
+        def create_events(size):
+            return baker.make(
+                Event,
+                tags=tags,
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(hours=3),
+                _quantity=size,
+            )
+
+        self.assertQueryBudget(
+            EventViewSet,
+            "list",
+            self._client_general,
+            create_events,
+            self.EVENT_LIST_PATH,
+        )
+        self.assertQueryBudget(
+            EventViewSet,
+            "retrieve",
+            self._client_general,
+            create_events,
+            lambda events: reverse("events:event-detail", kwargs={"pk": events[-1].id}),
+        )
+
+        event = create_events(1)[0]
+        event_seat_type = event.event_seat_types.first()
+
+        def create_reserved_seats(size):
+            reservation = baker.make(
+                Reservation,
+                event=event,
+                status=Reservation.Status.RESERVED,
+                payment_id="payment_id",
+            )
+            for _ in range(size):
+                baker.make(
+                    ReservationEventSeat,
+                    reservation=reservation,
+                    event_seat=EventSeat.objects.create(
+                        event_seat_type=event_seat_type
+                    ),
+                )
+
+        self.assertQueryBudget(
+            EventViewSet,
+            "reserved_seats",
+            self._client_general,
+            create_reserved_seats,
+            reverse("events:event-reserved-seats", kwargs={"pk": event.id}),
+        )
+
+    def test_reserved_seats_are_streamed_like_the_serializer_renders_them(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_admin,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.UTC),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.UTC),
+        )
+        reservation = baker.make(
+            Reservation, event=event, status=Reservation.Status.RESERVED
+        )
+        for event_seat_type in event.event_seat_types.all():
+            baker.make(
+                ReservationEventSeat,
+                reservation=reservation,
+                event_seat=EventSeat.objects.create(event_seat_type=event_seat_type),
+            )
+        path = reverse("events:event-reserved-seats", kwargs={"pk": event.id})
+
+        with patch.object(EventViewSet, "stream_chunk_size", 2):
+            response = self._client_general.get(path)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            ORJSONRenderer().render(
+                EventSeatSerializer(
+                    EventSeat.objects.filter(event_seat_type__event=event).order_by(
+                        "seat_number"
+                    ),
+                    many=True,
+                ).data
+            ),
+        )
+
+    def test_event_reads_are_cached_until_the_event_or_its_tags_change(self):
+        tag = baker.make(EventTag, name="jazz")
+        event = baker.make(Event, user=self._user_admin, name="Concert", tags=[tag])
+        single_event_url = reverse("events:event-detail", kwargs={"pk": event.id})
+
+        response = self._client_admin.get(single_event_url)
+        self.assertEqual(response.data["name"], "Concert")
+        # the ETag query and the savepoint and release of the request transaction
+        with self.assertNumQueries(3):
+            cached_response = self._client_admin.get(single_event_url)
+        self.assertEqual(cached_response.content, response.content)
+
+        self._client_admin.patch(single_event_url, {"name": "Jazz Concert"})
+        response = self._client_admin.get(single_event_url)
+        self.assertEqual(response.data["name"], "Jazz Concert")
+
+        tag.name = "blues"
+        tag.save()
+        response = self._client_admin.get(self.EVENT_LIST_PATH)
+        self.assertEqual(response.data["results"][0]["tags"][0]["name"], "blues")
+
+    def test_cached_event_object_permissions_are_per_user(self):
+        event = baker.make(Event, user=self._user_admin)
+        single_event_url = reverse("events:event-detail", kwargs={"pk": event.id})
+
+        for client, has_write_permission in [
+            (self._client_admin, True),
+            (self._client_general, False),
+        ]:
+            for path in [single_event_url, self.EVENT_LIST_PATH]:
+                response = client.get(path)
+                data = response.data.get("results", [response.data])[0]
+                self.assertEqual(
+                    data["object_permissions"]["write"], has_write_permission
+                )
+
+    def test_event_detail_is_not_modified_until_the_event_changes(self):
+        event = baker.make(Event, user=self._user_admin, name="Concert")
+        single_event_url = reverse("events:event-detail", kwargs={"pk": event.id})
+
+        response = self._client_admin.get(single_event_url)
+        self.assertIn("Last-Modified", response)
+        with self.assertNumQueries(3):
+            not_modified_response = self._client_admin.get(
+                single_event_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(
+            not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(not_modified_response["ETag"], response["ETag"])
+        not_modified_response = self._client_admin.get(
+            single_event_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(
+            not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        # the representation of another user differs by its object_permissions
+        response_general = self._client_general.get(
+            single_event_url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response_general.status_code, status.HTTP_200_OK)
+
+        self._client_admin.patch(single_event_url, {"name": "Jazz Concert"})
+        response = self._client_admin.get(
+            single_event_url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Jazz Concert")
+
+    def test_event_list_is_not_modified_until_its_events_or_tags_change(self):
+        tag = baker.make(EventTag, name="jazz")
+        events = baker.make(Event, tags=[tag], _quantity=2)
+
+        etag = self._client_admin.get(self.EVENT_LIST_PATH)["ETag"]
+        response = self._client_admin.get(self.EVENT_LIST_PATH, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        for change in [
+            lambda: EventTag.objects.get(id=tag.id).save(),
+            lambda: tag.delete(),
+            lambda: events[0].delete(),
+        ]:
+            change()
+            response = self._client_admin.get(
+                self.EVENT_LIST_PATH, HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response["ETag"]
+
+    def test_values_read_path_renders_like_serializer(self):
+        start_date = timezone.now() + datetime.timedelta(days=1)
+        tags = baker.make(EventTag, _quantity=3)
+        events = [
+            baker.make(
+                Event,
+                user=user,
+                tags=tags[:number_of_tags],
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(hours=3),
+            )
+            for user, number_of_tags in [
+                (self._user_admin, 3),
+                (self._user_general, 1),
+                (self._user_admin, 0),
+            ]
+        ]
+        paths = [
+            self.EVENT_LIST_PATH,
+            reverse("events:event-detail", kwargs={"pk": events[0].id}),
+        ]
+
+        responses = [self._client_admin.get(path) for path in paths]
+        with patch.object(
+            EventViewSet, "list", mixins.ListModelMixin.list
+        ), patch.object(EventViewSet, "retrieve", mixins.RetrieveModelMixin.retrieve):
+            serializer_responses = [self._client_admin.get(path) for path in paths]
+
+        for response, serializer_response in zip(responses, serializer_responses):
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, serializer_response.content)
@@ -1,14 +1,37 @@
+import datetime
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils.translation import gettext_lazy as _
 from dry_rest_permissions.generics import DRYPermissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from apps.events.models import Event
-from apps.events.serializers import EventSeatSerializer, EventSerializer
+from apps.core.mixins import (
+    CachedReadViewMixin,
+    ConditionalReadViewMixin,
+    ValuesReadViewMixin,
+)
+from apps.core.pagination import DistanceKeysetPagination, SearchRankKeysetPagination
+from apps.events.models import Event, EventSeat, EventTag
+from apps.events.seat_finder import best_seats_finder
+from apps.events.seat_map import SeatMap, seat_map_store
+from apps.events.serializers import (
+    BestEventSeatsQuerySerializer,
+    EventSeatSerializer,
+    EventSerializer,
+    NearbyEventSerializer,
+    NearbyEventsQuerySerializer,
+)
+from apps.venues.geo import get_geohash_cell
 
 
-class EventViewSet(ModelViewSet):
+class EventViewSet(
+    ConditionalReadViewMixin, CachedReadViewMixin, ValuesReadViewMixin, ModelViewSet
+):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = (
@@ -16,14 +39,47 @@ class EventViewSet(ModelViewSet):
         DRYPermissions,
     )
     filterset_fields = ("user", "venue", "status", "start_date", "end_date")
+    response_cache_object_values = {"user_id": "user"}
+    etag_related_updated = ("tags__updated",)
+    nearby_cache_timeout = 60
+    # set by the nearby action, which renders distances
+    renders_floats = False
+    query_budgets = {
+        "list": 5,
+        "retrieve": 5,
+        "event_statuses": 2,
+        "nearby": 4,
+        "reserved_seats": 5,
+        "seat_map": 6,
+        "best_seats": 8,
+    }
 
     def get_queryset(self):
-        return (
+        queryset = (
             super()
             .get_queryset()
             .select_related("user", "venue")
-            .prefetch_related("tags")
+            # same order of tags as the values() read path
+            .prefetch_related(
+                Prefetch("tags", queryset=EventTag.objects.order_by("id"))
+            )
         )
+        search_query = self._get_search_query()
+        if search_query:
+            queryset = Event.objects.search(search_query, queryset)
+        return queryset
+
+    def _get_search_query(self):
+        if self.action != "list":
+            return ""
+        return self.request.query_params.get("q", "").strip()
+
+    @property
+    def paginator(self):
+        # search results are ranked instead of ordered by creation
+        if self._get_search_query():
+            self.pagination_class = SearchRankKeysetPagination
+        return super().paginator
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -33,14 +89,113 @@ class EventViewSet(ModelViewSet):
         data = [{label: value} for value, label in Event.Status.choices]
         return Response(data)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=(IsAuthenticated,),
+        renders_floats=True,
+    )
+    def nearby(self, request):
+        """
+        Events around ?x (longitude) and ?y (latitude) within ?radius meters
+        that start from ?from to ?to (dates), closest first. The point is
+        snapped to the center of its geohash cell, so pages are cached per
+        cell and days.
+        """
+        query_serializer = NearbyEventsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        query = query_serializer.validated_data
+        geohash, point = get_geohash_cell(query["x"], query["y"])
+
+        paginator = DistanceKeysetPagination()
+        cache_key = (
+            f"events:nearby:{geohash}:{query['radius']}:{query['from']}:"
+            f"{query['to']}:{paginator.get_page_size(request)}:"
+            f"{request.query_params.get(paginator.cursor_query_param, '')}"
+        )
+        # links are built per request, they hold its point
+        page = cache.get(cache_key)
+        if page is None:
+            start_date_from = datetime.datetime.combine(
+                query["from"], datetime.time.min, tzinfo=datetime.timezone.utc
+            )
+            start_date_to = datetime.datetime.combine(
+                query["to"] + datetime.timedelta(days=1),
+                datetime.time.min,
+                tzinfo=datetime.timezone.utc,
+            )
+            events = paginator.paginate_queryset(
+                Event.objects.get_nearby(
+                    point, query["radius"], start_date_from, start_date_to
+                ),
+                request,
+                view=self,
+            )
+            page = {
+                "next": paginator.get_next_cursor(),
+                "previous": paginator.get_previous_cursor(),
+                "results": NearbyEventSerializer(
+                    events, many=True, context=self.get_serializer_context()
+                ).data,
+            }
+            cache.set(cache_key, page, self.nearby_cache_timeout)
+        return paginator.get_cursor_response(
+            request, page["next"], page["previous"], page["results"]
+        )
+
     @action(detail=True, methods=["get"], permission_classes=(IsAuthenticated,))
     def reserved_seats(self, request, pk=None):
+        """Seats of the reserved reservations of the event, streamed."""
+        event = self.get_object()
+        return self.get_streaming_response(
+            event.get_reserved_event_seats(), EventSeatSerializer
+        )
+
+    @action(detail=True, methods=["get"], permission_classes=(IsAuthenticated,))
+    def seat_map(self, request, pk=None):
+        """
+        Availability of every seat of the event indexed by seat_number,
+        either run-length encoded (default) or as the base64 encoded bitset
+        with 2 bits per seat when ?encoding=bitset.
+        """
+        event = self.get_object()
+        seat_map = seat_map_store.get(event.id)
+        data = {
+            "event": event.id,
+            "number_of_seats": seat_map.size,
+            "states": SeatMap.STATES,
+        }
+        if request.query_params.get("encoding") == "bitset":
+            data["encoding"] = "bitset"
+            data["bitset"] = seat_map.to_base64()
+        else:
+            data["encoding"] = "rle"
+            data["runs"] = seat_map.to_runs()
+        return Response(data)
+
+    @action(detail=True, methods=["get"], permission_classes=(IsAuthenticated,))
+    def best_seats(self, request, pk=None):
+        """
+        Best block of ?count adjacent free seats, optionally of one
+        ?seat_type, which never leaves a single seat orphan.
+        """
         event = self.get_object()
-        reserved_event_seats_of_a_event = event.get_reserved_event_seats()
+        query_serializer = BestEventSeatsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        seat_numbers = best_seats_finder.find(
+            event.id,
+            query_serializer.validated_data["count"],
+            query_serializer.validated_data.get("seat_type"),
+        )
+        if not seat_numbers:
+            raise NotFound(_("No adjacent seats available for requested count"))
+
+        event_seats = EventSeat.objects.select_related("event_seat_type__event").filter(
+            event=event, seat_number__in=seat_numbers
+        )
         return Response(
             EventSeatSerializer(
-                reserved_event_seats_of_a_event,
-                many=True,
-                context=self.get_serializer_context(),
+                event_seats, many=True, context=self.get_serializer_context()
             ).data
         )
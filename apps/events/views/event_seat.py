@@ -2,18 +2,24 @@ from dry_rest_permissions.generics import DRYPermissions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.mixins import ConditionalReadViewMixin, ValuesReadViewMixin
+from apps.core.pagination import SeatNumberKeysetPagination
+from apps.events.filters import EventSeatFilterSet
 from apps.events.models import EventSeat
 from apps.events.serializers import EventSeatSerializer
 
 
-class EventSeatViewSet(ModelViewSet):
+class EventSeatViewSet(ConditionalReadViewMixin, ValuesReadViewMixin, ModelViewSet):
     queryset = EventSeat.objects.all()
     serializer_class = EventSeatSerializer
     permission_classes = (
         IsAuthenticated,
         DRYPermissions,
     )
-    filterset_fields = ("event_seat_type", "event_seat_type__event")
+    filterset_class = EventSeatFilterSet
+    pagination_class = SeatNumberKeysetPagination
+    etag_related_updated = ("event_seat_type__updated",)
+    query_budgets = {"list": 5, "retrieve": 4}
 
     def get_queryset(self):
         return super().get_queryset().select_related("event_seat_type__event").all()
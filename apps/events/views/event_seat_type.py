@@ -2,11 +2,12 @@ from dry_rest_permissions.generics import DRYPermissions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.mixins import CachedReadViewMixin, ConditionalReadViewMixin
 from apps.events.models import EventSeatType
 from apps.events.serializers import EventSeatTypeSerializer
 
 
-class EventSeatTypeViewSet(ModelViewSet):
+class EventSeatTypeViewSet(ConditionalReadViewMixin, CachedReadViewMixin, ModelViewSet):
     queryset = EventSeatType.objects.all()
     serializer_class = EventSeatTypeSerializer
     permission_classes = (
@@ -14,6 +15,7 @@ class EventSeatTypeViewSet(ModelViewSet):
         DRYPermissions,
     )
     filterset_fields = ("event",)
+    query_budgets = {"list": 5, "retrieve": 4}
 
     def get_queryset(self):
         return super().get_queryset().select_related("event").all()
@@ -1,12 +1,18 @@
+from django.utils.translation import gettext_lazy as _
 from dry_rest_permissions.generics import DRYPermissions
+from rest_framework import serializers
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.mixins import ConditionalReadViewMixin
 from apps.events.models import EventTag
 from apps.events.serializers import EventTagSerializer
+from apps.events.tag_autocomplete import tag_autocomplete
 
 
-class EventTagViewSet(ModelViewSet):
+class EventTagViewSet(ConditionalReadViewMixin, ModelViewSet):
     queryset = EventTag.objects.all()
     serializer_class = EventTagSerializer
     permission_classes = (
@@ -14,3 +20,12 @@ class EventTagViewSet(ModelViewSet):
         DRYPermissions,
     )
     filterset_fields = ["name", "slug"]
+    query_budgets = {"list": 4, "retrieve": 4, "autocomplete": 3}
+
+    @action(detail=False, methods=["get"], permission_classes=(IsAuthenticated,))
+    def autocomplete(self, request):
+        """Up to 10 tags whose name starts with ?prefix, shortest first."""
+        prefix = request.query_params.get("prefix", "").strip()
+        if not prefix:
+            raise serializers.ValidationError({"prefix": [_("This field is required")]})
+        return Response(tag_autocomplete.find(prefix[:50]))
@@ -0,0 +1,25 @@
+# Generated by Django 4.0 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0003_alter_profile_bio"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="profile",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.reservations.models import Reservation, ReservationEventSeat
+from apps.reservations.models import Reservation, ReservationEventSeat, SeatClaim
 
 
 @admin.register(Reservation)
@@ -13,3 +13,10 @@ class ReservationAdmin(admin.ModelAdmin):
 class ReservationEventSeatAdmin(admin.ModelAdmin):
     list_display = ["id", "reservation", "event_seat"]
     readonly_fields = ["id"]
+
+
+@admin.register(SeatClaim)
+class SeatClaimAdmin(admin.ModelAdmin):
+    list_display = ["id", "reservation", "event_seat", "status", "expires_at"]
+    list_filter = ["status"]
+    readonly_fields = ["id"]
@@ -0,0 +1,20 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatClaimConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Seats are already claimed by other reservations.")
+    default_code = "seat_claim_conflict"
+
+    def __init__(self, event_seat_ids, detail=None):
+        self.event_seat_ids = list(event_seat_ids)
+        super().__init__(
+            {
+                "detail": detail or self.default_detail,
+                "event_seats": [
+                    str(event_seat_id) for event_seat_id in self.event_seat_ids
+                ],
+            }
+        )
@@ -0,0 +1,358 @@
+import json
+import random
+import re
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.gis.geos import Point
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from apps.events.models import Event, EventSeat, EventSeatInventory
+from apps.events.seat_map import seat_map_store
+from apps.reservations.models import Reservation, ReservationEventSeat
+from apps.venues.models import Venue
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+def get_percentile(sorted_values, percentile):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+def is_refunded(status, body) -> bool:
+    """
+    Whether a payment was refused after it was made, and so refunded : the
+    seats were taken meanwhile (409) or the event or the reservation can't be
+    paid anymore (400 with a detail, a missing payment_id is not refunded).
+    """
+    return status == 409 or (status == 400 and "detail" in (body or {}))
+
+
+class Buyer:
+    """A user with a session cookie who buys seats through the api."""
+
+    def __init__(self, base_url, user, results):
+        self.base_url = base_url.rstrip("/")
+        self.user = user
+        self.results = results
+
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        self.session_key = session.session_key
+        self.csrf_token = get_random_string(64)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Cookie": f"sessionid={session.session_key}; csrftoken={self.csrf_token}",
+            "X-CSRFToken": self.csrf_token,
+        }
+
+    def request(self, endpoint, method, path, data=None):
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=None if data is None else json.dumps(data).encode(),
+            headers=self.headers,
+            method=method,
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                status, headers, body = (
+                    response.status,
+                    response.headers,
+                    response.read(),
+                )
+        except urllib.error.HTTPError as exc:
+            status, headers, body = exc.code, exc.headers, exc.read()
+        self.results.record(
+            endpoint,
+            status,
+            time.perf_counter() - started,
+            headers.get("Server-Timing"),
+        )
+        return status, json.loads(body) if body else None
+
+    def purchase(self, event_id, event_seat_ids, payment_id):
+        """Goes through the purchase funnel, returns the step it stopped at."""
+        status, reservation = self.request(
+            "create_reservation", "POST", "/api/reservations", {"event": event_id}
+        )
+        if status != 201:
+            return "create_reservation"
+
+        reservation_path = f"/api/reservations/{reservation['id']}"
+        for endpoint, method, path, data, expected_status in [
+            (
+                "add_seats",
+                "POST",
+                "/api/reservation_event_seats/bulk",
+                {"reservation": reservation["id"], "event_seats": event_seat_ids},
+                201,
+            ),
+            (
+                "final_validation",
+                "GET",
+                f"{reservation_path}/final_validation",
+                None,
+                200,
+            ),
+            (
+                "payment_successful",
+                "POST",
+                f"{reservation_path}/payment_successful",
+                {"payment_id": payment_id},
+                200,
+            ),
+            ("ticket", "GET", f"{reservation_path}/ticket", None, 200),
+        ]:
+            status, body = self.request(endpoint, method, path, data)
+            if status != expected_status:
+                if endpoint == "payment_successful" and is_refunded(status, body):
+                    self.results.record_refund()
+                return endpoint
+        return "ticket"
+
+
+class LoadTestResults:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.stopped_at = Counter()
+        self.refunds = 0
+
+    def record(self, endpoint, status, seconds, server_timing):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+            match = SERVER_TIMING_QUERIES_RE.search(server_timing or "")
+            if match:
+                self.queries[endpoint].append(int(match.group(1)))
+
+    def record_refund(self):
+        with self._lock:
+            self.refunds += 1
+
+    def get_endpoint_stats(self) -> dict:
+        endpoint_stats = {}
+        for endpoint, latencies in self.latencies.items():
+            latencies = sorted(latencies)
+            queries = self.queries[endpoint]
+            endpoint_stats[endpoint] = {
+                "requests": len(latencies),
+                "statuses": {
+                    str(status): count
+                    for status, count in sorted(self.statuses[endpoint].items())
+                },
+                "p50_ms": round(get_percentile(latencies, 50) * 1000, 3),
+                "p95_ms": round(get_percentile(latencies, 95) * 1000, 3),
+                "p99_ms": round(get_percentile(latencies, 99) * 1000, 3),
+                "queries_mean": round(statistics.mean(queries), 2) if queries else None,
+                "queries_max": max(queries, default=None),
+            }
+        return endpoint_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds an event with many seats and drives concurrent buyers through "
+        "reservation, seats, final validation, payment and ticket against a "
+        "running server of the same database, then writes the results as JSON. "
+        "Run the server with QUERY_STATS_SAMPLE_RATE = 1 to get query counts. "
+        "The seeded event, venue and users are deleted at the end unless --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--seats", type=int, default=30_000, help="Number of seats of the event"
+        )
+        parser.add_argument(
+            "--buyers", type=int, default=50, help="Number of concurrent buyers"
+        )
+        parser.add_argument(
+            "--purchases",
+            type=int,
+            default=2_000,
+            help="Number of purchases attempted by all buyers together",
+        )
+        parser.add_argument(
+            "--seats-per-purchase",
+            type=int,
+            default=2,
+            help="Even number of adjacent seats bought together",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the seats chosen by buyers"
+        )
+        parser.add_argument("--output", default="load_test_purchases.json")
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded event, venue and users to look at them",
+        )
+
+    def handle(self, *args, **options):
+        event = self._seed_event(options["seats"])
+        seat_groups = self._get_seat_groups(event, options)
+        results = LoadTestResults()
+        buyers = self._create_buyers(options, results)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(buyers)) as executor:
+            stopped_at = executor.map(
+                lambda index: buyers[index % len(buyers)].purchase(
+                    str(event.id), seat_groups[index], f"load-test-{index}"
+                ),
+                range(options["purchases"]),
+            )
+            results.stopped_at.update(stopped_at)
+        elapsed_seconds = time.perf_counter() - started
+
+        report = self._get_report(event, options, results, elapsed_seconds)
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+        if not options["keep"]:
+            self._delete_seeded(event, buyers)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['purchases_per_second']:.1f} purchases/s, "
+                f"{report['purchases']} purchases, "
+                f"{report['double_sold_seats']} double sold seats, "
+                f"{report['refunds']} refunds, written to {options['output']}"
+            )
+        )
+
+    def _seed_event(self, number_of_seats) -> Event:
+        start_date = timezone.now() + timedelta(days=30)
+        event = Event.objects.create(
+            name="Load test",
+            user=User.objects.create_user(f"load-test-{get_random_string(12)}"),
+            venue=Venue.objects.create(
+                name="Load test", address="Load test", location=Point(0, 0, srid=4326)
+            ),
+            start_date=start_date,
+            end_date=start_date + timedelta(hours=3),
+        )
+        event_seat_types = list(event.event_seat_types.order_by("price"))
+        EventSeat.objects.bulk_create(
+            [
+                EventSeat(
+                    event_seat_type=event_seat_types[
+                        seat_number * len(event_seat_types) // number_of_seats
+                    ],
+                    seat_number=seat_number,
+                )
+                for seat_number in range(number_of_seats)
+            ],
+            batch_size=5_000,
+        )
+        # bulk_create doesn't send post_save
+        EventSeatInventory.objects.rebuild([event.id])
+        seat_map_store.invalidate(event.id)
+        self.stdout.write(f"Seeded event {event.id} with {number_of_seats} seats")
+        return event
+
+    def _create_buyers(self, options, results) -> list:
+        users = User.objects.bulk_create(
+            [
+                User(username=f"load-test-{get_random_string(12)}")
+                for _ in range(options["buyers"])
+            ]
+        )
+        return [Buyer(options["base_url"], user, results) for user in users]
+
+    def _get_seat_groups(self, event, options) -> list:
+        """
+        Random groups of adjacent seats aligned on their size, so a group never
+        leaves a single seat. Groups repeat across purchases, which makes
+        buyers compete for the same seats.
+        """
+        seats_per_purchase = options["seats_per_purchase"]
+        event_seat_ids = list(
+            EventSeat.objects.filter(event=event)
+            .order_by("seat_number")
+            .values_list("id", flat=True)
+        )
+        number_of_groups = len(event_seat_ids) // seats_per_purchase
+        choose = random.Random(options["seed"]).randrange
+        return [
+            [
+                str(event_seat_id)
+                for event_seat_id in event_seat_ids[
+                    group * seats_per_purchase : (group + 1) * seats_per_purchase
+                ]
+            ]
+            for group in (choose(number_of_groups) for _ in range(options["purchases"]))
+        ]
+
+    def _get_report(self, event, options, results, elapsed_seconds) -> dict:
+        double_sold_seats = (
+            ReservationEventSeat.objects.filter(
+                reservation__event=event,
+                reservation__status=Reservation.Status.RESERVED,
+            )
+            .values("event_seat_id")
+            .annotate(reservations=Count("reservation_id"))
+            .filter(reservations__gt=1)
+            .count()
+        )
+        purchases = results.stopped_at["ticket"]
+        return {
+            "commit": self._get_commit(),
+            "options": {
+                name: options[name]
+                for name in [
+                    "seats",
+                    "buyers",
+                    "purchases",
+                    "seats_per_purchase",
+                    "seed",
+                ]
+            },
+            "seconds": round(elapsed_seconds, 3),
+            "purchases": purchases,
+            "purchases_per_second": purchases / elapsed_seconds,
+            "stopped_at": dict(results.stopped_at),
+            "double_sold_seats": double_sold_seats,
+            "refunds": results.refunds,
+            "endpoints": results.get_endpoint_stats(),
+        }
+
+    def _delete_seeded(self, event, buyers):
+        event.delete()
+        Venue.objects.filter(id=event.venue_id).delete()
+        User.objects.filter(
+            id__in=[event.user_id] + [buyer.user.id for buyer in buyers]
+        ).delete()
+        Session.objects.filter(
+            session_key__in=[buyer.session_key for buyer in buyers]
+        ).delete()
+        self.stdout.write(f"Deleted event {event.id}, its venue and users")
+
+    def _get_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
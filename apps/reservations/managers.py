@@ -0,0 +1,293 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+def get_seat_inventory_counter_name(status):
+    from apps.reservations.models import Reservation
+
+    if status in Reservation.HELD_STATUSES:
+        return "held"
+    elif status == Reservation.Status.RESERVED:
+        return "sold"
+    return None
+
+
+def get_seat_state(status):
+    """The state on the seat map of the seats of a reservation of status."""
+    from apps.events.seat_map import SeatMap
+
+    return {"held": SeatMap.HELD, "sold": SeatMap.SOLD}.get(
+        get_seat_inventory_counter_name(status), SeatMap.FREE
+    )
+
+
+class ReservationQuerySet(models.QuerySet):
+    def with_owner_ids(self):
+        """Annotates the id of the event creator for the object permissions."""
+        return self.annotate(event_user_id=F("event__user_id"))
+
+    @transaction.atomic
+    def update_status(self, status, **kwargs):
+        """
+        Changes the status of the reservations and moves the seat inventory
+        counters and seat claims of their events in the same transaction, seat
+        maps and seat holds are updated after commit. Reservation statuses must
+        be changed through this method instead of update().
+        """
+        from apps.reservations.models import ReservationEventSeat, SeatClaim
+
+        reservation_ids = list(
+            self.select_for_update().exclude(status=status).values_list("id", flat=True)
+        )
+        if not reservation_ids:
+            return 0
+
+        seat_changes = _get_seat_changes(
+            ReservationEventSeat.objects.filter(reservation_id__in=reservation_ids),
+            status,
+        )
+
+        updated = self.model.objects.filter(id__in=reservation_ids).update(
+            status=status, updated=timezone.now(), **kwargs
+        )
+        if get_seat_inventory_counter_name(status) is None:
+            SeatClaim.objects.release(reservation_ids)
+
+        _add_to_seat_inventories(seat_changes)
+        _update_seat_stores_on_commit(status, seat_changes)
+        return updated
+
+    @transaction.atomic
+    def delete(self):
+        """Deletes the reservations, their seats are deleted first to be counted."""
+        from apps.reservations.models import ReservationEventSeat
+
+        ReservationEventSeat.objects.filter(reservation__in=self.values("pk")).delete()
+        return super().delete()
+
+
+class ReservationEventSeatQuerySet(models.QuerySet):
+    def with_owner_ids(self):
+        """
+        Annotates the ids of the users of the reservation and of its event for
+        the object permissions.
+        """
+        return self.annotate(
+            reservation_user_id=F("reservation__user_id"),
+            event_user_id=F("reservation__event__user_id"),
+        )
+
+    def release_seats(self):
+        """
+        Moves the seat inventory counters and seat claims of the reservation
+        event seats as if they were deleted, with one UPDATE per event seat type
+        and per reservation. Seat maps and seat holds are updated after commit.
+        """
+        from apps.reservations.models import SeatClaim
+
+        seat_changes = _get_seat_changes(self, None)
+        _add_to_seat_inventories(seat_changes)
+        for reservation_id, event_seat_ids in seat_changes[
+            "reservation_event_seat_ids"
+        ].items():
+            SeatClaim.objects.release([reservation_id], event_seat_ids)
+        _update_seat_stores_on_commit(None, seat_changes)
+
+    @transaction.atomic
+    def delete(self):
+        self.release_seats()
+        return super().delete()
+
+
+def _get_seat_changes(reservation_event_seats, status):
+    """
+    Counter deltas per (event, event seat type) of moving the reservation
+    event seats to status, with their seat ids and numbers per event and
+    their seat ids per reservation.
+    """
+    seat_changes = {
+        "deltas": defaultdict(lambda: defaultdict(int)),
+        "event_seat_ids": defaultdict(list),
+        "seat_numbers": defaultdict(list),
+        "reservation_event_seat_ids": defaultdict(list),
+    }
+    new_counter_name = get_seat_inventory_counter_name(status)
+    for (
+        reservation_id,
+        event_id,
+        old_status,
+        event_seat_type_id,
+        event_seat_id,
+        seat_number,
+    ) in reservation_event_seats.order_by().values_list(
+        "reservation_id",
+        "reservation__event_id",
+        "reservation__status",
+        "event_seat__event_seat_type_id",
+        "event_seat_id",
+        "event_seat__seat_number",
+    ):
+        delta = seat_changes["deltas"][(event_id, event_seat_type_id)]
+        old_counter_name = get_seat_inventory_counter_name(old_status)
+        if old_counter_name:
+            delta[old_counter_name] -= 1
+        if new_counter_name:
+            delta[new_counter_name] += 1
+        seat_changes["event_seat_ids"][event_id].append(event_seat_id)
+        seat_changes["seat_numbers"][event_id].append(seat_number)
+        seat_changes["reservation_event_seat_ids"][reservation_id].append(event_seat_id)
+    return seat_changes
+
+
+def _add_to_seat_inventories(seat_changes):
+    from apps.events.models import EventSeatInventory
+
+    # stable order so concurrent transactions lock inventories in same order
+    for (event_id, event_seat_type_id), delta in sorted(seat_changes["deltas"].items()):
+        EventSeatInventory.objects.add(event_id, event_seat_type_id, **delta)
+
+
+def _update_seat_stores_on_commit(status, seat_changes):
+    from apps.events.seat_map import seat_map_store
+    from apps.reservations.models import Reservation
+    from apps.reservations.seat_holds import seat_hold_store
+
+    for event_id, ids in seat_changes["event_seat_ids"].items():
+        seat_map_store.refresh_seats_on_commit(
+            event_id,
+            ids,
+            seat_changes["seat_numbers"][event_id],
+            get_seat_state(status),
+        )
+
+    for reservation_id, ids in seat_changes["reservation_event_seat_ids"].items():
+        if status == Reservation.Status.RESERVED:
+            seat_hold_store.mark_sold_on_commit(ids)
+        elif get_seat_inventory_counter_name(status) is None:
+            seat_hold_store.release_on_commit(reservation_id, ids)
+
+
+class ReservationEventSeatManager(
+    models.Manager.from_queryset(ReservationEventSeatQuerySet)
+):
+    @transaction.atomic
+    def bulk_add(self, reservation, event_seats):
+        """
+        Adds the event seats to the reservation with one INSERT. bulk_create
+        doesn't send post_save, so the seat inventory counters and the seat map
+        are moved here.
+        """
+        from apps.events.models import EventSeatInventory
+        from apps.events.seat_map import seat_map_store
+
+        reservation_event_seats = self.bulk_create(
+            [
+                self.model(reservation=reservation, event_seat=event_seat)
+                for event_seat in event_seats
+            ]
+        )
+
+        counter_name = get_seat_inventory_counter_name(reservation.status)
+        if counter_name:
+            deltas = defaultdict(int)
+            for event_seat in event_seats:
+                deltas[event_seat.event_seat_type_id] += 1
+            for event_seat_type_id, seats in sorted(deltas.items()):
+                EventSeatInventory.objects.add(
+                    reservation.event_id, event_seat_type_id, **{counter_name: seats}
+                )
+
+        seat_map_store.refresh_seats_on_commit(
+            reservation.event_id,
+            [event_seat.id for event_seat in event_seats],
+            [event_seat.seat_number for event_seat in event_seats],
+            get_seat_state(reservation.status),
+        )
+        return reservation_event_seats
+
+
+class SeatClaimManager(models.Manager):
+    def _get_conflicts(self, reservation, event_seat_ids):
+        return list(
+            self.filter(
+                event_seat_id__in=event_seat_ids,
+                status__in=self.model.ACTIVE_STATUSES,
+            )
+            .exclude(reservation=reservation)
+            .values_list("event_seat_id", flat=True)
+        )
+
+    def _insert(self, reservation, event_seat_ids, status, expires_at=None):
+        from apps.reservations.exceptions import SeatClaimConflict
+
+        try:
+            with transaction.atomic():
+                self.bulk_create(
+                    [
+                        self.model(
+                            reservation=reservation,
+                            event_seat_id=event_seat_id,
+                            status=status,
+                            expires_at=expires_at,
+                        )
+                        for event_seat_id in event_seat_ids
+                    ]
+                )
+        except IntegrityError:
+            raise SeatClaimConflict(self._get_conflicts(reservation, event_seat_ids))
+
+    @transaction.atomic
+    def hold(self, reservation, event_seat_ids):
+        """
+        Claims the seats for the reservation until it expires. Expired holds
+        of these seats are released first. Raises SeatClaimConflict with the
+        seats actively claimed by other reservations.
+        """
+        from apps.reservations.models import Reservation
+
+        event_seat_ids = list(event_seat_ids)
+        self.filter(
+            event_seat_id__in=event_seat_ids,
+            status=self.model.Status.HELD,
+            expires_at__lte=timezone.now(),
+        ).update(status=self.model.Status.RELEASED)
+
+        self._insert(
+            reservation,
+            event_seat_ids,
+            self.model.Status.HELD,
+            reservation.created + timedelta(seconds=Reservation.valid_for_seconds),
+        )
+
+    @transaction.atomic
+    def sell(self, reservation):
+        """
+        Turns the held claims of the reservation into sold ones and claims its
+        seats that were never held. Raises SeatClaimConflict with the seats
+        actively claimed by other reservations.
+        """
+        self.filter(reservation=reservation, status=self.model.Status.HELD).update(
+            status=self.model.Status.SOLD, expires_at=None
+        )
+
+        unclaimed_event_seat_ids = list(
+            reservation.event_seats.exclude(
+                event_seat_id__in=self.filter(
+                    reservation=reservation, status=self.model.Status.SOLD
+                ).values("event_seat_id")
+            ).values_list("event_seat_id", flat=True)
+        )
+        if unclaimed_event_seat_ids:
+            self._insert(reservation, unclaimed_event_seat_ids, self.model.Status.SOLD)
+
+    def release(self, reservation_ids, event_seat_ids=None):
+        claims = self.filter(
+            reservation_id__in=reservation_ids, status__in=self.model.ACTIVE_STATUSES
+        )
+        if event_seat_ids is not None:
+            claims = claims.filter(event_seat_id__in=event_seat_ids)
+        return claims.update(status=self.model.Status.RELEASED)
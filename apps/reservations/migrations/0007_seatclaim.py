@@ -0,0 +1,91 @@
+# Generated by Django 4.0 on 2026-10-18 11:40
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_sold_seat_claims(apps, schema_editor):
+    ReservationEventSeat = apps.get_model("reservations", "ReservationEventSeat")
+    SeatClaim = apps.get_model("reservations", "SeatClaim")
+
+    seat_claims = {}
+    for reservation_id, event_seat_id in (
+        ReservationEventSeat.objects.filter(reservation__status=5)
+        .order_by("reservation__created")
+        .values_list("reservation_id", "event_seat_id")
+        .iterator()
+    ):
+        # first reserved reservation of a seat owns it
+        seat_claims.setdefault(
+            event_seat_id,
+            SeatClaim(
+                reservation_id=reservation_id, event_seat_id=event_seat_id, status=2
+            ),
+        )
+    SeatClaim.objects.bulk_create(seat_claims.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_eventseatinventory"),
+        (
+            "reservations",
+            "0006_remove_reservationeventseat_reservations_reservationeventseat_unique_reservation_event_seat_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatClaim",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[(1, "Held"), (2, "Sold"), (3, "Released")], default=1
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "event_seat",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="claims",
+                        to="events.eventseat",
+                    ),
+                ),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seat_claims",
+                        to="reservations.reservation",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="seatclaim",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", [1, 2])),
+                fields=("event_seat",),
+                name="reservations_seatclaim_unique_active_event_seat",
+            ),
+        ),
+        migrations.RunPython(
+            create_sold_seat_claims, reverse_code=migrations.RunPython.noop
+        ),
+    ]
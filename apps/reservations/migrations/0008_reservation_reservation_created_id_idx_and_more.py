@@ -0,0 +1,25 @@
+# Generated by Django 4.0 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0007_seatclaim"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["created", "id"], name="reservation_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationeventseat",
+            index=models.Index(
+                fields=["created", "id"], name="res_event_seat_created_id_idx"
+            ),
+        ),
+    ]
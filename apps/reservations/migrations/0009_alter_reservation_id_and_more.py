@@ -0,0 +1,45 @@
+# Generated by Django 4.0 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0008_reservation_reservation_created_id_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="reservation",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reservationeventseat",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="seatclaim",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0009_alter_reservation_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                condition=models.Q(("status", 1)),
+                fields=["created"],
+                name="reservation_expiry_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from apps.reservations.models.reservation import Reservation
 from apps.reservations.models.reservation_event_seat import ReservationEventSeat
+from apps.reservations.models.seat_claim import SeatClaim
 
-__all__ = ["Reservation", "ReservationEventSeat"]
+__all__ = ["Reservation", "ReservationEventSeat", "SeatClaim"]
@@ -1,12 +1,15 @@
 import uuid
 
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models import Q
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum, Value
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.models import BaseModel
 from apps.events.models import Event
+from apps.reservations.managers import ReservationQuerySet
 
 
 class Reservation(BaseModel):
@@ -18,15 +21,32 @@ class Reservation(BaseModel):
         PAYMENT_COMPLETE = 4, "Payment Complete"
         RESERVED = 5, "Reserved"
 
+    # seats of reservations in these statuses are counted as held
+    HELD_STATUSES = [
+        Status.CREATED,
+        Status.PAYMENT_STARTED,
+        Status.PAYMENT_COMPLETE,
+    ]
+
     valid_for_seconds = 15 * 60
+    summary_cache_timeout = 24 * 60 * 60
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     status = models.SmallIntegerField(choices=Status.choices, default=Status.CREATED)
     payment_id = models.CharField(max_length=256, null=True, blank=True)
     ticket_number = models.UUIDField(editable=False, default=uuid.uuid4, unique=True)
 
+    objects = ReservationQuerySet.as_manager()
+
     class Meta:
         default_related_name = "reservations"
+        indexes = [
+            models.Index(fields=["created", "id"], name="reservation_created_id_idx"),
+            # expired created reservations are found by the invalidator
+            models.Index(
+                fields=["created"], condition=Q(status=1), name="reservation_expiry_idx"
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 name="%(app_label)s_%(class)s_completed_payment_must_have_payment_id",
@@ -46,6 +66,14 @@ class Reservation(BaseModel):
     def __str__(self):
         return f"{self.event.name} | {self.user.username}"
 
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        from apps.reservations.models import ReservationEventSeat
+
+        # seats are deleted first so they leave the seat inventories
+        ReservationEventSeat.objects.filter(reservation=self).delete()
+        return super().delete(*args, **kwargs)
+
     @staticmethod
     def has_read_permission(request):
         return True
@@ -55,72 +83,62 @@ class Reservation(BaseModel):
         return True
 
     def has_object_read_permission(self, request):
-        if self.user == request.user or self.event.user == request.user:
-            return True
-        return False
+        return request.user.id in self.get_owner_ids()
 
     def has_object_write_permission(self, request):
-        if self.user == request.user or self.event.user == request.user:
-            return True
-        return False
+        return request.user.id in self.get_owner_ids()
 
-    def is_valid(self):
+    def get_owner_ids(self):
+        """
+        Ids of the users of the reservation and of its event, the latter
+        annotated by with_owner_ids() so pages of reservations are checked
+        without loading any event or user.
+        """
+        event_user_id = getattr(self, "event_user_id", None)
+        if event_user_id is None:
+            event_user_id = self.event.user_id
+        return self.user_id, event_user_id
 
-        from apps.reservations.models import ReservationEventSeat
+    def get_status_error(self):
+        if self.status == Reservation.Status.INVALIDATED:
+            return {"status": _("Reservation is invalidated.")}
 
-        reservation = self
-        if reservation.status == Reservation.Status.INVALIDATED:
-            return False, {"status": _("Reservation is invalidated.")}
-
-        elif reservation.status == Reservation.Status.RESERVED:
-            return False, {"status": _("Reservation is reserved already.")}
-
-        # find event seats in a reservation that is already reserved
-        # by other reservation
-        reservation_event_seat_ids = ReservationEventSeat.objects.filter(
-            reservation=reservation
-        ).values_list("event_seat_id", flat=True)
-
-        event_seat_ids = (
-            ReservationEventSeat.objects.select_related("reservation")
-            .filter(
-                ~Q(reservation=reservation)
-                & Q(reservation__status__gte=Reservation.Status.PAYMENT_COMPLETE)
-                & Q(event_seat__in=list(reservation_event_seat_ids)),
-            )
-            .values_list("event_seat_id", flat=True)
-        )
-
-        # event_seat_ids = []
-        # for reservation_event_seat in reservation.event_seats.all():
-        #     if reservation_event_seat.event_seat.is_reserved():
-        #         event_seat_ids.append(reservation_event_seat.event_seat.id)
+        elif self.status == Reservation.Status.RESERVED:
+            return {"status": _("Reservation is reserved already.")}
 
-        if event_seat_ids:
-            return False, {
-                "reserved_seats": event_seat_ids,
-                "message": _("You selected already reserved seats."),
-            }
+        return None
 
-        return True, _("Valid")
+    def _get_summary_cache_key(self):
+        return f"reservations:summary:{self.id}"
 
     def get_summary(self) -> dict:
-        reservation = self
-        event_seats = reservation.event_seats.values("event_seat")
-        number_of_seats_of_a_reservation = len(event_seats)
-        seat_numbers_of_a_reservation = [
-            event_seat.seat_number for event_seat in event_seats
-        ]
-        total_cost_of_a_reservation = 0
-        for event_seat in event_seats:
-            total_cost_of_a_reservation += event_seat.event_seat_type.price
+        """
+        Seats and cost of the reservation from one aggregate query. A reserved
+        reservation never changes, so its summary is cached.
+        """
+        if self.status == Reservation.Status.RESERVED:
+            data = cache.get(self._get_summary_cache_key())
+            if data is not None:
+                return data
 
+        from apps.reservations.models import ReservationEventSeat
+
+        seats = ReservationEventSeat.objects.filter(reservation=self).aggregate(
+            number_of_seats=Count("id"),
+            total_cost=Sum("event_seat__event_seat_type__price", default=0),
+            seat_numbers=ArrayAgg(
+                "event_seat__seat_number",
+                ordering="event_seat__seat_number",
+                default=Value([]),
+            ),
+        )
         data = {
-            "event_name": reservation.event.name,
-            "reservation_id": reservation.id,
-            "ticket_number": reservation.ticket_number,
-            "number_of_seats": number_of_seats_of_a_reservation,
-            "total_cost": total_cost_of_a_reservation,
-            "seat_numbers": seat_numbers_of_a_reservation,
+            "event_name": self.event.name,
+            "reservation_id": self.id,
+            "ticket_number": self.ticket_number,
+            **seats,
         }
+
+        if self.status == Reservation.Status.RESERVED:
+            cache.set(self._get_summary_cache_key(), data, self.summary_cache_timeout)
         return data
@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 
 from apps.core.models import BaseModel
 from apps.events.models import EventSeat
+from apps.reservations.managers import ReservationEventSeatManager
 from apps.reservations.models import Reservation
 
 
@@ -13,9 +14,21 @@ class ReservationEventSeat(BaseModel):
         EventSeat, on_delete=models.CASCADE, related_name="reservations"
     )
 
+    objects = ReservationEventSeatManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created", "id"], name="res_event_seat_created_id_idx")
+        ]
+
     def __str__(self):
         return f"{self.reservation} | {self.event_seat}"
 
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        ReservationEventSeat.objects.filter(pk=self.pk).release_seats()
+        return super().delete(*args, **kwargs)
+
     @staticmethod
     def has_read_permission(request):
         return True
@@ -25,17 +38,13 @@ class ReservationEventSeat(BaseModel):
         return True
 
     def has_object_read_permission(self, request):
-        if (
-            self.reservation.user == request.user
-            or self.reservation.event.user == request.user
-        ):
-            return True
-        return False
+        return request.user.id in self.get_owner_ids()
 
     def has_object_write_permission(self, request):
-        if (
-            self.reservation.user == request.user
-            or self.reservation.event.user == request.user
-        ):
-            return True
-        return False
+        return request.user.id in self.get_owner_ids()
+
+    def get_owner_ids(self):
+        """Same as Reservation.get_owner_ids(), annotated by with_owner_ids()."""
+        if getattr(self, "event_user_id", None) is None:
+            return self.reservation.get_owner_ids()
+        return self.reservation_user_id, self.event_user_id
@@ -0,0 +1,45 @@
+from django.db import models
+from django.db.models import Q
+
+from apps.core.models import BaseModel
+from apps.events.models import EventSeat
+from apps.reservations.managers import SeatClaimManager
+from apps.reservations.models import Reservation
+
+
+class SeatClaim(BaseModel):
+    """
+    Ownership of an event seat by a reservation. The partial unique index
+    lets a seat have at most one active (held or sold) claim, so concurrent
+    buyers can never both own a seat whatever they checked before.
+    """
+
+    class Status(models.IntegerChoices):
+        HELD = 1, "Held"
+        SOLD = 2, "Sold"
+        RELEASED = 3, "Released"
+
+    ACTIVE_STATUSES = [Status.HELD, Status.SOLD]
+
+    event_seat = models.ForeignKey(
+        EventSeat, on_delete=models.CASCADE, related_name="claims"
+    )
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.CASCADE, related_name="seat_claims"
+    )
+    status = models.SmallIntegerField(choices=Status.choices, default=Status.HELD)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    objects = SeatClaimManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event_seat"],
+                condition=Q(status__in=[1, 2]),
+                name="%(app_label)s_%(class)s_unique_active_event_seat",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.reservation_id} | {self.event_seat_id} | {self.status}"
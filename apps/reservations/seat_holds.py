@@ -0,0 +1,86 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from apps.reservations.models import Reservation
+
+
+class SeatHoldStore:
+    """
+    Seat holds kept in a cache, so adding a seat held by another reservation
+    is rejected without reading its seat claims. A seat is held once its
+    seat claim is committed, the key expires together with the reservation,
+    so holds are released without any sweeper. Seats of reserved
+    reservations are kept as sold without expiry.
+    """
+
+    SOLD = "sold"
+
+    def __init__(self, alias="seat_holds"):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, event_seat_id):
+        return f"reservations:seat_hold:{event_seat_id}"
+
+    def get_timeout(self, reservation) -> int:
+        elapsed_seconds = (timezone.now() - reservation.created).total_seconds()
+        return max(int(Reservation.valid_for_seconds - elapsed_seconds), 1)
+
+    def get_holders(self, event_seat_ids) -> dict:
+        """Maps every held or sold seat id to its reservation id or SOLD."""
+        keys = {
+            self._key(event_seat_id): event_seat_id for event_seat_id in event_seat_ids
+        }
+        return {
+            keys[key]: holder for key, holder in self.cache.get_many(list(keys)).items()
+        }
+
+    def hold(self, reservation, event_seat_ids):
+        """
+        Holds the seats for the reservation. Its seat claims are taken in the
+        database first and have the final word, so whatever the cache keeps
+        for these seats is overwritten.
+        """
+        holder = str(reservation.id)
+        self.cache.set_many(
+            {self._key(event_seat_id): holder for event_seat_id in event_seat_ids},
+            timeout=self.get_timeout(reservation),
+        )
+
+    def release(self, reservation_id, event_seat_ids):
+        """Releases the seats that are still held by the reservation."""
+        holder = str(reservation_id)
+        self.cache.delete_many(
+            [
+                self._key(event_seat_id)
+                for event_seat_id, seat_holder in self.get_holders(
+                    event_seat_ids
+                ).items()
+                if seat_holder == holder
+            ]
+        )
+
+    def mark_sold(self, event_seat_ids):
+        self.cache.set_many(
+            {self._key(event_seat_id): self.SOLD for event_seat_id in event_seat_ids},
+            timeout=None,
+        )
+
+    def hold_on_commit(self, reservation, event_seat_ids):
+        event_seat_ids = list(event_seat_ids)
+        transaction.on_commit(lambda: self.hold(reservation, event_seat_ids))
+
+    def release_on_commit(self, reservation_id, event_seat_ids):
+        event_seat_ids = list(event_seat_ids)
+        transaction.on_commit(lambda: self.release(reservation_id, event_seat_ids))
+
+    def mark_sold_on_commit(self, event_seat_ids):
+        event_seat_ids = list(event_seat_ids)
+        transaction.on_commit(lambda: self.mark_sold(event_seat_ids))
+
+
+seat_hold_store = SeatHoldStore()
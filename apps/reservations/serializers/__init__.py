@@ -1,6 +1,11 @@
 from apps.reservations.serializers.reservation import ReservationSerializer
 from apps.reservations.serializers.reservation_event_seat import (
+    BulkReservationEventSeatSerializer,
     ReservationEventSeatSerializer,
 )
 
-__all__ = ["ReservationSerializer", "ReservationEventSeatSerializer"]
+__all__ = [
+    "ReservationSerializer",
+    "ReservationEventSeatSerializer",
+    "BulkReservationEventSeatSerializer",
+]
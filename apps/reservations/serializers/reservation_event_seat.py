@@ -1,9 +1,20 @@
+from django.db.models import Exists, OuterRef
 from django.utils.translation import gettext_lazy as _
 from dry_rest_permissions.generics import DRYPermissionsField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from apps.reservations.models import ReservationEventSeat
+from apps.events.models import EventSeat
+from apps.reservations.models import Reservation, ReservationEventSeat, SeatClaim
+from apps.reservations.seat_holds import seat_hold_store
+
+
+def get_seat_hold_error(holder, reservation):
+    if holder is None or holder == str(reservation.id):
+        return None
+    elif holder == seat_hold_store.SOLD:
+        return _("Seat is already reserved.")
+    return _("Seat is held by another reservation.")
 
 
 class ReservationEventSeatSerializer(serializers.ModelSerializer):
@@ -33,9 +44,10 @@ class ReservationEventSeatSerializer(serializers.ModelSerializer):
     def validate_reservation(self, reservation):
         custom_error_messages = []
 
-        result, message = reservation.is_valid()
-        if result is False:
-            custom_error_messages.append(message)
+        # seats claimed by other reservations are rejected by the seat claims
+        status_error = reservation.get_status_error()
+        if status_error:
+            custom_error_messages.append(status_error)
 
         if reservation.user != self.context["view"].request.user:
             custom_error_messages.append(_("Invalid reservation ID"))
@@ -45,11 +57,6 @@ class ReservationEventSeatSerializer(serializers.ModelSerializer):
 
         return reservation
 
-    def validate_event_seat(self, event_seat):
-        if event_seat.is_reserved():
-            raise serializers.ValidationError(_("Seat is already reserved."))
-        return event_seat
-
     def validate(self, attrs):
         custom_error_messages = []
 
@@ -57,6 +64,15 @@ class ReservationEventSeatSerializer(serializers.ModelSerializer):
         if result is False:
             custom_error_messages.append(message)
 
+        seat_hold_error = get_seat_hold_error(
+            seat_hold_store.get_holders([attrs["event_seat"].id]).get(
+                attrs["event_seat"].id
+            ),
+            attrs["reservation"],
+        )
+        if seat_hold_error:
+            custom_error_messages.append(seat_hold_error)
+
         if attrs["reservation"].event != attrs["event_seat"].event_seat_type.event:
             custom_error_messages.append(
                 _("event of both reservation and event_seat didn't match")
@@ -66,3 +82,119 @@ class ReservationEventSeatSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(custom_error_messages)
 
         return attrs
+
+    def create(self, validated_data):
+        reservation = validated_data["reservation"]
+        event_seat_ids = [validated_data["event_seat"].id]
+
+        # the seat claims decide, the cache follows once they are committed
+        SeatClaim.objects.hold(reservation, event_seat_ids)
+        reservation_event_seat = super().create(validated_data)
+        seat_hold_store.hold_on_commit(reservation, event_seat_ids)
+        return reservation_event_seat
+
+
+class BulkReservationEventSeatSerializer(serializers.Serializer):
+    """
+    Adds many event seats to one reservation. Seats are validated with a fixed
+    number of set based queries and one read of the seat hold store whatever
+    the number of seats, errors are returned per seat.
+    """
+
+    reservation = serializers.PrimaryKeyRelatedField(
+        queryset=Reservation.objects.select_related("event")
+    )
+    event_seats = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=100
+    )
+
+    def validate_reservation(self, reservation):
+        custom_error_messages = []
+
+        status_error = reservation.get_status_error()
+        if status_error:
+            custom_error_messages.append(status_error)
+
+        if reservation.user_id != self.context["request"].user.id:
+            custom_error_messages.append(_("Invalid reservation ID"))
+
+        result, message = reservation.event.is_eligible_for_reservation()
+        if result is False:
+            custom_error_messages.append(message)
+
+        if custom_error_messages:
+            raise serializers.ValidationError(custom_error_messages)
+
+        return reservation
+
+    def validate(self, attrs):
+        reservation = attrs["reservation"]
+        reservation_event_seats = ReservationEventSeat.objects.filter(
+            event_seat=OuterRef("pk")
+        )
+        event_seats = {
+            event_seat.id: event_seat
+            for event_seat in EventSeat.objects.filter(id__in=attrs["event_seats"])
+            .select_related("event_seat_type")
+            .annotate(
+                is_in_reservation=Exists(
+                    reservation_event_seats.filter(reservation=reservation)
+                ),
+            )
+        }
+        holders = seat_hold_store.get_holders(list(event_seats))
+
+        errors = {}
+        selected_event_seat_ids = set()
+        for event_seat_id in attrs["event_seats"]:
+            custom_error_messages = []
+            event_seat = event_seats.get(event_seat_id)
+
+            if event_seat_id in selected_event_seat_ids:
+                custom_error_messages.append(_("Seat is selected more than once."))
+            selected_event_seat_ids.add(event_seat_id)
+
+            if event_seat is None:
+                custom_error_messages.append(_("Seat doesn't exist."))
+            else:
+                if event_seat.event_seat_type.event_id != reservation.event_id:
+                    custom_error_messages.append(
+                        _("event of both reservation and event_seat didn't match")
+                    )
+                seat_hold_error = get_seat_hold_error(
+                    holders.get(event_seat.id), reservation
+                )
+                if seat_hold_error:
+                    custom_error_messages.append(seat_hold_error)
+                if event_seat.is_in_reservation:
+                    custom_error_messages.append(
+                        _("Seat is already added to the reservation.")
+                    )
+
+            if custom_error_messages:
+                errors[str(event_seat_id)] = custom_error_messages
+
+        if errors:
+            raise serializers.ValidationError({"event_seats": errors})
+
+        attrs["event_seats"] = [
+            event_seats[event_seat_id] for event_seat_id in attrs["event_seats"]
+        ]
+        return attrs
+
+    def create(self, validated_data):
+        reservation = validated_data["reservation"]
+        event_seat_ids = [event_seat.id for event_seat in validated_data["event_seats"]]
+
+        # the seat claims decide, the cache follows once they are committed
+        SeatClaim.objects.hold(reservation, event_seat_ids)
+        reservation_event_seats = ReservationEventSeat.objects.bulk_add(
+            reservation, validated_data["event_seats"]
+        )
+        seat_hold_store.hold_on_commit(reservation, event_seat_ids)
+        return reservation_event_seats
+
+    def to_representation(self, reservation_event_seats):
+        return ReservationEventSeatSerializer(
+            reservation_event_seats, many=True, context=self.context
+        ).data
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.events.models import EventSeatInventory
+from apps.events.seat_map import seat_map_store
+from apps.reservations.managers import get_seat_inventory_counter_name, get_seat_state
+from apps.reservations.models import Reservation, ReservationEventSeat
+
+
+@receiver(post_save, sender=ReservationEventSeat)
+def increase_event_seat_inventory_counter(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    counter_name = get_seat_inventory_counter_name(instance.reservation.status)
+    if counter_name:
+        EventSeatInventory.objects.add(
+            instance.reservation.event_id,
+            instance.event_seat.event_seat_type_id,
+            **{counter_name: 1},
+        )
+    seat_map_store.refresh_seats_on_commit(
+        instance.reservation.event_id,
+        [instance.event_seat_id],
+        [instance.event_seat.seat_number],
+        get_seat_state(instance.reservation.status),
+    )
+
+
+@receiver(pre_delete, sender=User)
+def delete_user_reservations(sender, instance, **kwargs):
+    # cascaded deletes would leave the seats of other events in their inventories
+    Reservation.objects.filter(user=instance).delete()
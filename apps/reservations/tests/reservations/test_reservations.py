@@ -4,17 +4,24 @@ from unittest.mock import patch
 
 import pytz
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from model_bakery import baker
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
 
+from apps.core.query_budget import QueryBudgetTestMixin
 from apps.events.models import Event, EventSeat, EventTag
-from apps.reservations.models import Reservation, ReservationEventSeat
+from apps.reservations.models import Reservation, ReservationEventSeat, SeatClaim
+from apps.reservations.seat_holds import seat_hold_store
+from apps.reservations.views import ReservationEventSeatViewSet, ReservationViewSet
 from apps.venues.models import Venue
+from apps.workers.tasks import start_reservation_invalidator
 
 
-class ReservationAPITestCase(APITestCase):
+class ReservationAPITestCase(QueryBudgetTestMixin, APITestCase):
     RESERVATIONS_LIST_PATH = reverse("reservations:reservation-list")
 
     def setUp(self) -> None:
@@ -155,7 +162,9 @@ class ReservationAPITestCase(APITestCase):
         response = self._client_one.get(self.RESERVATIONS_LIST_PATH)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        response_reservation_ids = [each["id"] for each in json.loads(response.content)]
+        response_reservation_ids = [
+            each["id"] for each in json.loads(response.content)["results"]
+        ]
         self.assertListEqual(response_reservation_ids, reservation_ids)
 
     def test_general_user_can_only_get_his_reservations(self):
@@ -213,7 +222,9 @@ class ReservationAPITestCase(APITestCase):
         response = self._client_three.get(self.RESERVATIONS_LIST_PATH)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        response_reservation_ids = [each["id"] for each in json.loads(response.content)]
+        response_reservation_ids = [
+            each["id"] for each in json.loads(response.content)["results"]
+        ]
         self.assertListEqual(response_reservation_ids, reservation_ids)
 
     def test_general_user_can_delete_his_not_reserved_reservation(self):
@@ -569,8 +580,9 @@ class ReservationAPITestCase(APITestCase):
             reservation=reservation_user_two,
             event_seat=event_seat_1,
         )
-        Reservation.objects.filter(id=reservation_user_two.id).update(
-            status=Reservation.Status.RESERVED, payment_id="payment_id"
+        SeatClaim.objects.sell(reservation_user_two)
+        Reservation.objects.filter(id=reservation_user_two.id).update_status(
+            Reservation.Status.RESERVED, payment_id="payment_id"
         )
 
         response = self._client_one.post(
@@ -580,4 +592,455 @@ class ReservationAPITestCase(APITestCase):
             ),
             data={"payment_id": "f2asd4fa5sd4f45fas5"},
         )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertListEqual(response.data["event_seats"], [str(event_seat_1.id)])
+        make_refund_mock.assert_called_once()
+
+    def test_bulk_add_event_seats_to_reservation(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        event_seats = [
+            EventSeat.objects.create(event_seat_type=event_seat_type)
+            for event_seat_type in event.event_seat_types.all()
+            for _ in range(4)
+        ]
+        reservation = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_two,
+            status=Reservation.Status.CREATED,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._client_two.post(
+                reverse("reservations:reservationeventseat-bulk-create"),
+                {
+                    "reservation": str(reservation.id),
+                    "event_seats": [str(event_seat.id) for event_seat in event_seats],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(reservation.event_seats.count(), 12)
+        self.assertLessEqual(len(queries), 10)
+
+    def test_bulk_add_event_seats_returns_errors_per_seat(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        free_event_seat, reserved_event_seat = [
+            EventSeat.objects.create(event_seat_type=event.event_seat_types.first())
+            for _ in range(2)
+        ]
+        baker.make(
+            ReservationEventSeat,
+            reservation=baker.make(
+                Reservation,
+                event=event,
+                status=Reservation.Status.RESERVED,
+                payment_id="payment_id",
+            ),
+            event_seat=reserved_event_seat,
+        )
+        reservation = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_two,
+            status=Reservation.Status.CREATED,
+        )
+
+        response = self._client_two.post(
+            reverse("reservations:reservationeventseat-bulk-create"),
+            {
+                "reservation": str(reservation.id),
+                "event_seats": [str(free_event_seat.id), str(reserved_event_seat.id)],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertListEqual(
+            list(response.data["event_seats"]), [str(reserved_event_seat.id)]
+        )
+        self.assertFalse(reservation.event_seats.exists())
+
+    def test_held_seat_cant_be_added_to_other_reservation(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        event_seat = EventSeat.objects.create(
+            event_seat_type=event.event_seat_types.first()
+        )
+        reservation_user_two = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_two,
+            status=Reservation.Status.CREATED,
+        )
+        reservation_user_three = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_three,
+            status=Reservation.Status.CREATED,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._client_two.post(
+                reverse("reservations:reservationeventseat-list"),
+                {
+                    "reservation": str(reservation_user_two.id),
+                    "event_seat": event_seat.id,
+                },
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self._client_three.post(
+            reverse("reservations:reservationeventseat-list"),
+            {
+                "reservation": str(reservation_user_three.id),
+                "event_seat": event_seat.id,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # the seat claim still belongs to user two when the cache loses the hold
+        seat_hold_store.release(reservation_user_two.id, [event_seat.id])
+        response = self._client_three.post(
+            reverse("reservations:reservationeventseat-list"),
+            {
+                "reservation": str(reservation_user_three.id),
+                "event_seat": event_seat.id,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertListEqual(response.data["event_seats"], [str(event_seat.id)])
+        # a rejected claim holds nothing in the cache
+        self.assertDictEqual(seat_hold_store.get_holders([event_seat.id]), {})
+
+        SeatClaim.objects.release([reservation_user_two.id])
+        response = self._client_three.post(
+            reverse("reservations:reservationeventseat-list"),
+            {
+                "reservation": str(reservation_user_three.id),
+                "event_seat": event_seat.id,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @patch("apps.workers.tasks.make_refund.apply_async")
+    def test_payment_conflicts_when_seat_is_claimed_by_other_reservation(
+        self, make_refund_mock
+    ):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        event_seat = EventSeat.objects.create(
+            event_seat_type=event.event_seat_types.first()
+        )
+        reservation_user_one = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_one,
+            status=Reservation.Status.CREATED,
+        )
+        baker.make(
+            ReservationEventSeat,
+            reservation=reservation_user_one,
+            event_seat=event_seat,
+        )
+        SeatClaim.objects.hold(
+            baker.make(
+                Reservation,
+                event=event,
+                user=self._user_two,
+                status=Reservation.Status.CREATED,
+            ),
+            [event_seat.id],
+        )
+
+        response = self._client_one.post(
+            reverse(
+                "reservations:reservation-payment-successful",
+                kwargs={"reservation_id": str(reservation_user_one.id)},
+            ),
+            data={"payment_id": "f2asd4fa5sd4f45fas5"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertListEqual(response.data["event_seats"], [str(event_seat.id)])
+        make_refund_mock.assert_called_once()
+
+    def _create_event_with_reservation_of_seats(self, event_status, number_of_seats):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=event_status,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        reservation = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_two,
+            status=Reservation.Status.CREATED,
+        )
+        for _ in range(number_of_seats):
+            baker.make(
+                ReservationEventSeat,
+                reservation=reservation,
+                event_seat=EventSeat.objects.create(
+                    event_seat_type=event.event_seat_types.first()
+                ),
+            )
+        return reservation
+
+    def test_reservation_related_views_resolve_reservation_with_one_query(self):
+        reservation = self._create_event_with_reservation_of_seats(
+            Event.Status.CREATED, 2
+        )
+        kwargs = {"reservation_id": str(reservation.id)}
+
+        # savepoint, reservation with event, release
+        with self.assertNumQueries(3):
+            response = self._client_two.get(
+                reverse("reservations:reservation-ticket", kwargs=kwargs)
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # savepoint, reservation, its event seats, seat map (2), release
+        with self.assertNumQueries(6):
+            response = self._client_two.get(
+                reverse("reservations:reservation-final-validation", kwargs=kwargs)
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # savepoint, reservation lookup, rollback
+        with self.assertNumQueries(3):
+            response = self._client_two.get(
+                reverse(
+                    "reservations:reservation-ticket",
+                    kwargs={"reservation_id": str(reservation.event_id)},
+                )
+            )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.assertNumQueries(3):
+            response = self._client_three.get(
+                reverse("reservations:reservation-ticket", kwargs=kwargs)
+            )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch("apps.workers.tasks.make_refund.apply_async")
+    def test_payment_successful_resolves_reservation_with_one_query(
+        self, make_refund_mock
+    ):
+        reservation = self._create_event_with_reservation_of_seats(
+            Event.Status.COMPLETED, 1
+        )
+
+        # savepoint, reservation with event, rollback
+        with self.assertNumQueries(3):
+            response = self._client_two.post(
+                reverse(
+                    "reservations:reservation-payment-successful",
+                    kwargs={"reservation_id": str(reservation.id)},
+                ),
+                data={"payment_id": "f2asd4fa5sd4f45fas5"},
+            )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        make_refund_mock.assert_called_once()
+
+    def test_ticket_summary_is_aggregated_and_cached_when_reserved(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.CREATED,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        general = event.event_seat_types.get(name="general")
+        vip = event.event_seat_types.get(name="vip")
+        event_seats = [
+            EventSeat.objects.create(event_seat_type=event_seat_type)
+            for event_seat_type in [general, vip, vip]
+        ]
+        reservation = baker.make(
+            Reservation,
+            event=event,
+            user=self._user_two,
+            status=Reservation.Status.RESERVED,
+            payment_id="payment_id",
+        )
+        for event_seat in event_seats:
+            baker.make(
+                ReservationEventSeat, reservation=reservation, event_seat=event_seat
+            )
+        ticket_path = reverse(
+            "reservations:reservation-ticket",
+            kwargs={"reservation_id": str(reservation.id)},
+        )
+
+        # savepoint, reservation with event, summary, release
+        with self.assertNumQueries(4):
+            response = self._client_two.get(ticket_path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["event_name"], "Happy New Year")
+        self.assertEqual(response.data["number_of_seats"], 3)
+        self.assertEqual(
+            response.data["total_cost"], general.price + vip.price + vip.price
+        )
+        self.assertListEqual(
+            response.data["seat_numbers"],
+            sorted(event_seat.seat_number for event_seat in event_seats),
+        )
+
+        with self.assertNumQueries(3):
+            cached_response = self._client_two.get(ticket_path)
+        self.assertEqual(cached_response.data, response.data)
+
+    def test_invalidator_invalidates_expired_reservations_in_batches(self):
+        reservation = self._create_event_with_reservation_of_seats(
+            Event.Status.CREATED, 1
+        )
+        expired_reservations = [
+            reservation,
+            *baker.make(
+                Reservation,
+                event=reservation.event,
+                status=Reservation.Status.CREATED,
+                _quantity=2,
+            ),
+        ]
+        fresh_reservation = baker.make(
+            Reservation, event=reservation.event, status=Reservation.Status.CREATED
+        )
+        SeatClaim.objects.hold(
+            reservation, [reservation.event_seats.get().event_seat_id]
+        )
+        Reservation.objects.filter(
+            id__in=[expired.id for expired in expired_reservations]
+        ).update(
+            created=timezone.now()
+            - datetime.timedelta(seconds=Reservation.valid_for_seconds + 1)
+        )
+
+        metrics = start_reservation_invalidator(batch_size=2)
+
+        self.assertEqual(metrics["reservations"], 3)
+        self.assertEqual(metrics["batches"], 2)
+        self.assertEqual(
+            Reservation.objects.filter(status=Reservation.Status.INVALIDATED).count(),
+            3,
+        )
+        fresh_reservation.refresh_from_db()
+        self.assertEqual(fresh_reservation.status, Reservation.Status.CREATED)
+        self.assertFalse(
+            SeatClaim.objects.filter(
+                reservation=reservation, status__in=SeatClaim.ACTIVE_STATUSES
+            ).exists()
+        )
+
+    def test_reservation_reads_stay_within_query_budgets(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        event_seat_type = event.event_seat_types.first()
+
+        # reservations of other users, so permissions look at the event creator
+        def create_reservation_event_seats(size):
+            return [
+                baker.make(
+                    ReservationEventSeat,
+                    reservation=baker.make(Reservation, event=event),
+                    event_seat=EventSeat.objects.create(
+                        event_seat_type=event_seat_type
+                    ),
+                )
+                for _ in range(size)
+            ]
+
+        for viewset, path, get_detail_path in [
+            (
+                ReservationViewSet,
+                self.RESERVATIONS_LIST_PATH,
+                lambda reservation_event_seats: reverse(
+                    "reservations:reservation-detail",
+                    kwargs={"pk": reservation_event_seats[-1].reservation_id},
+                ),
+            ),
+            (
+                ReservationEventSeatViewSet,
+                reverse("reservations:reservationeventseat-list"),
+                lambda reservation_event_seats: reverse(
+                    "reservations:reservationeventseat-detail",
+                    kwargs={"pk": reservation_event_seats[-1].id},
+                ),
+            ),
+        ]:
+            self.assertQueryBudget(
+                viewset, "list", self._client_one, create_reservation_event_seats, path
+            )
+            self.assertQueryBudget(
+                viewset,
+                "retrieve",
+                self._client_one,
+                create_reservation_event_seats,
+                get_detail_path,
+            )
+
+    def test_event_creator_has_object_permissions_of_reservations(self):
+        event = Event.objects.create(
+            name="Happy New Year",
+            user=self._user_one,
+            status=Event.Status.RUNNING,
+            venue=baker.make(Venue),
+            start_date=datetime.datetime(2022, 6, 1, 7, 30, 30, tzinfo=pytz.utc),
+            end_date=datetime.datetime(2022, 6, 5, 7, 30, 30, tzinfo=pytz.utc),
+        )
+        reservation = baker.make(Reservation, event=event, user=self._user_two)
+        baker.make(
+            ReservationEventSeat,
+            reservation=reservation,
+            event_seat=EventSeat.objects.create(
+                event_seat_type=event.event_seat_types.first()
+            ),
+        )
+
+        for client in [self._client_one, self._client_two]:
+            for path in [
+                self.RESERVATIONS_LIST_PATH,
+                reverse("reservations:reservationeventseat-list"),
+            ]:
+                response = client.get(path)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertDictEqual(
+                    dict(response.data["results"][0]["object_permissions"]),
+                    {"read": True, "write": True},
+                )
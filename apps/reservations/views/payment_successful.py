@@ -4,7 +4,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.core.mixins import ReservationRelatedViewMixin
-from apps.reservations.models import Reservation
+from apps.reservations.exceptions import SeatClaimConflict
+from apps.reservations.models import Reservation, SeatClaim
 from apps.reservations.serializers import ReservationSerializer
 from apps.workers.tasks import make_refund
 
@@ -18,16 +19,27 @@ class ReservationPaymentSuccessfulView(ReservationRelatedViewMixin, APIView):
         self._validate_event_for_reservation(payment_id)
 
         #  here your really ready to reserve the selected seats
-        Reservation.objects.select_related("event").select_for_update().filter(
-            id=self._reservation.id
-        ).update(status=Reservation.Status.RESERVED, payment_id=payment_id)
+        self._sell_seat_claims(payment_id)
+        Reservation.objects.filter(id=self._reservation.id).update_status(
+            Reservation.Status.RESERVED, payment_id=payment_id
+        )
 
+        self._reservation.refresh_from_db(fields=["status", "payment_id"])
         return Response(
-            ReservationSerializer(
-                self._reservation.refresh_from_db(fields=["status", "payment_id"])
-            ).data
+            ReservationSerializer(self._reservation, context={"request": request}).data
         )
 
+    def _sell_seat_claims(self, payment_id):
+        try:
+            SeatClaim.objects.sell(self._reservation)
+        except SeatClaimConflict as exc:
+            make_refund.apply_async((payment_id,))
+            raise SeatClaimConflict(
+                exc.event_seat_ids,
+                detail=_("Some of the seats are already taken.")
+                + _(" You will be refunded soon."),
+            )
+
     def _validate_and_get_payment_id(self):
         payment_id = self.request.data.get("payment_id", None)
         if payment_id is None:
@@ -37,33 +49,17 @@ class ReservationPaymentSuccessfulView(ReservationRelatedViewMixin, APIView):
         return payment_id
 
     def _validate_event_for_reservation(self, payment_id):
-
-        (
-            event_result,
-            event_message,
-        ) = self._reservation.event.is_eligible_for_reservation()
-
-        reservation_result, reservation_message = self._reservation.is_valid()
-
-        error_response_data = dict()
-        if event_result is False:
-            error_response_data["detail"] = event_message + _(
-                " You will be refunded soon."
-            )
-
-        elif reservation_result is False:
-            if "status" in reservation_message:
-                error_response_data["detail"] = reservation_message["status"] + _(
-                    " You will be refunded soon."
-                )
-            elif "reserved_seats" in reservation_message:
-                error_response_data["detail"] = reservation_message["message"] + _(
-                    " You will be refunded soon."
-                )
-                error_response_data["reserved_seats"] = reservation_message[
-                    "reserved_seats"
-                ]
-
-        if error_response_data:
+        """
+        Checks the statuses of the event and of the reservation, which need no
+        query. Whether the seats are still the reservation's is decided when
+        its seat claims are sold.
+        """
+        status_error = (
+            self._reservation.event.get_status_error()
+            or self._reservation.get_status_error()
+        )
+        if status_error:
             make_refund.apply_async((payment_id,))
-            raise serializers.ValidationError(error_response_data)
+            raise serializers.ValidationError(
+                {"detail": status_error["status"] + _(" You will be refunded soon.")}
+            )
@@ -6,11 +6,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from apps.core.mixins import ConditionalReadViewMixin
 from apps.reservations.models import Reservation
 from apps.reservations.serializers import ReservationSerializer
 
 
 class ReservationViewSet(
+    ConditionalReadViewMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
@@ -25,13 +27,14 @@ class ReservationViewSet(
         DRYPermissions,
     )
     filterset_fields = ("event", "user", "status", "created")
+    query_budgets = {"list": 5, "retrieve": 4, "reservation_statuses": 2}
 
     def get_queryset(self):
         if self.action in ["list", "retrieve"]:
             return (
                 super()
                 .get_queryset()
-                .select_related("user", "event")
+                .with_owner_ids()
                 .filter(Q(user=self.request.user) | Q(event__user=self.request.user))
             )
         elif self.action == "destroy":
@@ -1,14 +1,21 @@
 from django.db.models import Q
 from dry_rest_permissions.generics import DRYPermissions
-from rest_framework import mixins
+from rest_framework import mixins, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from apps.core.mixins import ConditionalReadViewMixin
 from apps.reservations.models import Reservation, ReservationEventSeat
-from apps.reservations.serializers import ReservationEventSeatSerializer
+from apps.reservations.serializers import (
+    BulkReservationEventSeatSerializer,
+    ReservationEventSeatSerializer,
+)
 
 
 class ReservationEventSeatViewSet(
+    ConditionalReadViewMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
@@ -30,13 +37,12 @@ class ReservationEventSeatViewSet(
         "reservation__event",
         "reservation__status",
     )
+    query_budgets = {"list": 5, "retrieve": 4}
 
     def get_queryset(self):
 
         if self.action in ["list", "retrieve"]:
-            return ReservationEventSeat.objects.select_related(
-                "reservation", "event_seat"
-            ).filter(
+            return ReservationEventSeat.objects.with_owner_ids().filter(
                 Q(reservation__user=self.request.user)
                 | Q(reservation__event__user=self.request.user)
             )
@@ -53,3 +59,12 @@ class ReservationEventSeatViewSet(
             return ReservationEventSeat.objects.select_related(
                 "reservation", "event_seat"
             ).filter(reservation__user=self.request.user)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        serializer = BulkReservationEventSeatSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1,13 +1,23 @@
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 from rest_framework import permissions, serializers
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.core.mixins import ReservationRelatedViewMixin
+from apps.events.seat_map import seat_map_store
+from apps.reservations.models import ReservationEventSeat
 
 
 class FinalReservationValidationView(ReservationRelatedViewMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    reservation_select_related = ()
+    reservation_prefetch_related = (
+        Prefetch(
+            "event_seats",
+            queryset=ReservationEventSeat.objects.select_related("event_seat"),
+        ),
+    )
 
     def _validate_even_number_of_seats(self, reservation_event_seats):
         if len(reservation_event_seats) % 2 != 0:
@@ -31,13 +41,30 @@ class FinalReservationValidationView(ReservationRelatedViewMixin, APIView):
                 break
             first_seat_number = each
 
+    def _validate_no_single_seat_is_left(self, reservation_event_seats):
+        seat_numbers = sorted(
+            reservation_event_seat.event_seat.seat_number
+            for reservation_event_seat in reservation_event_seats
+        )
+        if not seat_numbers:
+            return
+
+        seat_map = seat_map_store.get(self._reservation.event_id)
+        if seat_map.leaves_single_seat(seat_numbers[0], seat_numbers[-1]):
+            self.custom_non_field_errors.append(
+                _(
+                    "You can only buy tickets in quantity that will not leave "
+                    "only 1 ticket"
+                )
+            )
+
     def validate(self):
         self.custom_non_field_errors = []
         reservation_event_seats = self._reservation.event_seats.all()
         self._validate_even_number_of_seats(reservation_event_seats)
         self._validate_all_seats_around_each_other(reservation_event_seats)
+        self._validate_no_single_seat_is_left(reservation_event_seats)
 
-        # TODO:  avoid one - we can only buy tickets in a quantity that will not leave only 1 ticket # noqa
         if self.custom_non_field_errors:
             raise serializers.ValidationError(self.custom_non_field_errors)
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VenuesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.venues"
+
+    def ready(self):
+        from apps.venues import signals  # noqa: F401
@@ -0,0 +1,58 @@
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Point
+from django.db.models import BooleanField, FloatField, Func, Value
+from django.db.models.functions import Cast
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def get_geohash_cell(x, y, precision=7):
+    """
+    Geohash of the longitude x and latitude y and the center of its cell,
+    a cell of precision 7 is about 150m wide.
+    """
+    x_range, y_range = [-180.0, 180.0], [-90.0, 90.0]
+    geohash = []
+    bits = bit_count = 0
+    is_x = True
+    while len(geohash) < precision:
+        value, value_range = (x, x_range) if is_x else (y, y_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = bits << 1 | 1
+            value_range[0] = middle
+        else:
+            bits = bits << 1
+            value_range[1] = middle
+        is_x = not is_x
+
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = bit_count = 0
+
+    return "".join(geohash), Point(sum(x_range) / 2, sum(y_range) / 2, srid=4326)
+
+
+def as_geography(expression):
+    """Casts a geometry expression to geography, distances are in meters."""
+    return Cast(expression, PointField(geography=True, srid=4326))
+
+
+def get_geography_point(point):
+    return as_geography(Value(point, output_field=PointField(srid=4326)))
+
+
+class DWithin(Func):
+    """ST_DWithin on geographies, served by a GiST index on the geography."""
+
+    function = "ST_DWithin"
+    output_field = BooleanField()
+
+
+class KNNDistance(Func):
+    """Distance with the <-> operator, ordering by it is a KNN index scan."""
+
+    arg_joiner = " <-> "
+    template = "(%(expressions)s)"
+    output_field = FloatField()
@@ -0,0 +1,17 @@
+# Generated by Django 4.0 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("venues", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="venue",
+            index=models.Index(fields=["created", "id"], name="venue_created_id_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.0 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("venues", "0002_venue_venue_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="venue",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
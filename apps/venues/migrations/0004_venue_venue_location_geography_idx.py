@@ -0,0 +1,28 @@
+# Generated by Django 4.0 on 2026-10-18 14:40
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("venues", "0003_alter_venue_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="venue",
+            index=django.contrib.postgres.indexes.GistIndex(
+                django.db.models.functions.comparison.Cast(
+                    "location",
+                    django.contrib.gis.db.models.fields.PointField(
+                        geography=True, srid=4326
+                    ),
+                ),
+                name="venue_location_geography_idx",
+            ),
+        ),
+    ]
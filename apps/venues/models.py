@@ -1,5 +1,7 @@
 from django.contrib.gis.db.models import PointField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from django.db.models.functions import Cast
 
 from apps.core.models import BaseModel
 
@@ -9,6 +11,16 @@ class Venue(BaseModel):
     address = models.CharField(max_length=300)
     location = PointField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created", "id"], name="venue_created_id_idx"),
+            # distances in meters are computed on the geography
+            GistIndex(
+                Cast("location", PointField(geography=True, srid=4326)),
+                name="venue_location_geography_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
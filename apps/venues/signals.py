@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.response_cache import response_cache
+from apps.venues.models import Venue
+
+
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+def invalidate_response_cache(sender, instance, **kwargs):
+    response_cache.invalidate(sender, [instance.pk])
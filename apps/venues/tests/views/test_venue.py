@@ -4,10 +4,12 @@ from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
 
+from apps.core.query_budget import QueryBudgetTestMixin
 from apps.venues.models import Venue
+from apps.venues.views import VenueViewSet
 
 
-class VenueAPITestCase(APITestCase):
+class VenueAPITestCase(QueryBudgetTestMixin, APITestCase):
 
     VENUE_LIST_PATH = reverse("venues:venue-list")
 
@@ -75,6 +77,25 @@ class VenueAPITestCase(APITestCase):
             self._client_general.get(venue_detail_url).status_code, status.HTTP_200_OK
         )
 
+    def test_venue_reads_stay_within_query_budgets(self):
+        def create_venues(size):
+            return baker.make(Venue, _quantity=size)
+
+        self.assertQueryBudget(
+            VenueViewSet,
+            "list",
+            self._client_general,
+            create_venues,
+            self.VENUE_LIST_PATH,
+        )
+        self.assertQueryBudget(
+            VenueViewSet,
+            "retrieve",
+            self._client_general,
+            create_venues,
+            lambda venues: reverse("venues:venue-detail", kwargs={"pk": venues[-1].id}),
+        )
+
     def test_admin_can_update_destroy_single_venue(self):
         venue_detail_url = reverse(
             "venues:venue-detail", kwargs={"pk": baker.make(Venue).id}
@@ -2,11 +2,12 @@ from dry_rest_permissions.generics import DRYPermissions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.mixins import CachedReadViewMixin, ConditionalReadViewMixin
 from apps.venues.models import Venue
 from apps.venues.serializers import VenueSerializer
 
 
-class VenueViewSet(ModelViewSet):
+class VenueViewSet(ConditionalReadViewMixin, CachedReadViewMixin, ModelViewSet):
 
     queryset = Venue.objects.all()
     serializer_class = VenueSerializer
@@ -14,3 +15,6 @@ class VenueViewSet(ModelViewSet):
         IsAuthenticated,
         DRYPermissions,
     )
+    query_budgets = {"list": 4, "retrieve": 4}
+    # locations
+    renders_floats = True
@@ -1,43 +1,135 @@
+import logging
+import time
 from datetime import timedelta
 
 from celery import shared_task
 from django.db import transaction
 from django.utils import timezone
 
+from apps.core.response_cache import response_cache
 from apps.events.models import Event
 from apps.reservations.models import Reservation
 
+logger = logging.getLogger(__name__)
+
+EVENT_TRANSITION_BATCH_SIZE = 500
+RESERVATION_INVALIDATION_BATCH_SIZE = 500
+
+
+def schedule_event_transitions_on_commit(event):
+    """Enqueues the start and the stop of the event at its dates."""
+    event_id, start_date, end_date = event.id, event.start_date, event.end_date
+
+    def enqueue():
+        start_event.apply_async((event_id,), eta=start_date)
+        stop_event.apply_async((event_id,), eta=end_date)
+
+    transaction.on_commit(enqueue)
+
+
+@shared_task
+def start_event(event_id):
+    # no-op when the event was rescheduled later or already started
+    updated = Event.objects.filter(
+        id=event_id, status=Event.Status.CREATED, start_date__lte=timezone.now()
+    ).update(status=Event.Status.RUNNING, updated=timezone.now())
+    if updated:
+        # update() sends no post_save
+        response_cache.invalidate(Event, [event_id])
+    return updated
+
+
+@shared_task
+def stop_event(event_id):
+    updated = Event.objects.filter(
+        id=event_id, status=Event.Status.RUNNING, end_date__lte=timezone.now()
+    ).update(status=Event.Status.COMPLETED, updated=timezone.now())
+    if updated:
+        response_cache.invalidate(Event, [event_id])
+    return updated
+
+
+def _transition_due_events(status, new_status, date_field):
+    """
+    Moves the events in status whose date_field passed to new_status in
+    batches. Rows locked by another sweeper or task are skipped, they are
+    theirs to move.
+    """
+    now = timezone.now()
+    number_of_events = 0
+    while True:
+        with transaction.atomic():
+            event_ids = list(
+                Event.objects.select_for_update(skip_locked=True)
+                .filter(status=status, **{f"{date_field}__lte": now})
+                .order_by(date_field)
+                .values_list("id", flat=True)[:EVENT_TRANSITION_BATCH_SIZE]
+            )
+            Event.objects.filter(id__in=event_ids).update(
+                status=new_status, updated=timezone.now()
+            )
+            if event_ids:
+                response_cache.invalidate(Event, event_ids)
+        number_of_events += len(event_ids)
+        if len(event_ids) < EVENT_TRANSITION_BATCH_SIZE:
+            return number_of_events
+
 
 @shared_task
 def event_starter():
-    with transaction.atomic():
-        qs = Event.objects.select_for_update().filter(
-            status=Event.Status.CREATED, start_date__gte=timezone.now()
-        )
-        list(qs)
-        qs.update(status=Event.Status.RUNNING)
+    """Starts the events whose start_event task was missed."""
+    return _transition_due_events(
+        Event.Status.CREATED, Event.Status.RUNNING, "start_date"
+    )
 
 
 @shared_task
 def event_stopper():
-    with transaction.atomic():
-        qs = Event.objects.select_for_update().filter(
-            status=Event.Status.RUNNING, end_date__gte=timezone.now()
-        )
-        list(qs)
-        qs.update(status=Event.Status.COMPLETED)
+    """Completes the events whose stop_event task was missed."""
+    return _transition_due_events(
+        Event.Status.RUNNING, Event.Status.COMPLETED, "end_date"
+    )
 
 
 @shared_task
-def start_reservation_invalidator():
-    with transaction.atomic():
-        qs = Reservation.objects.select_for_update().filter(
-            status=Reservation.Status.CREATED,
-            created_lte=timezone.now()
-            - timedelta(seconds=Reservation.valid_for_seconds),
-        )
-        list(qs)
-        qs.update(status=Reservation.Status.INVALIDATED)
+def start_reservation_invalidator(batch_size=RESERVATION_INVALIDATION_BATCH_SIZE):
+    """
+    Invalidates the expired created reservations and releases their seats,
+    one batch per transaction. Rows locked by a payment or another worker are
+    skipped, so workers can run it in parallel and a failure only loses the
+    current batch.
+    """
+    expired_before = timezone.now() - timedelta(seconds=Reservation.valid_for_seconds)
+    started = time.monotonic()
+    number_of_reservations = number_of_batches = 0
+    while True:
+        with transaction.atomic():
+            reservation_ids = list(
+                Reservation.objects.select_for_update(skip_locked=True)
+                .filter(status=Reservation.Status.CREATED, created__lte=expired_before)
+                .order_by("created")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if reservation_ids:
+                Reservation.objects.filter(id__in=reservation_ids).update_status(
+                    Reservation.Status.INVALIDATED
+                )
+        number_of_reservations += len(reservation_ids)
+        number_of_batches += 1
+        if len(reservation_ids) < batch_size:
+            break
+
+    elapsed_seconds = time.monotonic() - started
+    metrics = {
+        "reservations": number_of_reservations,
+        "batches": number_of_batches,
+        "seconds": round(elapsed_seconds, 3),
+        "reservations_per_second": round(
+            number_of_reservations / elapsed_seconds if elapsed_seconds else 0, 1
+        ),
+    }
+    logger.info("Reservation invalidator %s", metrics)
+    return metrics
 
 
 @shared_task
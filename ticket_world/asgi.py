@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ticket_world.settings.development")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported once the apps are loaded
+from apps.events.seat_stream import SeatStreamApplication  # noqa: E402
+
+application = SeatStreamApplication(django_application)
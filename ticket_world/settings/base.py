@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.gis",
+    "django.contrib.postgres",
     "rest_framework",
     "django_filters",
     "django_celery_results",
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.query_stats.QueryStatsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -93,6 +95,27 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "redis_cache.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+    },
+    # seat holds expire with their reservation, so they must never be evicted
+    "seat_holds": {
+        "BACKEND": "redis_cache.RedisCache",
+        "LOCATION": "redis://localhost:6379/2",
+        "TIMEOUT": None,
+    },
+    # cached representations, entries of old versions are left to expire
+    "responses": {
+        "BACKEND": "redis_cache.RedisCache",
+        "LOCATION": "redis://localhost:6379/3",
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -135,10 +158,25 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # DRF
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.KeysetPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 RESERVATION_ID_URL_KEY = "reservation_id"
 
+# share of requests and celery tasks whose queries are counted and logged
+QUERY_STATS_SAMPLE_RATE = 0.01
+# a query executed this many times in a request or task is logged as an N+1
+QUERY_STATS_N_PLUS_ONE_THRESHOLD = 5
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -8,6 +8,8 @@ SECRET_KEY = "django-insecure-cs$x8+4o#wdf91@se-&^id&lmw$af+phju&i=)%@c^r+ay@q9*
 
 DEBUG = True
 
+QUERY_STATS_SAMPLE_RATE = 1.0
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 MEDIA_URL = "/media/"
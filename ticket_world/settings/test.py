@@ -0,0 +1,20 @@
+# flake8: noqa: F405
+
+from .base import *
+
+# in-memory stand-ins for redis, holds still expire with their timeout
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "default",
+    },
+    "seat_holds": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "seat_holds",
+        "TIMEOUT": None,
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "responses",
+    },
+}